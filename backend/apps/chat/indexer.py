@@ -0,0 +1,254 @@
+"""
+Incremental indexing of published blog posts and research (and their
+translations) into the chat knowledge base.
+
+Each source keeps an updated_at watermark in the KB. A run only reads rows
+changed since the last one, replaces the chunks of those documents, and drops
+the chunks of documents that were deleted. Unpublishing a post bumps its
+updated_at, so its chunks are removed on the next run as well. The hand-written
+CHUNKS are left alone.
+
+updated_at is stamped when a row is saved, not when its transaction commits,
+so the watermark is the time the run started minus WATERMARK_LAG rather than
+the newest updated_at seen: a row saved before that but committed after the
+run read its source is still picked up by the next run.
+
+Saves in the admin don't wait for a run: index_object and remove_object
+(called from signals.py) update just the document that changed.
+"""
+
+import re
+from datetime import datetime, timedelta
+from typing import NamedTuple
+
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.blog.models import BlogPost, BlogPostTranslation
+from apps.research.models import Research, ResearchTranslation
+
+from .knowledge import bump_kb_version, get_connection
+
+# Target chunk size in characters; paragraphs are packed up to this length
+CHUNK_CHARS = 1200
+
+# How far before its start a run sets the watermarks; the longest a transaction
+# may stay open between saving a document and committing it
+WATERMARK_LAG = timedelta(minutes=5)
+
+
+class Source(NamedTuple):
+    name: str
+    model: type
+    parent: str | None  # FK to the published document, for translations
+    category: str
+    label: str
+    fields: tuple[str, ...]
+
+
+SOURCES = [
+    Source("blog", BlogPost, None, "blog", "Blog post", ("excerpt", "content")),
+    Source("blog_translation", BlogPostTranslation, "post", "blog", "Blog post", ("excerpt", "content")),
+    Source("research", Research, None, "research", "Research", ("abstract", "excerpt", "content")),
+    Source("research_translation", ResearchTranslation, "research", "research", "Research", ("abstract", "content")),
+]
+
+PARENT_SOURCES = {"post": "blog", "research": "research"}
+
+SOURCES_BY_MODEL = {source.model: source for source in SOURCES}
+
+_IMAGE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_MARKUP = re.compile(r"^\s{0,3}(#{1,6}|>|[-*+]|\d+\.)\s+|[*_`~]+|<[^>]+>", re.MULTILINE)
+
+
+def plain_text(markdown: str) -> str:
+    """Strip the markdown that would only add noise to full-text matching."""
+    text = _IMAGE.sub("", markdown)
+    text = _LINK.sub(r"\1", text)
+    return _MARKUP.sub("", text)
+
+
+def chunk_text(text: str, size: int = CHUNK_CHARS) -> list[str]:
+    """Split text into chunks of whole paragraphs (or sentences) up to size characters."""
+    pieces = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = " ".join(paragraph.split())
+        if len(paragraph) <= size:
+            pieces.append(paragraph)
+        else:
+            pieces.extend(re.split(r"(?<=[.!?])\s+", paragraph))
+
+    chunks, current = [], ""
+    for piece in filter(None, pieces):
+        while len(piece) > size:  # a single overlong sentence
+            chunks.append(piece[:size])
+            piece = piece[size:]
+        if current and len(current) + len(piece) + 1 > size:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current} {piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def document_chunks(source: Source, obj) -> list[str]:
+    """KB chunks for one document, or [] when it shouldn't be in the KB."""
+    document = getattr(obj, source.parent) if source.parent else obj
+    if document.status != "published":
+        return []
+
+    fields = source.fields
+    if document.is_premium:
+        # The chat is public; only the summary fields of premium content go in
+        fields = tuple(f for f in fields if f != "content")
+
+    text = "\n\n".join(plain_text(getattr(obj, f)) for f in fields if getattr(obj, f))
+    return [f"{source.label}: {obj.title}. {chunk}" for chunk in chunk_text(text)]
+
+
+def _watermarks(conn) -> dict[str, datetime]:
+    return {
+        source: datetime.fromisoformat(value)
+        for source, value in conn.execute("SELECT source, updated_at FROM index_watermarks")
+    }
+
+
+def _changed(source: Source, watermarks: dict[str, datetime]):
+    queryset = source.model.objects.all()
+    if source.parent:
+        queryset = queryset.select_related(source.parent)
+
+    since = watermarks.get(source.name)
+    if since is None:
+        return queryset
+    # >= rather than >: rows saved in the same instant as the last watermark
+    # are re-indexed, which is harmless, instead of possibly skipped
+    changed = Q(updated_at__gte=since)
+    if source.parent:
+        # Publishing or unpublishing the parent changes what a translation shows
+        parent_since = watermarks.get(PARENT_SOURCES[source.parent])
+        if parent_since is None:
+            return queryset
+        changed |= Q(**{f"{source.parent}__updated_at__gte": parent_since})
+    return queryset.filter(changed)
+
+
+def _delete_document(conn, source: str, doc_id: int) -> int:
+    removed = conn.execute(
+        "DELETE FROM chunks WHERE rowid IN "
+        "(SELECT chunk_id FROM doc_chunks WHERE source = ? AND doc_id = ?)",
+        (source, doc_id),
+    ).rowcount
+    conn.execute("DELETE FROM doc_chunks WHERE source = ? AND doc_id = ?", (source, doc_id))
+    return removed
+
+
+def _write_document(conn, source: Source, doc_id: int, chunks: list[str]) -> None:
+    """Replace the chunks of one document."""
+    _delete_document(conn, source.name, doc_id)
+    for chunk in chunks:
+        rowid = conn.execute(
+            "INSERT INTO chunks(category, content) VALUES (?, ?)",
+            (source.category, chunk),
+        ).lastrowid
+        conn.execute(
+            "INSERT INTO doc_chunks (chunk_id, source, doc_id) VALUES (?, ?, ?)",
+            (rowid, source.name, doc_id),
+        )
+
+
+def index_documents(full: bool = False) -> dict[str, dict[str, int]]:
+    """
+    Bring the KB up to date with published site content.
+
+    Returns {source: {"documents": reindexed, "removed": deleted documents,
+    "chunks": chunks written}}. full=True ignores the watermarks and
+    reindexes every document.
+    """
+    conn = get_connection()
+    watermarks = {} if full else _watermarks(conn)
+    watermark = timezone.now() - WATERMARK_LAG
+
+    # Read everything from PostgreSQL before taking the KB write lock
+    pending = []
+    for source in SOURCES:
+        documents = [(obj.pk, document_chunks(source, obj)) for obj in _changed(source, watermarks)]
+        existing = set(source.model.objects.values_list("pk", flat=True))
+        pending.append((source, documents, existing))
+
+    stats = {}
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for source, documents, existing in pending:
+            indexed = {
+                doc_id
+                for (doc_id,) in conn.execute(
+                    "SELECT DISTINCT doc_id FROM doc_chunks WHERE source = ?", (source.name,)
+                )
+            }
+            removed = indexed - existing
+            for doc_id in removed:
+                _delete_document(conn, source.name, doc_id)
+
+            for doc_id, chunks in documents:
+                _write_document(conn, source, doc_id, chunks)
+
+            # A full run ignored the old watermark but must not move it backwards
+            latest = watermark
+            if source.name in watermarks:
+                latest = max(latest, watermarks[source.name])
+            conn.execute(
+                "INSERT OR REPLACE INTO index_watermarks (source, updated_at) VALUES (?, ?)",
+                (source.name, latest.isoformat()),
+            )
+            stats[source.name] = {
+                "documents": len(documents),
+                "removed": len(removed),
+                "chunks": sum(len(chunks) for _, chunks in documents),
+            }
+
+        if any(s["documents"] or s["removed"] for s in stats.values()):
+            bump_kb_version(conn)
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+    return stats
+
+
+def _write_documents(documents: list[tuple[Source, int, list[str]]]) -> None:
+    conn = get_connection()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for source, doc_id, chunks in documents:
+            _write_document(conn, source, doc_id, chunks)
+        bump_kb_version(conn)
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def index_object(obj) -> int:
+    """
+    Reindex one saved document. A post or research article brings its
+    translations along, since their published state follows it. Returns the
+    number of chunks written.
+    """
+    source = SOURCES_BY_MODEL[type(obj)]
+    documents = [(source, obj.pk, document_chunks(source, obj))]
+    for translation in SOURCES:
+        if translation.parent and PARENT_SOURCES[translation.parent] == source.name:
+            for child in translation.model.objects.filter(**{translation.parent: obj}):
+                documents.append((translation, child.pk, document_chunks(translation, child)))
+
+    _write_documents(documents)
+    return sum(len(chunks) for _, _, chunks in documents)
+
+
+def remove_object(model: type, pk: int) -> None:
+    """Drop the chunks of a deleted document."""
+    _write_documents([(SOURCES_BY_MODEL[model], pk, [])])
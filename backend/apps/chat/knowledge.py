@@ -3,9 +3,14 @@ SQLite FTS5 knowledge base for the chat widget.
 Stored in a separate file from the main database — no migrations needed.
 """
 
+import hashlib
 import os
+import re
 import sqlite3
+import threading
 import time
+import uuid
+from typing import NamedTuple
 
 from django.core.cache import cache
 from django.utils import timezone
@@ -14,6 +19,25 @@ KB_PATH = os.path.join(os.path.dirname(__file__), "chat_kb.sqlite3")
 
 IP_BLOCK_DURATION = 3600  # 1 hour
 
+# Connection tuning for the KB file. WAL lets readers run alongside the
+# occasional block_ip write; statements are cached per connection by SQL text.
+KB_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-8000",  # 8 MB page cache
+    "PRAGMA mmap_size=67108864",  # 64 MB
+)
+KB_CACHED_STATEMENTS = 64
+
+# Searches run against an in-memory copy of the KB, loaded once per process;
+# the file's version stamp (PRAGMA user_version) is re-checked at most this often.
+KB_RELOAD_INTERVAL = 5.0
+
+# Answers to repeat questions are served from Django's cache for this long.
+# Keys include the KB version, so reseeding or reindexing retires them at once.
+ANSWER_CACHE_TIMEOUT = int(os.environ.get("CHAT_ANSWER_CACHE_TIMEOUT", str(60 * 60 * 24)))
+
 # Global daily cap on paid LLM calls. Counter resets each calendar day (UTC).
 CHAT_DAILY_LIMIT = int(os.environ.get("CHAT_DAILY_LIMIT", "500"))
 
@@ -189,8 +213,14 @@ SYSTEM_PROMPT = (
 )
 
 
-def init_kb():
-    conn = sqlite3.connect(KB_PATH)
+_local = threading.local()
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+
+def init_kb(conn=None):
+    """Create the KB tables if missing."""
+    conn = conn or get_connection()
     conn.execute(
         "CREATE VIRTUAL TABLE IF NOT EXISTS chunks "
         "USING fts5(category, content, tokenize='porter unicode61')"
@@ -199,20 +229,187 @@ def init_kb():
         "CREATE TABLE IF NOT EXISTS ip_blocks "
         "(ip TEXT PRIMARY KEY, blocked_until INTEGER)"
     )
-    conn.commit()
-    conn.close()
+    # Chunks generated from site content (see indexer.py); chunks without a
+    # row here are the hand-written CHUNKS
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS doc_chunks "
+        "(chunk_id INTEGER PRIMARY KEY, source TEXT NOT NULL, doc_id INTEGER NOT NULL)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS doc_chunks_doc ON doc_chunks (source, doc_id)")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS index_watermarks "
+        "(source TEXT PRIMARY KEY, updated_at TEXT NOT NULL)"
+    )
 
 
-def seed_kb():
-    init_kb()
-    conn = sqlite3.connect(KB_PATH)
-    conn.execute("DELETE FROM chunks")
-    conn.executemany(
-        "INSERT INTO chunks(category, content) VALUES (?, ?)",
-        [(c["category"], c["content"]) for c in CHUNKS],
+def get_connection() -> sqlite3.Connection:
+    """
+    This thread's connection to the KB file, opened (and the schema checked)
+    on first use only. Connections are reopened after a fork, since SQLite
+    handles must not cross processes.
+    """
+    global _schema_ready
+
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.pid == os.getpid():
+        return conn
+
+    # Autocommit: reads take no transaction, single-statement writes commit at once
+    conn = sqlite3.connect(
+        KB_PATH, isolation_level=None, cached_statements=KB_CACHED_STATEMENTS
     )
-    conn.commit()
-    conn.close()
+    for pragma in KB_PRAGMAS:
+        conn.execute(pragma)
+
+    if not _schema_ready:
+        with _schema_lock:
+            if not _schema_ready:
+                init_kb(conn)
+                _schema_ready = True
+
+    _local.conn = conn
+    _local.pid = os.getpid()
+    return conn
+
+
+def kb_version(conn=None) -> int:
+    """Version stamp of the KB contents, bumped by every write to chunks."""
+    return (conn or get_connection()).execute("PRAGMA user_version").fetchone()[0]
+
+
+def bump_kb_version(conn) -> None:
+    """Bump the version stamp; call inside the transaction that changed chunks."""
+    # PRAGMA arguments can't be bound as parameters
+    conn.execute(f"PRAGMA user_version = {kb_version(conn) + 1:d}")
+
+
+class _Index(NamedTuple):
+    """A loaded in-memory copy of the KB, shared by the threads of one process."""
+
+    version: int
+    uri: str
+    anchor: sqlite3.Connection  # keeps the shared-cache database alive
+    pid: int
+
+
+_index: _Index | None = None
+# The copy replaced by the last reload, kept open a little longer for threads
+# that looked up the index just before the swap and haven't connected yet
+_retired: _Index | None = None
+_index_lock = threading.Lock()
+_index_checked = 0.0
+
+
+def _build_index() -> _Index:
+    conn = get_connection()
+    # Read the stamp and copy the pages in one read transaction so they match
+    conn.execute("BEGIN")
+    try:
+        version = kb_version(conn)
+        uri = f"file:chat-kb-{os.getpid()}-{version}-{uuid.uuid4().hex}?mode=memory&cache=shared"
+        anchor = sqlite3.connect(uri, uri=True, isolation_level=None, check_same_thread=False)
+        conn.backup(anchor)
+    finally:
+        conn.execute("COMMIT")
+    return _Index(version, uri, anchor, os.getpid())
+
+
+def _current_index() -> _Index:
+    """
+    The process's in-memory KB, rebuilt when the file's version stamp has
+    moved (checked at most every KB_RELOAD_INTERVAL). A new copy is built
+    completely before it replaces the old one, so a search never sees a
+    half-loaded index; threads that find the check already running keep
+    using the current copy instead of waiting.
+    """
+    global _index, _index_checked, _retired
+
+    index = _index
+    if index is not None and index.pid == os.getpid():
+        if time.monotonic() - _index_checked < KB_RELOAD_INTERVAL:
+            return index
+        if not _index_lock.acquire(blocking=False):
+            return index
+    else:
+        _index_lock.acquire()
+
+    try:
+        index = _index
+        if index is None or index.pid != os.getpid() or kb_version() != index.version:
+            _index = _build_index()
+            if _retired is not None and _retired.pid == os.getpid():
+                # Threads still reading it hold their own connections to it
+                _retired.anchor.close()
+            _retired = index
+        _index_checked = time.monotonic()
+        return _index
+    finally:
+        _index_lock.release()
+
+
+def load_index() -> sqlite3.Connection:
+    """
+    This thread's connection to the process's in-memory copy of the KB.
+    Loading happens once per process; a thread only opens a connection to
+    the shared-cache database, and reopens it after a reload.
+    """
+    index = _current_index()
+    conn = getattr(_local, "index", None)
+    if conn is None or _local.index_uri != index.uri:
+        if conn is not None and _local.index_pid == os.getpid():
+            conn.close()
+        conn = sqlite3.connect(
+            index.uri, uri=True, isolation_level=None, cached_statements=KB_CACHED_STATEMENTS
+        )
+        _local.index = conn
+        _local.index_uri = index.uri
+        _local.index_version = index.version
+        _local.index_pid = os.getpid()
+    return conn
+
+
+def index_version() -> int:
+    """Version of the KB copy this thread searches."""
+    load_index()
+    return _local.index_version
+
+
+def normalize_query(message: str) -> str:
+    """Lowercased words only, so trivially different phrasings share a cache entry."""
+    return " ".join(re.findall(r"\w+", message.lower()))
+
+
+def answer_cache_key(message: str, chunks: list[tuple[str, str]]) -> str:
+    """Cache key for an answer: the normalized question, the retrieved chunks and the KB version."""
+    digest = hashlib.md5(normalize_query(message).encode("utf-8"))
+    for category, content in chunks:
+        digest.update(b"\0" + category.encode("utf-8") + b"\0" + content.encode("utf-8"))
+    return f"chatanswer:v{index_version()}:{digest.hexdigest()}"
+
+
+def get_cached_answer(message: str, chunks: list[tuple[str, str]]) -> str | None:
+    return cache.get(answer_cache_key(message, chunks))
+
+
+def cache_answer(message: str, chunks: list[tuple[str, str]], reply: str) -> None:
+    cache.set(answer_cache_key(message, chunks), reply, ANSWER_CACHE_TIMEOUT)
+
+
+def seed_kb():
+    conn = get_connection()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Replace the hand-written chunks only; indexed site content stays
+        conn.execute("DELETE FROM chunks WHERE rowid NOT IN (SELECT chunk_id FROM doc_chunks)")
+        conn.executemany(
+            "INSERT INTO chunks(category, content) VALUES (?, ?)",
+            [(c["category"], c["content"]) for c in CHUNKS],
+        )
+        bump_kb_version(conn)
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
     return len(CHUNKS)
 
 
@@ -223,41 +420,29 @@ def search_kb(query: str, limit: int = 4) -> list[str]:
 
 def search_kb_with_category(query: str, limit: int = 4) -> list[tuple[str, str]]:
     """Returns list of (category, content) ordered by FTS rank."""
-    if not os.path.exists(KB_PATH):
-        return []
-    conn = sqlite3.connect(KB_PATH)
     try:
-        rows = conn.execute(
+        return load_index().execute(
             "SELECT category, content FROM chunks WHERE chunks MATCH ? ORDER BY rank LIMIT ?",
             (query, limit),
         ).fetchall()
     except sqlite3.OperationalError:
-        rows = []
-    conn.close()
-    return rows
+        # FTS5 query syntax errors (stray quotes, operators) count as no match
+        return []
 
 
 def is_ip_blocked(ip: str) -> bool:
-    if not os.path.exists(KB_PATH):
-        return False
-    conn = sqlite3.connect(KB_PATH)
     try:
-        row = conn.execute(
+        row = get_connection().execute(
             "SELECT 1 FROM ip_blocks WHERE ip = ? AND blocked_until > ?",
             (ip, int(time.time())),
         ).fetchone()
     except sqlite3.OperationalError:
         row = None
-    conn.close()
     return row is not None
 
 
 def block_ip(ip: str) -> None:
-    init_kb()
-    conn = sqlite3.connect(KB_PATH)
-    conn.execute(
+    get_connection().execute(
         "INSERT OR REPLACE INTO ip_blocks (ip, blocked_until) VALUES (?, ?)",
         (ip, int(time.time()) + IP_BLOCK_DURATION),
     )
-    conn.commit()
-    conn.close()
@@ -0,0 +1,27 @@
+"""
+Management command to index published blog posts and research into the chat KB.
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.chat.indexer import index_documents
+
+
+class Command(BaseCommand):
+    help = "Index published blog posts and research (incrementally) into the chat knowledge base"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Ignore the updated_at watermarks and reindex every document",
+        )
+
+    def handle(self, *args, **options):
+        stats = index_documents(full=options["full"])
+        for source, counts in stats.items():
+            self.stdout.write(
+                f"  {source}: {counts['documents']} reindexed, "
+                f"{counts['removed']} removed, {counts['chunks']} chunks"
+            )
+        self.stdout.write(self.style.SUCCESS("Chat knowledge base is up to date"))
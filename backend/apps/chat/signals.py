@@ -0,0 +1,39 @@
+"""
+Keep the chat knowledge base in step with published content: saving or
+deleting a blog post, research article or one of their translations updates
+that document's chunks once the transaction commits. Only the changed
+document is read and written; index_chat_kb catches up on anything else.
+"""
+
+import logging
+import sqlite3
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from .indexer import SOURCES_BY_MODEL, index_object, remove_object
+
+logger = logging.getLogger(__name__)
+
+
+def _update_kb(update, *args):
+    # A KB problem must never fail the save that triggered it
+    try:
+        update(*args)
+    except sqlite3.Error:
+        logger.exception("Updating the chat knowledge base failed")
+
+
+def reindex_on_save(sender, instance, **kwargs):
+    transaction.on_commit(lambda: _update_kb(index_object, instance))
+
+
+def remove_on_delete(sender, instance, **kwargs):
+    # Django clears instance.pk after the delete; take it now
+    pk = instance.pk
+    transaction.on_commit(lambda: _update_kb(remove_object, sender, pk))
+
+
+for model in SOURCES_BY_MODEL:
+    post_save.connect(reindex_on_save, sender=model, dispatch_uid=f"chat-kb-save-{model.__name__}")
+    post_delete.connect(remove_on_delete, sender=model, dispatch_uid=f"chat-kb-delete-{model.__name__}")
@@ -0,0 +1,124 @@
+import os
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from apps.blog.models import BlogPost, BlogPostTranslation
+
+from . import knowledge
+from .indexer import WATERMARK_LAG, chunk_text, index_documents, plain_text
+
+
+class PlainTextTests(SimpleTestCase):
+    def test_strips_markdown(self):
+        markdown = "## Results\n> **Bold** claim with a [link](https://example.com) ![chart](c.png)\n- `item`"
+        self.assertEqual(plain_text(markdown), "Results\nBold claim with a link \nitem")
+
+
+class ChunkTextTests(SimpleTestCase):
+    def test_packs_paragraphs_up_to_the_size(self):
+        text = "First paragraph.\n\nSecond   paragraph\nwraps.\n\n\nThird."
+        self.assertEqual(chunk_text(text, size=40), ["First paragraph. Second paragraph wraps.", "Third."])
+
+    def test_splits_long_paragraphs_on_sentences(self):
+        text = "One sentence here. Another one there! A third?"
+        self.assertEqual(chunk_text(text, size=20), ["One sentence here.", "Another one there!", "A third?"])
+
+    def test_cuts_an_overlong_sentence(self):
+        chunks = chunk_text("x" * 25, size=10)
+        self.assertEqual(chunks, ["x" * 10, "x" * 10, "x" * 5])
+
+    def test_empty_text(self):
+        self.assertEqual(chunk_text(""), [])
+        self.assertEqual(chunk_text("\n\n  \n\n"), [])
+
+
+class IndexerTests(TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        # A private KB file and fresh per-thread connections for each test
+        patcher = mock.patch.multiple(
+            knowledge,
+            KB_PATH=os.path.join(tmpdir.name, "kb.sqlite3"),
+            _local=threading.local(),
+            _schema_ready=False,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.close_kb)
+
+    def close_kb(self):
+        conn = getattr(knowledge._local, "conn", None)
+        if conn is not None:
+            conn.close()
+
+    def chunk_count(self, source, doc_id):
+        return knowledge.get_connection().execute(
+            "SELECT count(*) FROM doc_chunks WHERE source = ? AND doc_id = ?", (source, doc_id)
+        ).fetchone()[0]
+
+    def create_post(self, slug, **fields):
+        fields = {"title": slug.title(), "excerpt": "About tiles.", "status": "published", **fields}
+        with self.captureOnCommitCallbacks(execute=True):
+            return BlogPost.objects.create(slug=slug, **fields)
+
+    def test_save_indexes_the_post_and_unpublishing_removes_it(self):
+        post = self.create_post("tiles")
+        self.assertEqual(self.chunk_count("blog", post.pk), 1)
+
+        post.status = "draft"
+        with self.captureOnCommitCallbacks(execute=True):
+            post.save()
+        self.assertEqual(self.chunk_count("blog", post.pk), 0)
+
+    def test_translations_follow_their_post(self):
+        post = self.create_post("tiles")
+        with self.captureOnCommitCallbacks(execute=True):
+            translation = BlogPostTranslation.objects.create(
+                post=post, language="nl", title="Tegels", excerpt="Over tegels."
+            )
+        self.assertEqual(self.chunk_count("blog_translation", translation.pk), 1)
+
+        post.status = "archived"
+        with self.captureOnCommitCallbacks(execute=True):
+            post.save()
+        self.assertEqual(self.chunk_count("blog_translation", translation.pk), 0)
+
+    def test_delete_removes_the_chunks(self):
+        post = self.create_post("tiles")
+        pk = post.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            post.delete()
+        self.assertEqual(self.chunk_count("blog", pk), 0)
+
+    def test_premium_posts_index_only_their_summary(self):
+        post = self.create_post("premium", is_premium=True, content="Paid body.")
+        content = knowledge.get_connection().execute("SELECT content FROM chunks").fetchone()[0]
+        self.assertIn("About tiles.", content)
+        self.assertNotIn("Paid body.", content)
+        self.assertEqual(self.chunk_count("blog", post.pk), 1)
+
+    def test_watermark_trails_the_run_so_late_commits_are_picked_up(self):
+        post = self.create_post("tiles")
+        index_documents()
+        watermark = datetime.fromisoformat(
+            knowledge.get_connection()
+            .execute("SELECT updated_at FROM index_watermarks WHERE source = 'blog'")
+            .fetchone()[0]
+        )
+        self.assertLessEqual(watermark, timezone.now() - WATERMARK_LAG)
+
+        # Saved just before that run started but committed after it: the row
+        # max would have moved the watermark past it
+        BlogPost.objects.filter(pk=post.pk).update(
+            excerpt="Late commit.", updated_at=watermark + timedelta(seconds=1)
+        )
+        stats = index_documents()
+        self.assertEqual(stats["blog"]["documents"], 1)
+        content = knowledge.get_connection().execute("SELECT content FROM chunks").fetchone()[0]
+        self.assertIn("Late commit.", content)
@@ -0,0 +1,165 @@
+import json
+import os
+import tempfile
+import threading
+from unittest import mock
+
+import requests
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from . import knowledge, views
+from .knowledge import answer_cache_key, normalize_query, seed_kb
+
+QUESTION = "Bocconi University"
+
+
+class ChatTestCase(SimpleTestCase):
+    """Runs against a freshly seeded KB file, an empty cache and a configured API key."""
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        patchers = [
+            mock.patch.multiple(
+                knowledge,
+                KB_PATH=os.path.join(tmpdir.name, "kb.sqlite3"),
+                _local=threading.local(),
+                _schema_ready=False,
+                _index=None,
+                _retired=None,
+            ),
+            mock.patch.multiple(views, MINIMAX_API_KEY="key", INTERNAL_PROXY_SECRET=""),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(self.close_kb)
+        seed_kb()
+        cache.clear()
+
+    def close_kb(self):
+        for name in ("conn", "index"):
+            conn = getattr(knowledge._local, name, None)
+            if conn is not None:
+                conn.close()
+        if knowledge._index is not None:
+            knowledge._index.anchor.close()
+
+    def post(self, name, message=QUESTION):
+        return self.client.post(
+            reverse(name), json.dumps({"message": message}), content_type="application/json"
+        )
+
+
+class AnswerCacheKeyTests(ChatTestCase):
+    CHUNKS = [("bio", "Ian studied at Bocconi.")]
+
+    def test_normalizes_case_and_punctuation(self):
+        self.assertEqual(normalize_query("  What's  PostGIS?? "), "what s postgis")
+        self.assertEqual(
+            answer_cache_key("Bocconi University?", self.CHUNKS),
+            answer_cache_key("bocconi   university", self.CHUNKS),
+        )
+
+    def test_depends_on_the_context_and_the_kb_version(self):
+        key = answer_cache_key(QUESTION, self.CHUNKS)
+
+        self.assertNotEqual(answer_cache_key(QUESTION, [("bio", "Ian studied in Milan.")]), key)
+        seed_kb()
+        # The in-memory copy reloads at most every KB_RELOAD_INTERVAL
+        with mock.patch.object(knowledge, "_index_checked", 0.0):
+            self.assertNotEqual(answer_cache_key(QUESTION, self.CHUNKS), key)
+
+
+@mock.patch.object(views, "daily_cap_reached", return_value=False)
+@mock.patch.object(views, "_call_minimax", return_value="Ian studied at Bocconi.")
+class ChatAnswerCacheTests(ChatTestCase):
+    def test_repeat_question_is_answered_from_the_cache(self, call_minimax, daily_cap_reached):
+        first = self.post("chat").json()
+        second = self.post("chat", "BOCCONI  university").json()
+
+        self.assertEqual(first, {"reply": "Ian studied at Bocconi.", "category": "education"})
+        self.assertEqual(second, first)
+        # The cached reply costs no API call and doesn't count against the cap
+        call_minimax.assert_called_once()
+        daily_cap_reached.assert_called_once()
+
+    def test_off_topic_replies_are_not_cached(self, call_minimax, daily_cap_reached):
+        call_minimax.return_value = "OFFTOPIC"
+
+        self.assertTrue(self.post("chat").json()["blocked"])
+        chunks = knowledge.search_kb_with_category(QUESTION)
+        self.assertIsNone(cache.get(answer_cache_key(QUESTION, chunks)))
+
+
+def sse_events(response):
+    """(event, data) pairs of a text/event-stream response."""
+    events = []
+    for block in b"".join(response.streaming_content).decode().split("\n\n"):
+        if block:
+            event, data = block.split("\n")
+            events.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+@mock.patch.object(views, "daily_cap_reached", return_value=False)
+@mock.patch.object(views, "_stream_minimax")
+class ChatStreamTests(ChatTestCase):
+    def test_relays_fragments_then_done_and_caches_the_answer(self, stream_minimax, daily_cap_reached):
+        stream_minimax.return_value = iter(["Ian studied ", "at Bocconi."])
+        response = self.post("chat-stream")
+
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertEqual(
+            sse_events(response),
+            [
+                ("token", {"text": "Ian studied "}),
+                ("token", {"text": "at Bocconi."}),
+                ("done", {"category": "education"}),
+            ],
+        )
+        # The repeat arrives from the cache as one token event
+        self.assertEqual(
+            sse_events(self.post("chat-stream")),
+            [("token", {"text": "Ian studied at Bocconi."}), ("done", {"category": "education"})],
+        )
+        stream_minimax.assert_called_once()
+
+    def test_holds_back_a_possible_off_topic_marker(self, stream_minimax, daily_cap_reached):
+        stream_minimax.return_value = iter(["OFF", "TOPIC"])
+
+        self.assertEqual(
+            sse_events(self.post("chat-stream")),
+            [("token", {"text": views.OFF_TOPIC_REPLY}), ("done", {"blocked": True})],
+        )
+        self.assertTrue(knowledge.is_ip_blocked("127.0.0.1"))
+
+    def test_releases_held_back_text_that_is_not_the_marker(self, stream_minimax, daily_cap_reached):
+        stream_minimax.return_value = iter(["Of", "f campus, ", "Ian studied."])
+
+        events = sse_events(self.post("chat-stream"))
+
+        self.assertEqual(events[0], ("token", {"text": "Off campus, "}))
+        text = "".join(data["text"] for event, data in events if event == "token")
+        self.assertEqual(text, "Off campus, Ian studied.")
+
+    def test_reports_api_failures_as_an_error_event(self, stream_minimax, daily_cap_reached):
+        def failing():
+            yield "Ian "
+            raise requests.ConnectionError("reset")
+
+        stream_minimax.return_value = failing()
+
+        events = sse_events(self.post("chat-stream"))
+
+        self.assertEqual(events[0], ("token", {"text": "Ian "}))
+        self.assertEqual(events[-1], ("error", {"error": "MiniMax error: reset"}))
+
+    def test_gate_errors_stay_plain_json(self, stream_minimax, daily_cap_reached):
+        response = self.post("chat-stream", "hi")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "message too short"})
+        stream_minimax.assert_not_called()
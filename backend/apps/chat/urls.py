@@ -3,4 +3,5 @@ from . import views
 
 urlpatterns = [
     path("", views.chat, name="chat"),
+    path("stream/", views.chat_stream, name="chat-stream"),
 ]
@@ -1,16 +1,19 @@
 import json
 import os
+from typing import NamedTuple
 
 import requests
 from django.core.cache import cache
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 
 from .knowledge import (
     SYSTEM_PROMPT,
     block_ip,
+    cache_answer,
     daily_cap_reached,
+    get_cached_answer,
     is_ip_blocked,
     search_kb_with_category,
 )
@@ -56,47 +59,85 @@ def _get_ip(request) -> str:
     return request.META.get("REMOTE_ADDR", "unknown")
 
 
-def _call_minimax(context: str, user_message: str) -> str:
+def _minimax_request(context: str, user_message: str, stream: bool = False) -> dict:
     system = f"{SYSTEM_PROMPT}\n\nContext:\n{context}"
-    resp = requests.post(
-        MINIMAX_URL,
-        headers={
+    return {
+        "headers": {
             "Authorization": f"Bearer {MINIMAX_API_KEY}",
             "Content-Type": "application/json",
         },
-        json={
+        "json": {
             "model": MINIMAX_MODEL,
             "messages": [
                 {"role": "system", "content": system},
                 {"role": "user", "content": user_message},
             ],
+            "stream": stream,
         },
-        timeout=15,
-    )
+        # With stream=True this bounds the wait for each chunk, not the whole reply
+        "timeout": 15,
+    }
+
+
+def _call_minimax(context: str, user_message: str) -> str:
+    resp = requests.post(MINIMAX_URL, **_minimax_request(context, user_message))
     resp.raise_for_status()
     data = resp.json()
     return data["choices"][0]["message"]["content"]
 
 
-@csrf_exempt
-@require_POST
-def chat(request):
+def _stream_minimax(context: str, user_message: str):
+    """Yield reply text fragments as MiniMax streams them (OpenAI-style SSE deltas)."""
+    with requests.post(
+        MINIMAX_URL, stream=True, **_minimax_request(context, user_message, stream=True)
+    ) as resp:
+        resp.raise_for_status()
+        resp.encoding = "utf-8"
+        for line in resp.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            choices = json.loads(data).get("choices") or [{}]
+            fragment = (choices[0].get("delta") or {}).get("content")
+            if fragment:
+                yield fragment
+
+
+class Turn(NamedTuple):
+    """A chat message that passed every gate and needs an LLM reply."""
+
+    message: str
+    ip: str
+    chunks: list[tuple[str, str]]
+    category: str
+    context: str
+
+
+def _prepare(request) -> tuple[dict | None, int, Turn | None]:
+    """
+    Run the gates shared by chat and chat_stream, cheapest first.
+
+    Returns (payload, status, None) when a gate answers the request itself,
+    or (None, 200, turn) when the message should go to MiniMax.
+    """
     # Proxy-secret gate: if INTERNAL_PROXY_SECRET is configured, the request must
     # carry a matching secret header (i.e. it transited the trusted Next proxy).
     # Unset/empty => not configured => stay permissive.
     if INTERNAL_PROXY_SECRET and not _proxy_secret_ok(request):
-        return JsonResponse({"error": "forbidden"}, status=403)
+        return {"error": "forbidden"}, 403, None
 
     try:
         body = json.loads(request.body)
     except (json.JSONDecodeError, UnicodeDecodeError):
-        return JsonResponse({"error": "Invalid JSON"}, status=400)
+        return {"error": "Invalid JSON"}, 400, None
 
     message = str(body.get("message", "")).strip()
 
     # Length gates
     if len(message) < MIN_MESSAGE_LEN:
-        return JsonResponse({"error": "message too short"}, status=400)
+        return {"error": "message too short"}, 400, None
     message = message[:MAX_MESSAGE_LEN]
 
     ip = _get_ip(request)
@@ -112,51 +153,128 @@ def chat(request):
         cache.set(rl_key, 1, 60)
         count = 1
     if count > CHAT_RATE_PER_MIN:
-        return JsonResponse({"error": "rate_limited"}, status=429)
+        return {"error": "rate_limited"}, 429, None
 
     # IP block gate
     if is_ip_blocked(ip):
-        return JsonResponse({"reply": OFF_TOPIC_REPLY, "blocked": True})
+        return {"reply": OFF_TOPIC_REPLY, "blocked": True}, 200, None
 
     # FTS gate — if no relevant chunks exist, skip MiniMax entirely
     chunks_with_cats = search_kb_with_category(message)
     if not chunks_with_cats:
-        return JsonResponse({"reply": OFF_TOPIC_REPLY})
+        return {"reply": OFF_TOPIC_REPLY}, 200, None
 
     top_category = chunks_with_cats[0][0]
     context = "\n\n".join(c[1] for c in chunks_with_cats)
 
+    # Answer cache — a repeat question over the same context costs no API call
+    # and doesn't count against the daily cap.
+    cached = get_cached_answer(message, chunks_with_cats)
+    if cached is not None:
+        return {"reply": cached, "category": top_category}, 200, None
+
     if not MINIMAX_API_KEY:
-        return JsonResponse(
-            {
-                "reply": (
-                    "The AI assistant is not yet configured on this server. "
-                    "Set MINIMAX_API_KEY in the backend environment to enable it."
-                ),
-                "category": top_category,
-            }
-        )
+        return {
+            "reply": (
+                "The AI assistant is not yet configured on this server. "
+                "Set MINIMAX_API_KEY in the backend environment to enable it."
+            ),
+            "category": top_category,
+        }, 200, None
 
     # Global daily cost cap — short-circuit before the paid API call.
     if daily_cap_reached():
-        return JsonResponse(
-            {
-                "reply": (
-                    "The assistant is taking a short break for today. "
-                    "Please try again later, or reach Ian directly at ianronk0@gmail.com."
-                ),
-                "category": top_category,
-            }
-        )
+        return {
+            "reply": (
+                "The assistant is taking a short break for today. "
+                "Please try again later, or reach Ian directly at ianronk0@gmail.com."
+            ),
+            "category": top_category,
+        }, 200, None
+
+    return None, 200, Turn(message, ip, chunks_with_cats, top_category, context)
+
+
+@csrf_exempt
+@require_POST
+def chat(request):
+    payload, status, turn = _prepare(request)
+    if turn is None:
+        return JsonResponse(payload, status=status)
 
     try:
-        reply = _call_minimax(context, message)
+        reply = _call_minimax(turn.context, turn.message)
     except requests.RequestException as exc:
         return JsonResponse({"error": f"MiniMax error: {exc}"}, status=502)
 
     # Off-topic detection — MiniMax signals with the single word OFFTOPIC
     if reply.strip().upper() == "OFFTOPIC":
-        block_ip(ip)
+        block_ip(turn.ip)
         return JsonResponse({"reply": OFF_TOPIC_REPLY, "blocked": True})
 
-    return JsonResponse({"reply": reply, "category": top_category})
+    cache_answer(turn.message, turn.chunks, reply)
+    return JsonResponse({"reply": reply, "category": turn.category})
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _sse_reply(payload: dict):
+    """A complete reply as a single token event followed by done."""
+    yield _sse("token", {"text": payload["reply"]})
+    yield _sse("done", {k: v for k, v in payload.items() if k != "reply"})
+
+
+def _sse_stream(turn: Turn):
+    """Relay MiniMax fragments as token events, then done (or error)."""
+    parts = []
+    # Held back while the reply could still be the bare OFFTOPIC marker
+    pending = ""
+    try:
+        for fragment in _stream_minimax(turn.context, turn.message):
+            parts.append(fragment)
+            if pending is None:
+                yield _sse("token", {"text": fragment})
+                continue
+            pending += fragment
+            if not "OFFTOPIC".startswith(pending.strip().upper()):
+                yield _sse("token", {"text": pending})
+                pending = None
+    except (requests.RequestException, ValueError) as exc:
+        yield _sse("error", {"error": f"MiniMax error: {exc}"})
+        return
+
+    reply = "".join(parts)
+    if reply.strip().upper() == "OFFTOPIC":
+        block_ip(turn.ip)
+        yield from _sse_reply({"reply": OFF_TOPIC_REPLY, "blocked": True})
+        return
+    if pending:
+        yield _sse("token", {"text": pending})
+
+    cache_answer(turn.message, turn.chunks, reply)
+    yield _sse("done", {"category": turn.category})
+
+
+@csrf_exempt
+@require_POST
+def chat_stream(request):
+    """
+    Same gates as chat, but the reply is sent as server-sent events while
+    MiniMax generates it: token events ({"text"}) and a final done event
+    ({"category"} or {"blocked"}), or an error event. Gate failures are plain
+    JSON errors with their status code; gate replies arrive as one token event.
+    """
+    payload, status, turn = _prepare(request)
+    if turn is None and status != 200:
+        return JsonResponse(payload, status=status)
+
+    response = StreamingHttpResponse(
+        _sse_reply(payload) if turn is None else _sse_stream(turn),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    # Stop nginx-style proxies from buffering the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,219 @@
+"""
+Query-parameter filters for GeoFeature querysets.
+Invalid input raises ValueError, which views turn into a 400 response.
+"""
+
+import math
+
+from django.contrib.gis.geos import GEOSException, GEOSGeometry, Polygon
+from django.db.models.lookups import Exact, GreaterThanOrEqual, In, LessThanOrEqual
+
+from .models import GeoFeature
+from .services.geojson_output import DEFAULT_PRECISION
+from .services.property_indexes import PROPERTY_CASTS, property_expression
+
+# Degrees covered by one pixel of a 256px web map tile at zoom 0
+DEGREES_PER_PIXEL_Z0 = 360 / 256
+MAX_ZOOM = 24
+MAX_PRECISION = 15
+MAX_WHERE_VALUES = 100
+
+
+def parse_bbox(value: str) -> Polygon:
+    """Parse 'minx,miny,maxx,maxy' (EPSG:4326) into a polygon."""
+    try:
+        minx, miny, maxx, maxy = (float(part) for part in value.split(","))
+    except ValueError:
+        raise ValueError("bbox must be four comma-separated numbers: minx,miny,maxx,maxy")
+
+    if minx > maxx or miny > maxy:
+        raise ValueError("bbox min values must not exceed max values")
+
+    bbox = Polygon.from_bbox((minx, miny, maxx, maxy))
+    bbox.srid = 4326
+    return bbox
+
+
+def parse_wkt(value: str) -> GEOSGeometry:
+    """Parse a WKT (or EWKT) geometry, assuming EPSG:4326 when no SRID is given."""
+    try:
+        geometry = GEOSGeometry(value)
+    except (GEOSException, ValueError, TypeError):
+        raise ValueError("intersects must be a valid WKT geometry")
+
+    if geometry.srid is None:
+        geometry.srid = 4326
+    return geometry
+
+
+def filter_features(queryset, params):
+    """
+    Apply spatial filters from query parameters to a GeoFeature queryset.
+
+    bbox uses the index-only && operator; intersects runs an exact
+    ST_Intersects test. Both are served by the (dataset, geometry) GiST index.
+    """
+    bbox = params.get("bbox")
+    if bbox:
+        queryset = queryset.filter(geometry__bboverlaps=parse_bbox(bbox))
+
+    intersects = params.get("intersects")
+    if intersects:
+        queryset = queryset.filter(geometry__intersects=parse_wkt(intersects))
+
+    return queryset
+
+
+def _where_value(raw: str, field: str, field_type: str | None):
+    """Convert a where= operand to the type its property is compared as."""
+    cast = PROPERTY_CASTS.get(field_type)
+    if cast == "double precision":
+        try:
+            return float(raw)
+        except ValueError:
+            raise ValueError(f"where: {field} is numeric, got {raw!r}")
+    if cast == "boolean":
+        lowered = raw.lower()
+        if lowered not in ("true", "false", "1", "0"):
+            raise ValueError(f"where: {field} is boolean, got {raw!r}")
+        return lowered in ("true", "1")
+    return raw
+
+
+def parse_where(value: str, field_types: dict[str, str], available_fields: list[str]):
+    """
+    Parse one where= condition into a lookup on the typed property value:
+
+        field:value       equality
+        field:lo..hi      inclusive range; either bound may be left out
+        field:in(a,b,c)   any of the listed values
+    """
+    field, separator, condition = value.partition(":")
+    if not separator or not field or not condition:
+        raise ValueError("where must look like field:value, field:lo..hi or field:in(a,b)")
+    if field not in available_fields:
+        raise ValueError(f"where: unknown field {field!r}")
+
+    field_type = field_types.get(field)
+    expression = property_expression(field, field_type)
+
+    if condition.startswith("in(") and condition.endswith(")"):
+        items = [item for item in condition[3:-1].split(",") if item != ""]
+        if not items:
+            raise ValueError(f"where: empty in() list for {field}")
+        if len(items) > MAX_WHERE_VALUES:
+            raise ValueError(f"where: at most {MAX_WHERE_VALUES} values in an in() list")
+        return [In(expression, [_where_value(item, field, field_type) for item in items])]
+
+    if ".." in condition:
+        low, high = condition.split("..", 1)
+        if low == "" and high == "":
+            raise ValueError(f"where: range for {field} needs at least one bound")
+        lookups = []
+        if low != "":
+            lookups.append(GreaterThanOrEqual(expression, _where_value(low, field, field_type)))
+        if high != "":
+            lookups.append(LessThanOrEqual(expression, _where_value(high, field, field_type)))
+        return lookups
+
+    return [Exact(expression, _where_value(condition, field, field_type))]
+
+
+def filter_properties(queryset, params, dataset):
+    """
+    Apply repeated where= conditions (ANDed) to a dataset's GeoFeature queryset.
+
+    The typed expressions match the ones index_dataset_properties builds, so
+    indexed fields are filtered by index scan; others fall back to a scan.
+    """
+    for value in params.getlist("where"):
+        queryset = queryset.filter(
+            *parse_where(value, dataset.field_types, dataset.available_fields)
+        )
+    return queryset
+
+
+def parse_int(params, name: str, default: int, minimum: int, maximum: int) -> int:
+    """Read an optional bounded integer query parameter."""
+    value = params.get(name)
+    if value in (None, ""):
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer")
+    if not minimum <= value <= maximum:
+        raise ValueError(f"{name} must be between {minimum} and {maximum}")
+    return value
+
+
+def parse_zoom(params) -> float | None:
+    """Read an optional web map zoom level from query parameters."""
+    zoom = params.get("zoom")
+    if zoom in (None, ""):
+        return None
+    try:
+        zoom = float(zoom)
+    except ValueError:
+        raise ValueError("zoom must be a number")
+    if not 0 <= zoom <= MAX_ZOOM:
+        raise ValueError(f"zoom must be between 0 and {MAX_ZOOM}")
+    return zoom
+
+
+def parse_tolerance(params) -> float | None:
+    """
+    Simplification tolerance in degrees, from an explicit tolerance parameter
+    or derived from zoom (one pixel at that zoom). None means full resolution.
+    """
+    tolerance = params.get("tolerance")
+    if tolerance not in (None, ""):
+        try:
+            tolerance = float(tolerance)
+        except ValueError:
+            raise ValueError("tolerance must be a number")
+        if tolerance < 0:
+            raise ValueError("tolerance must not be negative")
+        return tolerance
+
+    zoom = parse_zoom(params)
+    if zoom is None:
+        return None
+    return DEGREES_PER_PIXEL_Z0 / 2**zoom
+
+
+def geometry_column(params) -> str:
+    """
+    Pick the GeoFeature geometry column to serve: the coarsest precomputed
+    simplification level whose tolerance doesn't exceed the requested one.
+    """
+    tolerance = parse_tolerance(params)
+    if tolerance is None:
+        return "geometry"
+
+    for column, level_tolerance in GeoFeature.SIMPLIFICATION_LEVELS.items():
+        if level_tolerance <= tolerance:
+            return column
+    return "geometry"
+
+
+def parse_precision(params, default: int | None = DEFAULT_PRECISION) -> int | None:
+    """
+    Number of coordinate decimals to serve: the explicit precision parameter,
+    else enough digits to resolve one pixel at the requested zoom, else default.
+    """
+    precision = params.get("precision")
+    if precision not in (None, ""):
+        try:
+            precision = int(precision)
+        except ValueError:
+            raise ValueError("precision must be an integer")
+        if not 0 <= precision <= MAX_PRECISION:
+            raise ValueError(f"precision must be between 0 and {MAX_PRECISION}")
+        return precision
+
+    zoom = parse_zoom(params)
+    if zoom is None:
+        return default
+    pixel = DEGREES_PER_PIXEL_Z0 / 2**zoom
+    return min(MAX_PRECISION, max(0, math.ceil(-math.log10(pixel))))
@@ -0,0 +1,43 @@
+"""
+Management command to add or drop per-dataset expression indexes on feature properties.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.geodata.models import GeoUploadedDataset
+from apps.geodata.services import property_indexes
+
+
+class Command(BaseCommand):
+    help = "Index properties of an uploaded dataset for where= filtering"
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset_id", type=int)
+        parser.add_argument("fields", nargs="+", help="Property names to index")
+        parser.add_argument(
+            "--drop",
+            action="store_true",
+            help="Drop the indexes on these fields instead of creating them",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            dataset = GeoUploadedDataset.objects.get(pk=options["dataset_id"])
+        except GeoUploadedDataset.DoesNotExist:
+            raise CommandError(f"Dataset {options['dataset_id']} not found")
+
+        for field in options["fields"]:
+            if options["drop"]:
+                property_indexes.drop_index(dataset, field)
+                self.stdout.write(f"  dropped index on {field}")
+                continue
+            try:
+                property_indexes.create_index(dataset, field)
+            except ValueError as e:
+                raise CommandError(str(e))
+            field_type = dataset.field_types.get(field, "string")
+            self.stdout.write(f"  indexed {field} ({field_type})")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{dataset.name}: indexed fields {dataset.indexed_fields or 'none'}"
+        ))
@@ -0,0 +1,68 @@
+"""
+Management command that runs queued geodata ingest jobs.
+Run one or more of these next to the web workers; the database is the queue.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.geodata.services import ingest_jobs, resumable_uploads
+
+# Seconds between sweeps for abandoned resumable uploads
+EXPIRE_SESSIONS_INTERVAL = 60 * 60
+
+
+class Command(BaseCommand):
+    help = "Process queued GeoIngestJob uploads"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Seconds to wait between polls when the queue is empty",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the queue and exit instead of polling forever",
+        )
+
+    def expire_sessions(self):
+        expired = resumable_uploads.expire_stale_sessions()
+        if expired:
+            self.stdout.write(self.style.WARNING(f"Aborted {expired} abandoned upload(s)"))
+
+    def handle(self, *args, **options):
+        requeued = ingest_jobs.requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(self.style.WARNING(f"Requeued {requeued} stale job(s)"))
+        self.expire_sessions()
+        last_expiry = time.monotonic()
+
+        self.stdout.write("Waiting for ingest jobs...")
+        while True:
+            close_old_connections()
+            if time.monotonic() - last_expiry >= EXPIRE_SESSIONS_INTERVAL:
+                self.expire_sessions()
+                last_expiry = time.monotonic()
+
+            job = ingest_jobs.claim_next_job()
+
+            if job is None:
+                if options["once"]:
+                    return
+                time.sleep(options["poll_interval"])
+                continue
+
+            self.stdout.write(f"Job {job.pk}: ingesting {job.original_filename}")
+            job = ingest_jobs.run_job(job)
+
+            if job.status == "succeeded":
+                self.stdout.write(self.style.SUCCESS(
+                    f"Job {job.pk}: {job.features_ingested} features into dataset {job.dataset_id}"
+                ))
+            else:
+                self.stdout.write(self.style.ERROR(f"Job {job.pk} failed: {job.error}"))
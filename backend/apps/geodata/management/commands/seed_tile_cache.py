@@ -0,0 +1,43 @@
+"""
+Management command to pre-render low zoom vector tiles for an uploaded dataset.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.geodata.models import GeoUploadedDataset
+from apps.geodata.services import tile_cache, tile_range
+
+
+class Command(BaseCommand):
+    help = "Pre-seed the vector tile cache for an uploaded dataset"
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset_id", type=int)
+        parser.add_argument("--min-zoom", type=int, default=0)
+        parser.add_argument("--max-zoom", type=int, default=6)
+        parser.add_argument(
+            "--value-field",
+            default=None,
+            help="Seed tiles projected onto this field (as requested by the map)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            dataset = GeoUploadedDataset.objects.get(pk=options["dataset_id"])
+        except GeoUploadedDataset.DoesNotExist:
+            raise CommandError(f"Dataset {options['dataset_id']} not found")
+
+        value_field = options["value_field"]
+        if value_field and value_field not in dataset.available_fields:
+            raise CommandError(f"Unknown field for this dataset: {value_field}")
+
+        total = 0
+        for z in range(options["min_zoom"], options["max_zoom"] + 1):
+            count = 0
+            for x, y in tile_range(dataset.bounds, z):
+                tile_cache.get_tile(dataset, z, x, y, value_field)
+                count += 1
+            self.stdout.write(f"  z{z}: {count} tiles")
+            total += count
+
+        self.stdout.write(self.style.SUCCESS(f"Seeded {total} tiles for {dataset.name} (v{dataset.version})"))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geodata', '0002_geouploadeddataset_geofeature'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='geouploadeddataset',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
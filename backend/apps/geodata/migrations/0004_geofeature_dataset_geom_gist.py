@@ -0,0 +1,20 @@
+# Generated by Django 5.2.10 on 2026-10-18 10:05
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geodata', '0003_geouploadeddataset_version'),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.AddIndex(
+            model_name='geofeature',
+            index=django.contrib.postgres.indexes.GistIndex(fields=['dataset', 'geometry'], name='geo_feature_dataset_geom_gist'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.10 on 2026-10-18 11:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geodata', '0004_geofeature_dataset_geom_gist'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeoIngestJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('staged_path', models.CharField(help_text='Uploaded file in the staging directory', max_length=500)),
+                ('original_filename', models.CharField(max_length=255)),
+                ('name', models.CharField(blank=True, max_length=255)),
+                ('description', models.TextField(blank=True)),
+                ('total_features', models.IntegerField(blank=True, null=True)),
+                ('features_ingested', models.IntegerField(default=0)),
+                ('result', models.JSONField(blank=True, help_text='GeoProcessor result on success', null=True)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('dataset', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ingest_jobs', to='geodata.geouploadeddataset')),
+            ],
+            options={
+                'verbose_name': 'Ingest Job',
+                'verbose_name_plural': 'Ingest Jobs',
+                'db_table': 'geo_ingest_jobs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='geo_ingest__status_61d459_idx')],
+            },
+        ),
+    ]
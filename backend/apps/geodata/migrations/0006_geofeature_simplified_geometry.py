@@ -0,0 +1,29 @@
+# Generated by Django 5.2.10 on 2026-10-18 12:41
+
+import django.contrib.gis.db.models.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geodata', '0005_geoingestjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='geofeature',
+            name='geometry_high',
+            field=django.contrib.gis.db.models.fields.GeometryField(blank=True, null=True, spatial_index=False, srid=4326),
+        ),
+        migrations.AddField(
+            model_name='geofeature',
+            name='geometry_low',
+            field=django.contrib.gis.db.models.fields.GeometryField(blank=True, null=True, spatial_index=False, srid=4326),
+        ),
+        migrations.AddField(
+            model_name='geofeature',
+            name='geometry_medium',
+            field=django.contrib.gis.db.models.fields.GeometryField(blank=True, null=True, spatial_index=False, srid=4326),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-18 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geodata', '0006_geofeature_simplified_geometry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='geouploadeddataset',
+            name='indexed_fields',
+            field=models.JSONField(blank=True, default=list, help_text='Fields with a per-dataset expression index (see index_dataset_properties)'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.10 on 2026-10-18 15:10
+
+import django.contrib.gis.db.models.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geodata', '0007_geouploadeddataset_indexed_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeoH3Cell',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.PositiveSmallIntegerField()),
+                ('cell', models.CharField(help_text='H3 cell index (hex)', max_length=16)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('sums', models.JSONField(default=dict, help_text="Sum of each numeric field over the cell's features")),
+                ('value_counts', models.JSONField(default=dict, help_text='Number of features with a value for each numeric field')),
+                ('geometry', django.contrib.gis.db.models.fields.PolygonField(srid=4326)),
+                ('dataset', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='h3_cells', to='geodata.geouploadeddataset')),
+            ],
+            options={
+                'verbose_name': 'H3 cell aggregate',
+                'verbose_name_plural': 'H3 cell aggregates',
+                'db_table': 'geo_h3_cells',
+                'constraints': [models.UniqueConstraint(fields=('dataset', 'resolution', 'cell'), name='geo_h3_cell_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-18 16:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geodata', '0008_geoh3cell'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='geouploadeddataset',
+            name='source_srid',
+            field=models.IntegerField(blank=True, help_text="EPSG code of the uploaded file's CRS (features are stored in 4326)", null=True),
+        ),
+    ]
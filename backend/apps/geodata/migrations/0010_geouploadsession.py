@@ -0,0 +1,34 @@
+# Generated by Django 5.2.10 on 2026-10-18 17:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geodata', '0009_geouploadeddataset_source_srid'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeoUploadSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('open', 'Open'), ('complete', 'Complete'), ('aborted', 'Aborted')], default='open', max_length=20)),
+                ('original_filename', models.CharField(max_length=255)),
+                ('name', models.CharField(blank=True, max_length=255)),
+                ('description', models.TextField(blank=True)),
+                ('staged_path', models.CharField(help_text='Partial file in the staging directory', max_length=500)),
+                ('total_size', models.BigIntegerField(help_text='Declared file size in bytes')),
+                ('offset', models.BigIntegerField(default=0, help_text='Bytes received so far')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('job', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload_session', to='geodata.geoingestjob')),
+            ],
+            options={
+                'db_table': 'geo_upload_sessions',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.10 on 2026-10-18 18:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geodata', '0010_geouploadsession'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='geoingestjob',
+            name='match_key',
+            field=models.CharField(blank=True, help_text='Property matching features across versions; blank matches by geometry hash', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='geoingestjob',
+            name='update_dataset',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='update_jobs', to='geodata.geouploadeddataset'),
+        ),
+        migrations.AddField(
+            model_name='geouploadsession',
+            name='match_key',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='geouploadsession',
+            name='update_dataset',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to='geodata.geouploadeddataset'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.10 on 2026-10-18 19:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geodata', '0011_update_in_place'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='geoingestjob',
+            name='metrics',
+            field=models.JSONField(blank=True, help_text='Ingest instrumentation (see services.ingest_metrics); kept on failure too', null=True),
+        ),
+        migrations.AddField(
+            model_name='geouploadeddataset',
+            name='ingest_metrics',
+            field=models.JSONField(blank=True, help_text='Phase timings, throughput, invalid geometries and peak memory of the last ingest', null=True),
+        ),
+    ]
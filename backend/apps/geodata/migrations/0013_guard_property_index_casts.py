@@ -0,0 +1,30 @@
+from django.db import migrations
+
+
+def rebuild_property_indexes(apps, schema_editor):
+    # Existing indexes use the unguarded cast, which no longer matches the
+    # expression where= queries produce; rebuild them with the guarded one
+    from apps.geodata.services.property_indexes import _index_sql, index_name
+
+    GeoUploadedDataset = apps.get_model("geodata", "GeoUploadedDataset")
+    quote = schema_editor.connection.ops.quote_name
+    for dataset in GeoUploadedDataset.objects.exclude(indexed_fields=[]):
+        for field in dataset.indexed_fields:
+            # No params: field names are arbitrary text and may contain %
+            schema_editor.execute(
+                f"DROP INDEX CONCURRENTLY IF EXISTS {quote(index_name(dataset.pk, field))}", None
+            )
+            schema_editor.execute(_index_sql(dataset, field), None)
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run in a transaction
+    atomic = False
+
+    dependencies = [
+        ('geodata', '0012_ingest_metrics'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_property_indexes, migrations.RunPython.noop),
+    ]
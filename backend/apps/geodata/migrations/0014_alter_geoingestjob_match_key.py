@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-18 21:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geodata', '0013_guard_property_index_casts'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='geoingestjob',
+            name='match_key',
+            field=models.CharField(blank=True, help_text='Property matching features across versions; blank matches identical features', max_length=255),
+        ),
+    ]
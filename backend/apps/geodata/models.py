@@ -4,6 +4,7 @@ Models for GeoData - stores GeoJSON datasets for visualizations and research.
 
 from django.db import models
 from django.contrib.gis.db import models as gis_models
+from django.contrib.postgres.indexes import GistIndex
 
 
 class GeoDataset(models.Model):
@@ -72,6 +73,11 @@ class GeoUploadedDataset(models.Model):
         help_text="Mapping of field names to their data types"
     )
     feature_count = models.IntegerField(default=0)
+    indexed_fields = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Fields with a per-dataset expression index (see index_dataset_properties)"
+    )
 
     # Bounding box for the dataset
     bounds = models.JSONField(
@@ -79,6 +85,19 @@ class GeoUploadedDataset(models.Model):
         blank=True,
         help_text="Bounding box [minx, miny, maxx, maxy]"
     )
+    source_srid = models.IntegerField(
+        null=True,
+        blank=True,
+        help_text="EPSG code of the uploaded file's CRS (features are stored in 4326)"
+    )
+
+    # Bumped whenever feature content changes; keys the tile cache
+    version = models.PositiveIntegerField(default=1)
+    ingest_metrics = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="Phase timings, throughput, invalid geometries and peak memory of the last ingest"
+    )
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -92,6 +111,11 @@ class GeoUploadedDataset(models.Model):
     def __str__(self):
         return f"{self.name} ({self.feature_count} features)"
 
+    def bump_version(self):
+        """Atomically increment the content version and refresh it on this instance."""
+        GeoUploadedDataset.objects.filter(pk=self.pk).update(version=models.F("version") + 1)
+        self.refresh_from_db(fields=["version"])
+
 
 class GeoFeature(models.Model):
     """
@@ -105,18 +129,198 @@ class GeoFeature(models.Model):
         related_name="features"
     )
     geometry = gis_models.GeometryField(srid=4326)
+
+    # Simplified copies of `geometry` for low zoom levels, computed at ingest with
+    # GEOS' topology-preserving simplifier (ST_SimplifyPreserveTopology).
+    # NULL where there is nothing to simplify (points).
+    geometry_low = gis_models.GeometryField(srid=4326, null=True, blank=True, spatial_index=False)
+    geometry_medium = gis_models.GeometryField(srid=4326, null=True, blank=True, spatial_index=False)
+    geometry_high = gis_models.GeometryField(srid=4326, null=True, blank=True, spatial_index=False)
+
     properties = models.JSONField(
         default=dict,
         help_text="All attribute data from the original feature"
     )
 
+    # Simplified column -> tolerance in degrees, coarsest first
+    SIMPLIFICATION_LEVELS = {
+        "geometry_low": 0.01,  # ~1 km
+        "geometry_medium": 0.001,  # ~100 m
+        "geometry_high": 0.0001,  # ~10 m
+    }
+
     class Meta:
         db_table = "geo_features"
         indexes = [
             models.Index(fields=["dataset"]),
+            # Per-dataset spatial lookups (bbox/intersects); needs btree_gist
+            GistIndex(fields=["dataset", "geometry"], name="geo_feature_dataset_geom_gist"),
         ]
         verbose_name = "GeoFeature"
         verbose_name_plural = "GeoFeatures"
 
     def __str__(self):
         return f"Feature {self.id} from {self.dataset.name}"
+
+
+class GeoH3Cell(models.Model):
+    """
+    Aggregate of a point dataset's features within one H3 hexagon, precomputed
+    at ingest for each resolution in services.h3_aggregates.H3_RESOLUTIONS.
+    """
+
+    dataset = models.ForeignKey(
+        GeoUploadedDataset,
+        on_delete=models.CASCADE,
+        related_name="h3_cells"
+    )
+    resolution = models.PositiveSmallIntegerField()
+    cell = models.CharField(max_length=16, help_text="H3 cell index (hex)")
+    count = models.PositiveIntegerField(default=0)
+    sums = models.JSONField(
+        default=dict,
+        help_text="Sum of each numeric field over the cell's features"
+    )
+    value_counts = models.JSONField(
+        default=dict,
+        help_text="Number of features with a value for each numeric field"
+    )
+    geometry = gis_models.PolygonField(srid=4326)
+
+    class Meta:
+        db_table = "geo_h3_cells"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dataset", "resolution", "cell"], name="geo_h3_cell_unique"
+            ),
+        ]
+        verbose_name = "H3 cell aggregate"
+        verbose_name_plural = "H3 cell aggregates"
+
+    def __str__(self):
+        return f"{self.cell} (res {self.resolution}) of dataset {self.dataset_id}"
+
+
+class GeoIngestJob(models.Model):
+    """
+    A queued ingestion of an uploaded file into a GeoUploadedDataset.
+    Claimed and run by the run_geo_ingest_worker management command.
+    """
+
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("succeeded", "Succeeded"),
+        ("failed", "Failed"),
+    ]
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="queued")
+
+    # Upload details, kept until a worker picks the job up
+    staged_path = models.CharField(max_length=500, help_text="Uploaded file in the staging directory")
+    original_filename = models.CharField(max_length=255)
+    name = models.CharField(max_length=255, blank=True)
+    description = models.TextField(blank=True)
+
+    # Set to update an existing dataset in place instead of creating a new one
+    update_dataset = models.ForeignKey(
+        GeoUploadedDataset,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="update_jobs",
+    )
+    match_key = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text="Property matching features across versions; blank matches identical features"
+    )
+
+    # Progress, written by the worker while the ingest transaction is open
+    total_features = models.IntegerField(null=True, blank=True)
+    features_ingested = models.IntegerField(default=0)
+
+    dataset = models.ForeignKey(
+        GeoUploadedDataset,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="ingest_jobs",
+    )
+    result = models.JSONField(null=True, blank=True, help_text="GeoProcessor result on success")
+    error = models.TextField(blank=True)
+    metrics = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="Ingest instrumentation (see services.ingest_metrics); kept on failure too"
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "geo_ingest_jobs"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+        ]
+        verbose_name = "Ingest Job"
+        verbose_name_plural = "Ingest Jobs"
+
+    def __str__(self):
+        return f"Ingest {self.original_filename} ({self.status})"
+
+
+class GeoUploadSession(models.Model):
+    """
+    A resumable, chunked upload of a large geospatial file.
+
+    Chunks are appended to staged_path at the session's current offset (see
+    services.resumable_uploads); once offset reaches total_size the file is
+    handed to a GeoIngestJob.
+    """
+
+    STATUS_CHOICES = [
+        ("open", "Open"),
+        ("complete", "Complete"),
+        ("aborted", "Aborted"),
+    ]
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="open")
+    original_filename = models.CharField(max_length=255)
+    name = models.CharField(max_length=255, blank=True)
+    description = models.TextField(blank=True)
+
+    staged_path = models.CharField(max_length=500, help_text="Partial file in the staging directory")
+    total_size = models.BigIntegerField(help_text="Declared file size in bytes")
+    offset = models.BigIntegerField(default=0, help_text="Bytes received so far")
+
+    # Passed on to the GeoIngestJob (see GeoIngestJob.update_dataset)
+    update_dataset = models.ForeignKey(
+        GeoUploadedDataset,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="upload_sessions",
+    )
+    match_key = models.CharField(max_length=255, blank=True)
+
+    job = models.OneToOneField(
+        GeoIngestJob,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="upload_session",
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "geo_upload_sessions"
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"Upload {self.pk}: {self.original_filename} ({self.offset}/{self.total_size})"
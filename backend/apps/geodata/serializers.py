@@ -2,9 +2,10 @@
 Serializers for GeoData.
 """
 
+from django.utils import timezone
 from rest_framework import serializers
 
-from .models import GeoDataset, GeoUploadedDataset
+from .models import GeoDataset, GeoIngestJob, GeoUploadedDataset, GeoUploadSession
 
 
 class GeoDatasetListSerializer(serializers.ModelSerializer):
@@ -94,8 +95,12 @@ class GeoUploadedDatasetDetailSerializer(serializers.ModelSerializer):
             "file_format",
             "available_fields",
             "field_types",
+            "indexed_fields",
             "feature_count",
             "bounds",
+            "source_srid",
+            "version",
+            "ingest_metrics",
             "created_at",
             "updated_at",
         ]
@@ -107,6 +112,11 @@ class GeoFileUploadSerializer(serializers.Serializer):
     file = serializers.FileField(required=True)
     name = serializers.CharField(max_length=255, required=False, allow_blank=True)
     description = serializers.CharField(required=False, allow_blank=True, default="")
+    # Update this dataset in place (matching features on match_key) instead of creating one
+    update_dataset = serializers.PrimaryKeyRelatedField(
+        queryset=GeoUploadedDataset.objects.all(), required=False, allow_null=True
+    )
+    match_key = serializers.CharField(max_length=255, required=False, allow_blank=True)
 
     def validate_file(self, value):
         """Validate the uploaded file."""
@@ -129,3 +139,102 @@ class GeoUploadResponseSerializer(serializers.Serializer):
     available_fields = serializers.ListField(child=serializers.CharField())
     field_types = serializers.DictField()
     bounds = serializers.ListField(child=serializers.FloatField(), allow_null=True)
+    source_srid = serializers.IntegerField(required=False, allow_null=True)
+    ingest_seconds = serializers.FloatField(required=False)
+    features_per_second = serializers.FloatField(required=False)
+    geometries_repaired = serializers.IntegerField(required=False)
+    features_skipped = serializers.IntegerField(required=False)
+    h3_cells = serializers.IntegerField(required=False)
+    version = serializers.IntegerField(required=False)
+    # In-place updates only: inserted / updated / deleted / unchanged counts
+    changes = serializers.DictField(child=serializers.IntegerField(), required=False)
+    metrics = serializers.DictField(required=False)
+
+
+class GeoIngestJobSerializer(serializers.ModelSerializer):
+    """Status of a background ingest job, with throughput and ETA."""
+
+    dataset_id = serializers.IntegerField(read_only=True, allow_null=True)
+    progress = serializers.SerializerMethodField()
+    features_per_second = serializers.SerializerMethodField()
+    eta_seconds = serializers.SerializerMethodField()
+
+    class Meta:
+        model = GeoIngestJob
+        fields = [
+            "id",
+            "status",
+            "original_filename",
+            "name",
+            "update_dataset",
+            "match_key",
+            "dataset_id",
+            "features_ingested",
+            "total_features",
+            "progress",
+            "features_per_second",
+            "eta_seconds",
+            "result",
+            "error",
+            "metrics",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+
+    def get_progress(self, obj):
+        """Fraction complete (0-1), or None while the total is unknown."""
+        if obj.status == "succeeded":
+            return 1.0
+        if not obj.total_features:
+            return None
+        return min(1.0, obj.features_ingested / obj.total_features)
+
+    def get_features_per_second(self, obj):
+        if not obj.started_at:
+            return None
+        elapsed = ((obj.finished_at or timezone.now()) - obj.started_at).total_seconds()
+        if elapsed <= 0:
+            return None
+        return round(obj.features_ingested / elapsed, 1)
+
+    def get_eta_seconds(self, obj):
+        if obj.status != "running" or not obj.total_features:
+            return None
+        rate = self.get_features_per_second(obj)
+        if not rate:
+            return None
+        remaining = max(0, obj.total_features - obj.features_ingested)
+        return round(remaining / rate, 1)
+
+
+class GeoUploadSessionCreateSerializer(serializers.Serializer):
+    """Serializer for starting a resumable upload."""
+
+    filename = serializers.CharField(max_length=255)
+    size = serializers.IntegerField(min_value=1)
+    name = serializers.CharField(max_length=255, required=False, allow_blank=True)
+    description = serializers.CharField(required=False, allow_blank=True)
+    update_dataset = serializers.PrimaryKeyRelatedField(
+        queryset=GeoUploadedDataset.objects.all(), required=False, allow_null=True
+    )
+    match_key = serializers.CharField(max_length=255, required=False, allow_blank=True)
+
+
+class GeoUploadSessionSerializer(serializers.ModelSerializer):
+    """State of a resumable upload; job_id is set once the file is complete."""
+
+    job_id = serializers.IntegerField(read_only=True, allow_null=True)
+
+    class Meta:
+        model = GeoUploadSession
+        fields = [
+            "id",
+            "status",
+            "original_filename",
+            "total_size",
+            "offset",
+            "job_id",
+            "created_at",
+            "updated_at",
+        ]
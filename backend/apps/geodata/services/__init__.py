@@ -1,3 +1,30 @@
+from . import (
+    exporters,
+    field_stats,
+    h3_aggregates,
+    ingest_jobs,
+    property_indexes,
+    response_cache,
+    resumable_uploads,
+    tile_cache,
+)
 from .geo_processor import GeoProcessor
+from .geojson_output import build_feature_collection, round_coordinates, stream_feature_collection
+from .vector_tiles import render_tile, tile_range
 
-__all__ = ["GeoProcessor"]
+__all__ = [
+    "GeoProcessor",
+    "build_feature_collection",
+    "exporters",
+    "field_stats",
+    "h3_aggregates",
+    "ingest_jobs",
+    "property_indexes",
+    "render_tile",
+    "response_cache",
+    "resumable_uploads",
+    "round_coordinates",
+    "stream_feature_collection",
+    "tile_cache",
+    "tile_range",
+]
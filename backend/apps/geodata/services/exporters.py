@@ -0,0 +1,408 @@
+"""
+Binary export formats for uploaded datasets: FlatGeobuf, GeoParquet and Arrow IPC.
+
+Exports are built from GeoFeature rows in chunks (WKB straight from PostGIS,
+decoded with vectorized shapely calls) and stored under
+GEODATA_CACHE_DIR/exports/<dataset>/v<version>/, so each dataset version is
+generated once and then served as a static file. A missing export is built
+in a background thread while requests get ExportPending, so an anonymous
+request never blocks on (or starts a second copy of) a full build. A failed
+build is recorded next to the export and not retried until a backoff has
+passed; requests get ExportFailed meanwhile.
+"""
+
+import json
+import logging
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import fiona
+import shapely
+from django.conf import settings
+from django.contrib.gis.db.models.functions import AsWKB
+from django.db import connection
+from shapely.geometry import mapping
+
+logger = logging.getLogger(__name__)
+
+# format -> (content type, file extension)
+EXPORT_FORMATS = {
+    "fgb": ("application/x-flatgeobuf", "fgb"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.file", "arrow"),
+}
+
+# Rows per server-side cursor fetch, FlatGeobuf write batch and Parquet row group
+EXPORT_CHUNK_SIZE = 10000
+
+# Seconds clients are asked to wait before retrying while an export builds
+EXPORT_RETRY_AFTER = 10
+
+# A build marker older than this was left by a build that died. Markers from
+# this host are checked against their owner's PID first; the timeout covers
+# builds on other hosts sharing the cache directory.
+EXPORT_BUILD_TIMEOUT = 60 * 60
+
+# Seconds before a failed build is retried; doubles with every further
+# failure, up to EXPORT_BUILD_TIMEOUT
+EXPORT_FAILURE_BACKOFF = 60
+
+# String property values accepted for boolean fields; anything else exports as null
+BOOLEAN_STRINGS = {
+    "true": True, "t": True, "yes": True, "1": True,
+    "false": False, "f": False, "no": False, "0": False,
+}
+
+
+class ExportPending(Exception):
+    """The export is being built; retry after EXPORT_RETRY_AFTER seconds."""
+
+
+class ExportFailed(Exception):
+    """The last build of the export failed; it is retried after retry_after seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Building the export failed; it will be retried in {retry_after}s")
+        self.retry_after = retry_after
+
+
+# GeoUploadedDataset.field_types -> fiona schema type
+FIONA_FIELD_TYPES = {
+    "integer": "int",
+    "float": "float",
+    "boolean": "bool",
+    "date": "date",
+    "datetime": "datetime",
+    "string": "str",
+}
+
+
+def _dataset_dir(dataset_id: int) -> Path:
+    return Path(settings.GEODATA_CACHE_DIR) / "exports" / str(dataset_id)
+
+
+def export_path(dataset, export_format: str) -> Path:
+    """Cache location of a dataset export at its current version."""
+    extension = EXPORT_FORMATS[export_format][1]
+    return _dataset_dir(dataset.pk) / f"v{dataset.version}" / f"dataset-{dataset.pk}.{extension}"
+
+
+def invalidate_dataset(dataset_id: int) -> None:
+    """Drop every stored export for a dataset, across all versions."""
+    shutil.rmtree(_dataset_dir(dataset_id), ignore_errors=True)
+
+
+def _wkb_chunks(dataset) -> Iterator[tuple[list[bytes], list[dict]]]:
+    """Yield (WKB, properties) chunks read through a server-side cursor."""
+    rows = (
+        dataset.features.order_by("id")
+        .annotate(wkb=AsWKB("geometry"))
+        .values_list("wkb", "properties")
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+    wkbs, properties = [], []
+    for wkb, props in rows:
+        wkbs.append(bytes(wkb))
+        properties.append(props)
+        if len(wkbs) >= EXPORT_CHUNK_SIZE:
+            yield wkbs, properties
+            wkbs, properties = [], []
+    if wkbs:
+        yield wkbs, properties
+
+
+def _chunks(dataset) -> Iterator[tuple[list, list[dict]]]:
+    """Yield (geometries, properties) chunks, decoded with shapely."""
+    for wkbs, properties in _wkb_chunks(dataset):
+        yield shapely.from_wkb(wkbs), properties
+
+
+def _coerce(value, field_type: str):
+    """Coerce a JSON property value to its declared type, or None if it doesn't fit."""
+    if value is None:
+        return None
+    try:
+        if field_type == "integer":
+            return int(value)
+        if field_type == "float":
+            return float(value)
+        if field_type == "boolean":
+            if isinstance(value, str):
+                return BOOLEAN_STRINGS.get(value.strip().lower())
+            return bool(value)
+    except (TypeError, ValueError):
+        return None
+    return value if isinstance(value, str) else str(value)
+
+
+def write_flatgeobuf(dataset, path: str) -> None:
+    """Write a FlatGeobuf file with its packed Hilbert R-tree for range reads."""
+    fields = dataset.available_fields
+    schema = {
+        "geometry": "Unknown",
+        "properties": {
+            name: FIONA_FIELD_TYPES.get(dataset.field_types.get(name), "str") for name in fields
+        },
+    }
+
+    with fiona.open(
+        path, "w", driver="FlatGeobuf", schema=schema, crs="EPSG:4326", SPATIAL_INDEX="YES"
+    ) as sink:
+        for geometries, properties in _chunks(dataset):
+            sink.writerecords(
+                fiona.Feature.from_dict({
+                    "geometry": mapping(geometry),
+                    "properties": {
+                        name: _coerce(props.get(name), dataset.field_types.get(name, "string"))
+                        for name in fields
+                    },
+                })
+                for geometry, props in zip(geometries, properties)
+            )
+
+
+def _arrow_schema(dataset):
+    import pyarrow as pa
+
+    arrow_types = {
+        "integer": pa.int64(),
+        "float": pa.float64(),
+        "boolean": pa.bool_(),
+    }
+    columns = [pa.field("geometry", pa.binary())] + [
+        pa.field(name, arrow_types.get(dataset.field_types.get(name), pa.string()))
+        for name in dataset.available_fields
+    ]
+    geo = {
+        "version": "1.1.0",
+        "primary_column": "geometry",
+        # No "crs" member means OGC:CRS84, i.e. EPSG:4326 in lon/lat order
+        "columns": {"geometry": {"encoding": "WKB", "geometry_types": []}},
+    }
+    if dataset.bounds:
+        geo["columns"]["geometry"]["bbox"] = dataset.bounds
+    return pa.schema(columns, metadata={"geo": json.dumps(geo)})
+
+
+def _record_batches(dataset, schema):
+    import pyarrow as pa
+
+    fields = dataset.available_fields
+    # PostGIS WKB goes into the geometry column as is; no decode/encode round trip
+    for wkbs, properties in _wkb_chunks(dataset):
+        columns = [pa.array(wkbs, type=pa.binary())]
+        for name in fields:
+            field_type = dataset.field_types.get(name, "string")
+            columns.append(pa.array(
+                [_coerce(props.get(name), field_type) for props in properties],
+                type=schema.field(name).type,
+            ))
+        yield pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+def write_geoparquet(dataset, path: str) -> None:
+    """Write GeoParquet (WKB geometry, typed property columns), one row group per chunk."""
+    import pyarrow.parquet as pq
+
+    schema = _arrow_schema(dataset)
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for batch in _record_batches(dataset, schema):
+            writer.write_batch(batch)
+
+
+def write_arrow(dataset, path: str) -> None:
+    """Write an Arrow IPC file with the same columns as the GeoParquet export."""
+    import pyarrow as pa
+
+    schema = _arrow_schema(dataset)
+    with pa.ipc.new_file(path, schema) as writer:
+        for batch in _record_batches(dataset, schema):
+            writer.write_batch(batch)
+
+
+WRITERS = {
+    "fgb": write_flatgeobuf,
+    "parquet": write_geoparquet,
+    "arrow": write_arrow,
+}
+
+
+def _build_marker(path: Path) -> Path:
+    return path.with_name(path.name + ".building")
+
+
+def _failure_record(path: Path) -> Path:
+    return path.with_name(path.name + ".failed")
+
+
+def _create_marker(marker: Path) -> bool:
+    try:
+        fd = os.open(marker, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return False
+    with os.fdopen(fd, "w") as f:
+        json.dump({"host": socket.gethostname(), "pid": os.getpid()}, f)
+    return True
+
+
+def _owner_alive(owner: dict) -> bool:
+    try:
+        os.kill(owner["pid"], 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:  # exists, but belongs to another user
+        return True
+    return True
+
+
+def _marker_is_stale(marker: Path) -> bool:
+    """True if the build holding the marker is known to have died."""
+    if time.time() - marker.stat().st_mtime > EXPORT_BUILD_TIMEOUT:
+        return True
+    try:
+        owner = json.loads(marker.read_text())
+    except ValueError:
+        # Created but not written yet; give the owner the benefit of the doubt
+        return False
+    return owner.get("host") == socket.gethostname() and not _owner_alive(owner)
+
+
+def _claim_build(path: Path) -> bool:
+    """Create the build marker for an export; False if a live build holds it."""
+    marker = _build_marker(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if _create_marker(marker):
+        return True
+    try:
+        stale = _marker_is_stale(marker)
+    except FileNotFoundError:  # the build just finished
+        return False
+    if not stale:
+        return False
+    marker.unlink(missing_ok=True)
+    return _create_marker(marker)
+
+
+def _check_failures(path: Path) -> None:
+    """Raise ExportFailed while the backoff after a failed build is running."""
+    try:
+        failure = json.loads(_failure_record(path).read_text())
+    except (FileNotFoundError, ValueError):
+        return
+    retry_after = failure["retry_at"] - time.time()
+    if retry_after > 0:
+        raise ExportFailed(int(retry_after) + 1)
+
+
+def _record_failure(path: Path) -> None:
+    record = _failure_record(path)
+    try:
+        failures = json.loads(record.read_text())["failures"] + 1
+    except (FileNotFoundError, ValueError, KeyError):
+        failures = 1
+    backoff = min(EXPORT_FAILURE_BACKOFF * 2 ** (failures - 1), EXPORT_BUILD_TIMEOUT)
+    record.write_text(json.dumps({"failures": failures, "retry_at": time.time() + backoff}))
+
+
+def build_export(dataset, export_format: str) -> Path:
+    """Write a dataset export to its cache location, replacing it atomically."""
+    path = export_path(dataset, export_format)
+    # Build next to the target and rename, so readers never see a partial file
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=path.suffix)
+    os.close(fd)
+    os.unlink(temp_path)  # fiona refuses to overwrite an existing file
+    try:
+        WRITERS[export_format](dataset, temp_path)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+    return path
+
+
+def _build_in_background(dataset, export_format: str) -> None:
+    path = export_path(dataset, export_format)
+    try:
+        build_export(dataset, export_format)
+        _failure_record(path).unlink(missing_ok=True)
+    except Exception:
+        logger.exception("Building %s export of dataset %s failed", export_format, dataset.pk)
+        _record_failure(path)
+    finally:
+        _build_marker(path).unlink(missing_ok=True)
+        connection.close()
+
+
+def get_export(dataset, export_format: str) -> Path:
+    """
+    Return the path of a dataset export. On a miss, start building it in a
+    background thread (unless a build is already running) and raise
+    ExportPending, or raise ExportFailed if the last build failed recently.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(
+            f"Unsupported export format: {export_format}. "
+            f"Supported formats: {list(EXPORT_FORMATS.keys())}"
+        )
+
+    path = export_path(dataset, export_format)
+    if path.exists():
+        return path
+
+    _check_failures(path)
+    if _claim_build(path):
+        threading.Thread(
+            target=_build_in_background,
+            args=(dataset, export_format),
+            name=f"export-{dataset.pk}-{export_format}",
+            daemon=True,
+        ).start()
+    raise ExportPending()
+
+
+def parse_byte_range(header: str, size: int) -> tuple[int, int] | None:
+    """
+    Parse a single-range 'bytes=start-end' Range header against a file size.
+
+    Returns an inclusive (start, end) pair, or None when the header is absent
+    or not a single byte range (the whole file is served then). Raises
+    ValueError for a range that lies entirely past the end of the file.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start, _, end = header[len("bytes="):].strip().partition("-")
+    if not (start + end).isdigit():
+        return None
+    if start == "":
+        # Suffix range: the last N bytes
+        if int(end) == 0:
+            raise ValueError("Range not satisfiable")
+        return max(0, size - int(end)), size - 1
+    start = int(start)
+    end = int(end) if end else size - 1
+    if start >= size:
+        raise ValueError("Range not satisfiable")
+    if start > end:
+        return None
+    return start, min(end, size - 1)
+
+
+def read_range(path: Path, start: int, end: int, block_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Yield bytes start..end (inclusive) of a file in blocks."""
+    remaining = end - start + 1
+    with open(path, "rb") as f:
+        f.seek(start)
+        while remaining > 0:
+            block = f.read(min(block_size, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
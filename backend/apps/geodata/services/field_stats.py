@@ -0,0 +1,173 @@
+"""
+Summary statistics and class breaks for a numeric property of an uploaded dataset.
+
+Everything but Jenks is computed by PostgreSQL in two queries (aggregates with
+percentile_cont, then a width_bucket histogram). Jenks natural breaks run in
+Python on a fixed-size quantile sample drawn with percentile_disc, so their cost
+doesn't grow with the dataset. Results are cached per dataset version.
+"""
+
+import hashlib
+
+import numpy as np
+from django.core.cache import cache
+from django.db import connection
+
+from apps.geodata.models import GeoFeature
+
+from .property_indexes import PROPERTY_CASTS, typed_property_sql
+
+DEFAULT_CLASSES = 5
+MAX_CLASSES = 12
+DEFAULT_BINS = 20
+MAX_BINS = 100
+
+# Values fed to the Jenks optimiser; evenly spaced quantiles of the field
+JENKS_SAMPLE_SIZE = 1000
+
+# Entries are keyed on the dataset version, so this only bounds orphan lifetime
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def cache_key(dataset, field: str, classes: int, bins: int) -> str:
+    # Field names are arbitrary text; keep keys safe for every cache backend
+    digest = hashlib.md5(field.encode("utf-8")).hexdigest()
+    return f"geo-stats:{dataset.pk}:v{dataset.version}:{classes}:{bins}:{digest}"
+
+
+def _float(value):
+    return None if value is None else float(value)
+
+
+def jenks_breaks(values, classes: int) -> list[float]:
+    """
+    Fisher-Jenks natural breaks of sorted values: minimise the summed squared
+    deviation within classes by dynamic programming. Returns classes+1 edges.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if n == 0:
+        return []
+    classes = min(classes, len(np.unique(values)))
+    if classes <= 1:
+        return [float(values[0]), float(values[-1])]
+
+    # Prefix sums give the squared deviation of any run values[j:i] in O(1)
+    sums = np.concatenate(([0.0], np.cumsum(values)))
+    squares = np.concatenate(([0.0], np.cumsum(values * values)))
+
+    def deviation(starts, end):
+        count = end - starts
+        total = sums[end] - sums[starts]
+        return squares[end] - squares[starts] - total * total / count
+
+    # cost[k][i]: best cost of splitting values[:i] into k+1 classes
+    cost = np.full((classes, n + 1), np.inf)
+    split = np.zeros((classes, n + 1), dtype=int)
+    ends = np.arange(1, n + 1)
+    cost[0, 1:] = deviation(np.zeros(n, dtype=int), ends)
+
+    for k in range(1, classes):
+        for i in range(k + 1, n + 1):
+            starts = np.arange(k, i)
+            candidates = cost[k - 1, starts] + deviation(starts, i)
+            best = int(np.argmin(candidates))
+            cost[k, i] = candidates[best]
+            split[k, i] = starts[best]
+
+    edges = [float(values[-1])]
+    i = n
+    for k in range(classes - 1, 0, -1):
+        i = split[k, i]
+        edges.append(float(values[i - 1]))
+    edges.append(float(values[0]))
+    return edges[::-1]
+
+
+def compute_stats(dataset, field: str, classes: int = DEFAULT_CLASSES, bins: int = DEFAULT_BINS) -> dict:
+    """Compute summary statistics, class breaks and a histogram for one field."""
+    if field not in dataset.available_fields:
+        raise ValueError(f"Unknown field for this dataset: {field}")
+    if PROPERTY_CASTS.get(dataset.field_types.get(field)) != "double precision":
+        raise ValueError(f"Statistics need a numeric field; {field} is {dataset.field_types.get(field)}")
+
+    table = connection.ops.quote_name(GeoFeature._meta.db_table)
+    value_sql = typed_property_sql("(properties ->> %s)", dataset.field_types.get(field))
+    # Values the cast can't parse come out NULL and are left out like missing ones
+    values_sql = (
+        f"SELECT v FROM (SELECT {value_sql} AS v FROM {table} WHERE dataset_id = %s) AS typed "
+        "WHERE v IS NOT NULL"
+    )
+    values_params = [field, field, dataset.pk]
+    quantiles = [i / classes for i in range(classes + 1)]
+    sample = [i / (JENKS_SAMPLE_SIZE - 1) for i in range(JENKS_SAMPLE_SIZE)]
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT count(v), min(v), max(v), avg(v), stddev_samp(v),
+                   percentile_cont(%s::double precision[]) WITHIN GROUP (ORDER BY v),
+                   percentile_disc(%s::double precision[]) WITHIN GROUP (ORDER BY v)
+            FROM ({values_sql}) AS vals
+            """,
+            [quantiles, sample, *values_params],
+        )
+        count, minimum, maximum, mean, stddev, quantile_breaks, jenks_sample = cursor.fetchone()
+
+        histogram = []
+        if count and maximum > minimum:
+            cursor.execute(
+                f"""
+                SELECT least(width_bucket(v, %s, %s, %s), %s) AS bucket, count(*)
+                FROM ({values_sql}) AS vals
+                GROUP BY bucket ORDER BY bucket
+                """,
+                [minimum, maximum, bins, bins, *values_params],
+            )
+            counts = dict(cursor.fetchall())
+            width = (maximum - minimum) / bins
+            histogram = [
+                {
+                    "min": minimum + width * (b - 1),
+                    "max": minimum + width * b,
+                    "count": counts.get(b, 0),
+                }
+                for b in range(1, bins + 1)
+            ]
+        elif count:
+            histogram = [{"min": minimum, "max": maximum, "count": count}]
+
+    if not count:
+        equal_interval = []
+    elif maximum > minimum:
+        step = (maximum - minimum) / classes
+        equal_interval = [minimum + step * i for i in range(classes)] + [maximum]
+    else:
+        equal_interval = [minimum, maximum]
+
+    return {
+        "field": field,
+        "version": dataset.version,
+        "count": count,
+        "min": _float(minimum),
+        "max": _float(maximum),
+        "mean": _float(mean),
+        "stddev": _float(stddev),
+        "classes": classes,
+        "breaks": {
+            "quantile": [float(b) for b in quantile_breaks or []],
+            "equal_interval": [float(b) for b in equal_interval],
+            "jenks": jenks_breaks(jenks_sample or [], classes),
+        },
+        "histogram": histogram,
+    }
+
+
+def get_stats(dataset, field: str, classes: int = DEFAULT_CLASSES, bins: int = DEFAULT_BINS) -> dict:
+    """Return cached stats for a field at the dataset's current version."""
+    key = cache_key(dataset, field, classes, bins)
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_stats(dataset, field, classes, bins)
+        cache.set(key, stats, CACHE_TIMEOUT)
+    return stats
@@ -4,18 +4,157 @@ Supports GeoJSON, GeoPackage (.gpkg), and Shapefile (.shp) formats.
 """
 
 import json
+import logging
+import multiprocessing
+import io
 import os
-import tempfile
+import time
 import zipfile
-from typing import Any
-
+from collections import Counter, deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from functools import lru_cache
+from typing import Any, NamedTuple
+
+import django
 import fiona
-from django.contrib.gis.geos import GEOSGeometry
-from django.db import transaction
-from shapely.geometry import mapping, shape
+import numpy as np
+import shapely
+from django.conf import settings
+from django.db import connection, transaction
+from fiona.io import MemoryFile, ZipMemoryFile
+from pyproj import CRS, Transformer
+from shapely.geometry import shape
 
 from apps.geodata.models import GeoFeature, GeoUploadedDataset
 
+from . import exporters, h3_aggregates, property_indexes, tile_cache
+from .ingest_metrics import IngestMetrics
+
+logger = logging.getLogger(__name__)
+
+WGS84 = CRS.from_epsg(4326)
+
+
+def _to_ewkb(geom):
+    """
+    Hex EWKB in EPSG:4326, as accepted by PostGIS geometry input in COPY.
+    Works on a single geometry or an array of them.
+    """
+    return shapely.to_wkb(shapely.set_srid(geom, 4326), hex=True, include_srid=True)
+
+
+@lru_cache(maxsize=16)
+def _transformer(source_crs: str) -> Transformer:
+    """
+    Transformer from a source CRS (WKT) to EPSG:4326 in lon/lat order.
+    Building one is expensive, so each process keeps its recent ones.
+    """
+    return Transformer.from_crs(CRS.from_wkt(source_crs), WGS84, always_xy=True)
+
+
+def _reproject(geoms: np.ndarray, source_crs: str) -> np.ndarray:
+    """
+    Reproject an array of geometries to EPSG:4326. All coordinates of the
+    array go through the transformer as one vectorized batch.
+    """
+    transformer = _transformer(source_crs)
+
+    def transform(coords):
+        x, y = transformer.transform(coords[:, 0], coords[:, 1])
+        return np.column_stack([x, y, coords[:, 2:]])
+
+    # transform() drops Z unless asked, and adds NaN Z if asked on 2D input
+    geoms = geoms.copy()
+    has_z = shapely.has_z(geoms)
+    geoms[~has_z] = shapely.transform(geoms[~has_z], transform)
+    geoms[has_z] = shapely.transform(geoms[has_z], transform, include_z=True)
+    return geoms
+
+
+class ConvertedChunk(NamedTuple):
+    """Output of _convert_chunk for one chunk of features."""
+
+    rows: list[tuple]
+    h3_cells: dict | None
+    repaired: int
+    skipped: int
+    seconds: float
+    # Invalid or unreadable geometries by reason, e.g. {"Self-intersection": 3}
+    invalid_reasons: dict[str, int]
+
+
+def _convert_chunk(
+    chunk: list[tuple[dict, dict]],
+    h3_fields: list[str] | None = None,
+    source_crs: str | None = None,
+) -> ConvertedChunk:
+    """
+    Convert (GeoJSON geometry, properties) pairs into COPY rows:
+    full geometry, one simplified geometry per GeoFeature.SIMPLIFICATION_LEVELS
+    entry, then the properties JSON. Geometries in source_crs (WKT) are
+    reprojected to EPSG:4326 first; None means they already are.
+
+    Every geometry step runs once per chunk on a shapely array (parse,
+    validity check and make_valid, reprojection, simplification, EWKB
+    encoding) rather than once per feature. Unparseable geometries are
+    skipped; invalid ones are repaired.
+
+    For point datasets (h3_fields not None) also returns the chunk's partial
+    H3 cell aggregates.
+
+    Runs in pool workers, so it must stay a picklable module-level function
+    that doesn't touch the database.
+    """
+    started = time.perf_counter()
+    geoms = shapely.from_geojson(
+        [json.dumps(geometry) for geometry, _ in chunk], on_invalid="ignore"
+    )
+    parsed = ~shapely.is_missing(geoms)
+    skipped = int((~parsed).sum())
+    invalid_reasons = Counter()
+    if skipped:
+        invalid_reasons["Unreadable geometry"] = skipped
+    geoms = geoms[parsed]
+    properties_list = [properties for (_, properties), ok in zip(chunk, parsed) if ok]
+
+    invalid = ~shapely.is_valid(geoms)
+    repaired = int(invalid.sum())
+    if repaired:
+        # GEOS reasons end in the offending location, e.g. "Self-intersection[1 2]"
+        invalid_reasons.update(
+            reason.split("[", 1)[0] for reason in shapely.is_valid_reason(geoms[invalid])
+        )
+        geoms[invalid] = shapely.make_valid(geoms[invalid])
+
+    if source_crs is not None and len(geoms):
+        geoms = _reproject(geoms, source_crs)
+
+    geometry_wkb = _to_ewkb(geoms)
+    # Points have nothing to simplify; their simplified columns stay NULL
+    simplifiable = shapely.get_dimensions(geoms) > 0
+    simplified = []
+    for tolerance in GeoFeature.SIMPLIFICATION_LEVELS.values():
+        level = np.full(len(geoms), None, dtype=object)
+        level[simplifiable] = _to_ewkb(
+            shapely.simplify(geoms[simplifiable], tolerance, preserve_topology=True)
+        )
+        simplified.append(level)
+
+    rows = [
+        (wkb, *levels, json.dumps(properties))
+        for wkb, *levels, properties in zip(geometry_wkb, *simplified, properties_list)
+    ]
+
+    h3_cells = None
+    if h3_fields is not None:
+        h3_cells = h3_aggregates.point_cells(geoms, properties_list, h3_fields)
+
+    return ConvertedChunk(
+        rows, h3_cells, repaired, skipped, time.perf_counter() - started, dict(invalid_reasons)
+    )
+
 
 class GeoProcessor:
     """
@@ -30,6 +169,15 @@ class GeoProcessor:
         ".zip": "shp",  # Zipped shapefiles
     }
 
+    # Features per conversion chunk (and per pool task)
+    INGEST_CHUNK_SIZE = 5000
+
+    # Below this many features, conversion runs in-process; pool start-up isn't worth it
+    PARALLEL_MIN_FEATURES = 20000
+
+    # Temporary table holding the new file's rows during an in-place update
+    STAGING_TABLE = "geo_feature_staging"
+
     FIELD_TYPE_MAP = {
         "int": "integer",
         "int32": "integer",
@@ -42,20 +190,44 @@ class GeoProcessor:
         "bool": "boolean",
     }
 
-    def __init__(self, file, filename: str, name: str = None, description: str = ""):
+    def __init__(
+        self,
+        file,
+        filename: str,
+        name: str = None,
+        description: str = "",
+        progress_callback: Callable[[int, int | None], None] | None = None,
+        path: str | None = None,
+        dataset: GeoUploadedDataset | None = None,
+        match_key: str | None = None,
+        metrics: IngestMetrics | None = None,
+    ):
         """
         Initialize the processor with an uploaded file.
 
         Args:
-            file: Django UploadedFile or file-like object
+            file: Django UploadedFile or file-like object (unused when path is given)
             filename: Original filename
             name: Optional dataset name (defaults to filename without extension)
             description: Optional description for the dataset
+            progress_callback: Optional callable receiving (features_ingested, total_features)
+                after each inserted chunk; total is None when the driver can't count
+            path: Optional path of the file on local disk, read in place
+            dataset: Existing dataset to update in place instead of creating a new one
+            match_key: Property identifying a feature across versions when updating;
+                None matches identical features (same geometry and properties)
+            metrics: Optional IngestMetrics to record into, e.g. one that already
+                holds the spool time of a staged upload
         """
         self.file = file
         self.filename = filename
         self.name = name or os.path.splitext(filename)[0]
         self.description = description
+        self.progress_callback = progress_callback
+        self.path = path
+        self.dataset = dataset
+        self.match_key = match_key or None
+        self.metrics = metrics or IngestMetrics()
         self.file_format = self._detect_format()
 
     def _detect_format(self) -> str:
@@ -94,121 +266,463 @@ class GeoProcessor:
 
         return field_names, field_types
 
-    def _calculate_bounds(self, collection) -> list[float] | None:
-        """Calculate the bounding box from a Fiona collection."""
+    def _source_crs(self, collection) -> tuple[str | None, int | None]:
+        """
+        Detect the collection's CRS.
+
+        Returns (WKT to reproject from, or None if the data is already
+        EPSG:4326 or declares no CRS; EPSG code of the source CRS, if it has one).
+        """
+        if not collection.crs_wkt:
+            return None, 4326
+        crs = CRS.from_wkt(collection.crs_wkt)
+        srid = crs.to_epsg()
+        if crs.equals(WGS84, ignore_axis_order=True):
+            return None, 4326
+        return crs.to_wkt(), srid
+
+    def _calculate_bounds(self, collection, source_crs: str | None = None) -> list[float] | None:
+        """Calculate the bounding box (in EPSG:4326) from a Fiona collection."""
         try:
             bounds = collection.bounds
             if bounds:
+                if source_crs is not None:
+                    bounds = _transformer(source_crs).transform_bounds(*bounds)
                 return list(bounds)  # [minx, miny, maxx, maxy]
         except Exception:
             pass
         return None
 
-    def _process_geojson(self, temp_path: str) -> dict[str, Any]:
-        """Process a GeoJSON file."""
-        with fiona.open(temp_path, "r") as collection:
-            return self._ingest_collection(collection)
-
-    def _process_gpkg(self, temp_path: str) -> dict[str, Any]:
-        """Process a GeoPackage file."""
-        with fiona.open(temp_path, "r") as collection:
-            return self._ingest_collection(collection)
-
-    def _process_shapefile(self, temp_path: str) -> dict[str, Any]:
-        """Process a Shapefile (or zipped shapefile)."""
-        # Check if it's a zip file
-        if zipfile.is_zipfile(temp_path):
-            with tempfile.TemporaryDirectory() as extract_dir:
-                with zipfile.ZipFile(temp_path, "r") as zip_ref:
-                    zip_ref.extractall(extract_dir)
-
-                # Find the .shp file
-                shp_file = None
-                for root, dirs, files in os.walk(extract_dir):
-                    for f in files:
-                        if f.lower().endswith(".shp"):
-                            shp_file = os.path.join(root, f)
-                            break
-                    if shp_file:
-                        break
-
-                if not shp_file:
-                    raise ValueError("No .shp file found in the zip archive")
-
-                with fiona.open(shp_file, "r") as collection:
-                    return self._ingest_collection(collection)
+    def _local_path(self) -> str | None:
+        """Path of the upload on local disk, if it already has one."""
+        if self.path:
+            return self.path
+        # Django's TemporaryUploadedFile: large uploads are already spooled to disk
+        temporary_file_path = getattr(self.file, "temporary_file_path", None)
+        if temporary_file_path:
+            return temporary_file_path()
+        return None
+
+    def _zip_member(self, source) -> str:
+        """Name of the dataset inside a zip: the first .shp, else the first .gpkg."""
+        with zipfile.ZipFile(source) as archive:
+            names = [n for n in archive.namelist() if not n.startswith("__MACOSX/")]
+
+        for extension in (".shp", ".gpkg"):
+            for name in names:
+                if name.lower().endswith(extension):
+                    if extension == ".gpkg":
+                        self.file_format = "gpkg"
+                    return name
+        raise ValueError("No .shp or .gpkg file found in the zip archive")
+
+    @contextmanager
+    def _open_collection(self) -> Iterator[fiona.Collection]:
+        """
+        Open the upload with fiona without copying or extracting it.
+
+        Files on disk are read in place, zip members through GDAL's /vsizip/
+        (only the central directory and the member's blocks are read). Small
+        in-memory uploads go through fiona's MemoryFile/ZipMemoryFile.
+        """
+        path = self._local_path()
+        with ExitStack() as stack:
+            if path is not None:
+                with self.metrics.phase("open"):
+                    if self.file_format == "shp" and zipfile.is_zipfile(path):
+                        path = f"/vsizip/{os.path.abspath(path)}/{self._zip_member(path)}"
+                    collection = stack.enter_context(fiona.open(path, "r"))
+                yield collection
+                return
+
+            with self.metrics.phase("spool"):
+                data = self.file.read()
+            with self.metrics.phase("open"):
+                if self.file_format == "shp" and zipfile.is_zipfile(io.BytesIO(data)):
+                    member = self._zip_member(io.BytesIO(data))
+                    memfile = stack.enter_context(ZipMemoryFile(data))
+                    collection = stack.enter_context(memfile.open(member))
+                else:
+                    ext = os.path.splitext(self.filename)[1].lower()
+                    memfile = stack.enter_context(MemoryFile(data, ext=ext))
+                    collection = stack.enter_context(memfile.open())
+            yield collection
+
+    def _worker_count(self, total: int | None) -> int:
+        """Number of conversion processes to use for a collection of `total` features."""
+        if total is not None and total < self.PARALLEL_MIN_FEATURES:
+            return 1
+        return max(1, settings.GEODATA_INGEST_WORKERS)
+
+    def _read_chunks(self, collection) -> Iterator[list[tuple[dict, dict]]]:
+        """Read (geometry, properties) pairs from a collection in picklable chunks."""
+        chunk = []
+        started = time.perf_counter()
+        for feature in collection:
+            geometry = feature.geometry
+            if geometry is None:
+                continue
+            chunk.append((geometry.__geo_interface__, dict(feature.properties or {})))
+            if len(chunk) >= self.INGEST_CHUNK_SIZE:
+                self.metrics.add("read", time.perf_counter() - started)
+                yield chunk
+                chunk = []
+                started = time.perf_counter()
+        if chunk:
+            self.metrics.add("read", time.perf_counter() - started)
+            yield chunk
+
+    def _feature_total(self, collection) -> int | None:
+        """Feature count reported by the driver, or None if it can't tell cheaply."""
+        try:
+            return len(collection)
+        except Exception:
+            return None
+
+    def _converted_chunks(
+        self,
+        collection,
+        total: int | None,
+        h3_fields: list[str] | None = None,
+        source_crs: str | None = None,
+    ) -> Iterator[ConvertedChunk]:
+        """
+        Yield a ConvertedChunk per chunk of the collection, in file order.
+
+        Large collections are converted in a process pool while the parent keeps
+        reading from the file and writing to COPY; at most two chunks per worker
+        are in flight so memory stays bounded.
+        """
+        chunks = self._read_chunks(collection)
+        workers = self._worker_count(total)
+
+        if workers == 1:
+            for chunk in chunks:
+                yield _convert_chunk(chunk, h3_fields, source_crs)
+            return
+
+        # Not fork: the job heartbeat (and psycopg) run threads in this process,
+        # and a forked child can inherit a lock one of them held. forkserver
+        # workers start clean, so they set Django up before importing the models
+        context = multiprocessing.get_context("forkserver")
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=context, initializer=django.setup
+        ) as pool:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(_convert_chunk, chunk, h3_fields, source_crs))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def _copy_features(
+        self,
+        dataset,
+        chunks,
+        total: int | None,
+        h3_cells: dict | None = None,
+        table: str | None = None,
+    ) -> dict[str, int]:
+        """
+        Stream converted rows into geo_features (or a staging table without
+        the dataset column) with COPY ... FROM STDIN, merging each chunk's H3
+        cells into h3_cells when given.
+
+        Returns totals: feature_count, geometries_repaired and features_skipped.
+        """
+        content_columns = ["geometry", *GeoFeature.SIMPLIFICATION_LEVELS, "properties"]
+        if table is None:
+            table = GeoFeature._meta.db_table
+            columns = ", ".join([GeoFeature._meta.get_field("dataset").column, *content_columns])
+            prefix = (dataset.id,)
         else:
-            with fiona.open(temp_path, "r") as collection:
-                return self._ingest_collection(collection)
+            columns = ", ".join(content_columns)
+            prefix = ()
+
+        totals = {"feature_count": 0, "geometries_repaired": 0, "features_skipped": 0}
+        with connection.cursor() as cursor:
+            with cursor.copy(f"COPY {table} ({columns}) FROM STDIN") as copy:
+                for number, chunk in enumerate(chunks, start=1):
+                    started = time.perf_counter()
+                    for row in chunk.rows:
+                        copy.write_row((*prefix, *row))
+                    copied = time.perf_counter() - started
+
+                    if h3_cells is not None and chunk.h3_cells:
+                        h3_aggregates.merge_cells(h3_cells, chunk.h3_cells)
+                    totals["feature_count"] += len(chunk.rows)
+                    totals["geometries_repaired"] += chunk.repaired
+                    totals["features_skipped"] += chunk.skipped
+                    # Summed worker time; with a pool this exceeds wall-clock time
+                    self.metrics.add("convert", chunk.seconds)
+                    self.metrics.add("insert", copied)
+                    self.metrics.count_invalid(chunk.invalid_reasons)
+
+                    logger.debug(
+                        "Chunk %d: %d features, converted at %.0f/s, copied at %.0f/s",
+                        number,
+                        len(chunk.rows),
+                        len(chunk.rows) / chunk.seconds if chunk.seconds > 0 else 0.0,
+                        len(chunk.rows) / copied if copied > 0 else 0.0,
+                    )
+                    if self.progress_callback:
+                        self.progress_callback(totals["feature_count"], total)
+
+        return totals
+
+    def _create_staging_table(self) -> str:
+        """Create a transaction-scoped table shaped like geo_features' content columns."""
+        geometry_columns = ", ".join(
+            f"{column} geometry(Geometry, 4326)"
+            for column in ["geometry", *GeoFeature.SIMPLIFICATION_LEVELS]
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE {self.STAGING_TABLE} "
+                f"({geometry_columns}, properties jsonb) ON COMMIT DROP"
+            )
+        return self.STAGING_TABLE
+
+    def _match_expression(self, alias: str) -> tuple[str, list]:
+        """SQL (and params) identifying a feature row across dataset versions."""
+        return f"({alias}.properties ->> %s)", [self.match_key]
+
+    @staticmethod
+    def _content_hash(alias: str) -> str:
+        """SQL hashing a feature row's geometry and properties together."""
+        # jsonb::text is canonical (sorted keys, fixed spacing), so equal
+        # properties hash equally whatever the file's key order
+        return (
+            f"md5(ST_AsEWKB({alias}.geometry) || "
+            f"convert_to(coalesce({alias}.properties::text, ''), 'UTF8'))"
+        )
+
+    def _apply_diff(self, dataset, staged_count: int) -> dict[str, int]:
+        """
+        Make the dataset's features equal to the staging table, touching only
+        rows that changed. With a match key: delete features whose key is gone,
+        update those whose geometry or properties differ, insert new keys.
+        Without one, see _apply_content_diff.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {self.STAGING_TABLE}")
+            if self.match_key:
+                return self._apply_keyed_diff(cursor, dataset, staged_count)
+            return self._apply_content_diff(cursor, dataset, staged_count)
+
+    def _apply_keyed_diff(self, cursor, dataset, staged_count: int) -> dict[str, int]:
+        table = GeoFeature._meta.db_table
+        staging = self.STAGING_TABLE
+        new_key, new_params = self._match_expression("s")
+        old_key, old_params = self._match_expression("f")
+        content_columns = ["geometry", *GeoFeature.SIMPLIFICATION_LEVELS, "properties"]
+
+        # A NULL key never equals anything, so these rows would be deleted
+        # and re-inserted on every update as if they'd changed
+        cursor.execute(f"SELECT count(*) FROM {staging} s WHERE {new_key} IS NULL", new_params)
+        missing = cursor.fetchone()[0]
+        if missing:
+            raise ValueError(
+                f"'{self.match_key}' is missing or null on {missing} feature(s) in the "
+                "new file; choose a match key that identifies each feature"
+            )
+
+        cursor.execute(
+            f"SELECT {new_key} FROM {staging} s GROUP BY 1 HAVING count(*) > 1 LIMIT 1",
+            new_params,
+        )
+        duplicate = cursor.fetchone()
+        if duplicate:
+            raise ValueError(
+                f"'{self.match_key}' is not unique in the new file (e.g. {duplicate[0]!r}); "
+                "choose a match key that identifies each feature"
+            )
+
+        cursor.execute(
+            f"DELETE FROM {table} f WHERE f.dataset_id = %s "
+            f"AND NOT EXISTS (SELECT 1 FROM {staging} s WHERE {new_key} = {old_key})",
+            [dataset.id, *new_params, *old_params],
+        )
+        deleted = cursor.rowcount
+
+        assignments = ", ".join(f"{column} = s.{column}" for column in content_columns)
+        cursor.execute(
+            f"UPDATE {table} f SET {assignments} FROM {staging} s "
+            f"WHERE f.dataset_id = %s AND {new_key} = {old_key} "
+            "AND (f.properties IS DISTINCT FROM s.properties "
+            "OR ST_AsEWKB(f.geometry) IS DISTINCT FROM ST_AsEWKB(s.geometry))",
+            [dataset.id, *new_params, *old_params],
+        )
+        updated = cursor.rowcount
+
+        columns = ", ".join(content_columns)
+        source_columns = ", ".join(f"s.{column}" for column in content_columns)
+        cursor.execute(
+            f"INSERT INTO {table} (dataset_id, {columns}) "
+            f"SELECT %s, {source_columns} FROM {staging} s "
+            f"WHERE NOT EXISTS (SELECT 1 FROM {table} f "
+            f"WHERE f.dataset_id = %s AND {old_key} = {new_key})",
+            [dataset.id, dataset.id, *old_params, *new_params],
+        )
+        inserted = cursor.rowcount
+
+        return {
+            "inserted": inserted,
+            "updated": updated,
+            "deleted": deleted,
+            "unchanged": staged_count - inserted - updated,
+        }
+
+    def _apply_content_diff(self, cursor, dataset, staged_count: int) -> dict[str, int]:
+        """
+        Diff the features as a multiset of (geometry, properties) hashes.
+
+        Files without a key can legitimately repeat a feature (stacked points,
+        duplicated rows), so instead of requiring unique hashes this keeps
+        min(old, new) rows per hash, deletes the surplus old ones and inserts
+        the surplus new ones. Any change is a delete plus an insert, so
+        nothing counts as updated.
+        """
+        table = GeoFeature._meta.db_table
+        staging = self.STAGING_TABLE
+        content_columns = ["geometry", *GeoFeature.SIMPLIFICATION_LEVELS, "properties"]
+
+        cursor.execute(
+            f"DELETE FROM {table} WHERE id IN ("
+            "SELECT existing.id FROM ("
+            f"SELECT f.id, {self._content_hash('f')} AS hash, "
+            f"row_number() OVER (PARTITION BY {self._content_hash('f')} ORDER BY f.id) AS n "
+            f"FROM {table} f WHERE f.dataset_id = %s) existing "
+            f"LEFT JOIN (SELECT {self._content_hash('s')} AS hash, count(*) AS n "
+            f"FROM {staging} s GROUP BY 1) incoming USING (hash) "
+            "WHERE existing.n > coalesce(incoming.n, 0))",
+            [dataset.id],
+        )
+        deleted = cursor.rowcount
+
+        # Counted after the delete, so each hash now has min(old, new) rows
+        columns = ", ".join(content_columns)
+        source_columns = ", ".join(f"incoming.{column}" for column in content_columns)
+        cursor.execute(
+            f"INSERT INTO {table} (dataset_id, {columns}) "
+            f"SELECT %s, {source_columns} FROM ("
+            f"SELECT s.*, {self._content_hash('s')} AS hash, "
+            f"row_number() OVER (PARTITION BY {self._content_hash('s')}) AS n "
+            f"FROM {staging} s) incoming "
+            f"LEFT JOIN (SELECT {self._content_hash('f')} AS hash, count(*) AS n "
+            f"FROM {table} f WHERE f.dataset_id = %s GROUP BY 1) existing USING (hash) "
+            "WHERE incoming.n > coalesce(existing.n, 0)",
+            [dataset.id, dataset.id],
+        )
+        inserted = cursor.rowcount
+
+        return {
+            "inserted": inserted,
+            "updated": 0,
+            "deleted": deleted,
+            "unchanged": staged_count - inserted,
+        }
 
-    @transaction.atomic
     def _ingest_collection(self, collection) -> dict[str, Any]:
         """
-        Ingest a Fiona collection into the database.
+        Ingest a Fiona collection into the database. Must run in a transaction.
 
         Returns:
             Dictionary with dataset info and statistics
         """
         # Extract schema information
-        field_names, field_types = self._extract_schema(collection)
-        bounds = self._calculate_bounds(collection)
-
-        # Create the dataset record
-        dataset = GeoUploadedDataset.objects.create(
-            name=self.name,
-            description=self.description,
-            original_filename=self.filename,
-            file_format=self.file_format,
-            available_fields=field_names,
-            field_types=field_types,
-            bounds=bounds,
-            feature_count=0,  # Will update after processing
+        with self.metrics.phase("schema"):
+            field_names, field_types = self._extract_schema(collection)
+            source_crs, source_srid = self._source_crs(collection)
+            bounds = self._calculate_bounds(collection, source_crs)
+            total = self._feature_total(collection)
+            h3_fields = h3_aggregates.aggregate_fields(collection.schema, field_types)
+
+        if self.dataset is None:
+            # Create the dataset record
+            dataset = GeoUploadedDataset.objects.create(
+                name=self.name,
+                description=self.description,
+                original_filename=self.filename,
+                file_format=self.file_format,
+                available_fields=field_names,
+                field_types=field_types,
+                bounds=bounds,
+                source_srid=source_srid,
+                feature_count=0,  # Will update after processing
+            )
+            staging_table = None
+        else:
+            # Update in place: load the new file into a staging table, then diff
+            if self.match_key and self.match_key not in field_names:
+                raise ValueError(f"Match key '{self.match_key}' is not a field of the new file")
+            dataset = GeoUploadedDataset.objects.select_for_update().get(pk=self.dataset.pk)
+            staging_table = self._create_staging_table()
+
+        # Convert and simplify geometries (in a process pool for large files) and COPY them in
+        started = time.perf_counter()
+        h3_cells = {} if h3_fields is not None else None
+        totals = self._copy_features(
+            dataset,
+            self._converted_chunks(collection, total, h3_fields, source_crs),
+            total,
+            h3_cells,
+            staging_table,
         )
+        feature_count = totals["feature_count"]
 
-        # Bulk create features
-        features_to_create = []
-        feature_count = 0
+        changes = None
+        if staging_table is not None:
+            with self.metrics.phase("diff"):
+                changes = self._apply_diff(dataset, feature_count)
 
-        for feature in collection:
-            try:
-                # Convert geometry to GEOSGeometry
-                geom = feature.get("geometry")
-                if geom is None:
-                    continue
-
-                # Use shapely for geometry conversion
-                shapely_geom = shape(geom)
-                geos_geom = GEOSGeometry(json.dumps(mapping(shapely_geom)), srid=4326)
-
-                # Get properties
-                props = dict(feature.get("properties", {}))
-
-                features_to_create.append(
-                    GeoFeature(
-                        dataset=dataset,
-                        geometry=geos_geom,
-                        properties=props,
-                    )
-                )
-                feature_count += 1
+        elapsed = time.perf_counter() - started
+        features_per_second = feature_count / elapsed if elapsed > 0 else 0.0
 
-                # Bulk insert in batches of 1000
-                if len(features_to_create) >= 1000:
-                    GeoFeature.objects.bulk_create(features_to_create)
-                    features_to_create = []
+        changed = changes is None or bool(changes["inserted"] or changes["updated"] or changes["deleted"])
 
-            except Exception as e:
-                # Log but continue processing other features
-                print(f"Error processing feature: {e}")
-                continue
+        # Point layers: store hexagon aggregates at every H3 resolution
+        h3_cell_count = 0
+        if changes is not None and changed:
+            dataset.h3_cells.all().delete()
+        if h3_cells and changed:
+            with self.metrics.phase("h3"):
+                h3_cell_count = h3_aggregates.save_cells(dataset, h3_cells, h3_fields)
 
-        # Insert remaining features
-        if features_to_create:
-            GeoFeature.objects.bulk_create(features_to_create)
+        logger.info(
+            "Ingested %d features into dataset %s in %.2fs (%.0f features/s)",
+            feature_count, dataset.id, elapsed, features_per_second,
+        )
 
-        # Update feature count
+        # Update feature count (and, for in-place updates, schema and version)
         dataset.feature_count = feature_count
-        dataset.save(update_fields=["feature_count"])
+        if changes is None:
+            dataset.save(update_fields=["feature_count"])
+        else:
+            previous_field_types = dataset.field_types
+            dataset.original_filename = self.filename
+            dataset.file_format = self.file_format
+            dataset.available_fields = field_names
+            dataset.field_types = field_types
+            dataset.bounds = bounds
+            dataset.source_srid = source_srid
+            dataset.save(update_fields=[
+                "feature_count", "original_filename", "file_format", "available_fields",
+                "field_types", "bounds", "source_srid", "updated_at",
+            ])
+            if changed:
+                dataset.bump_version()
+            if dataset.indexed_fields:
+                # Index expressions depend on the field type; CONCURRENTLY
+                # can't run in this transaction, so rebuild after commit
+                transaction.on_commit(
+                    lambda: property_indexes.rebuild_indexes(dataset, previous_field_types)
+                )
+
+        # Clear anything cached under this id once the new content is visible
+        transaction.on_commit(lambda: tile_cache.invalidate_dataset(dataset.id))
+        transaction.on_commit(lambda: exporters.invalidate_dataset(dataset.id))
 
         return {
             "dataset_id": dataset.id,
@@ -218,6 +732,14 @@ class GeoProcessor:
             "available_fields": field_names,
             "field_types": field_types,
             "bounds": bounds,
+            "source_srid": source_srid,
+            "ingest_seconds": round(elapsed, 3),
+            "features_per_second": round(features_per_second, 1),
+            "geometries_repaired": totals["geometries_repaired"],
+            "features_skipped": totals["features_skipped"],
+            "h3_cells": h3_cell_count,
+            "version": dataset.version,
+            **({"changes": changes} if changes is not None else {}),
         }
 
     def process(self) -> dict[str, Any]:
@@ -227,25 +749,16 @@ class GeoProcessor:
         Returns:
             Dictionary with dataset info and statistics
         """
-        # Save the file to a temporary location
-        with tempfile.NamedTemporaryFile(
-            delete=False,
-            suffix=os.path.splitext(self.filename)[1]
-        ) as temp_file:
-            for chunk in self.file.chunks():
-                temp_file.write(chunk)
-            temp_path = temp_file.name
-
-        try:
-            if self.file_format == "geojson":
-                return self._process_geojson(temp_path)
-            elif self.file_format == "gpkg":
-                return self._process_gpkg(temp_path)
-            elif self.file_format == "shp":
-                return self._process_shapefile(temp_path)
-            else:
-                raise ValueError(f"Unsupported format: {self.file_format}")
-        finally:
-            # Clean up temp file
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
+        with self._open_collection() as collection:
+            with transaction.atomic():
+                result = self._ingest_collection(collection)
+                commit_started = time.perf_counter()
+            self.metrics.add("commit", time.perf_counter() - commit_started)
+
+        # Recorded after commit so the report includes the commit itself
+        result["metrics"] = self.metrics.as_dict(result["feature_count"])
+        GeoUploadedDataset.objects.filter(pk=result["dataset_id"]).update(
+            ingest_metrics=result["metrics"]
+        )
+        logger.info("Ingest metrics for dataset %s: %s", result["dataset_id"], result["metrics"])
+        return result
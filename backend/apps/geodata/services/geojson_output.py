@@ -0,0 +1,155 @@
+"""
+GeoJSON output helpers for uploaded PostGIS datasets.
+"""
+
+import json
+from collections.abc import Iterator
+
+import numpy as np
+import shapely
+from django.contrib.gis.db.models.functions import AsGeoJSON
+from django.db import connection
+from django.db.models.functions import Coalesce
+from shapely.geometry import mapping, shape
+
+# Rows fetched per round trip from the server-side cursor while streaming.
+STREAM_CHUNK_SIZE = 2000
+
+# Coordinate decimals: 6 is ~10 cm at the equator, well below a pixel at street zoom
+DEFAULT_PRECISION = 6
+
+
+def _geojson_rows(queryset, geometry_column: str = "geometry", precision: int = DEFAULT_PRECISION):
+    """
+    Project a GeoFeature queryset onto PostGIS-serialized geometry and properties.
+    A simplified geometry column falls back to the full geometry where it is NULL;
+    coordinates are rounded to `precision` decimals by ST_AsGeoJSON.
+    """
+    geometry = "geometry"
+    if geometry_column != "geometry":
+        geometry = Coalesce(geometry_column, "geometry")
+
+    return queryset.annotate(
+        geometry_json=AsGeoJSON(geometry, precision=precision)
+    ).values_list("geometry_json", "properties")
+
+
+def build_feature_collection(
+    queryset,
+    value_field: str | None = None,
+    geometry_column: str = "geometry",
+    precision: int = DEFAULT_PRECISION,
+) -> str:
+    """
+    Assemble a GeoJSON FeatureCollection for a GeoFeature queryset entirely in SQL.
+
+    ST_AsGeoJSON, json_build_object and json_agg produce the final document, so
+    the text PostGIS returns is sent to the client unchanged — no GEOS objects,
+    no json.loads and no renderer pass in Python.
+    """
+    inner_sql, inner_params = _geojson_rows(
+        queryset, geometry_column, precision
+    ).query.sql_with_params()
+
+    properties_sql = "f.properties"
+    properties_params = []
+    if value_field:
+        # Same rule as the streaming path: add 'value' only when the key is present
+        properties_sql = (
+            "CASE WHEN f.properties ? %s "
+            "THEN f.properties || jsonb_build_object('value', f.properties -> %s) "
+            "ELSE f.properties END"
+        )
+        properties_params = [value_field, value_field]
+
+    sql = f"""
+        SELECT json_build_object(
+            'type', 'FeatureCollection',
+            'features', COALESCE(
+                json_agg(json_build_object(
+                    'type', 'Feature',
+                    'geometry', f.geometry_json::json,
+                    'properties', {properties_sql}
+                )),
+                '[]'::json
+            )
+        )::text
+        FROM ({inner_sql}) AS f
+    """
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*properties_params, *inner_params])
+        return cursor.fetchone()[0]
+
+
+def stream_feature_collection(
+    queryset,
+    value_field: str | None = None,
+    geometry_column: str = "geometry",
+    precision: int = DEFAULT_PRECISION,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> Iterator[str]:
+    """
+    Yield a GeoJSON FeatureCollection for a GeoFeature queryset piece by piece.
+
+    Rows are read through a server-side cursor and geometry is serialized by
+    PostGIS, so memory stays flat no matter how many features the dataset has.
+    Output is flushed once per chunk rather than once per feature.
+    """
+    rows = _geojson_rows(queryset, geometry_column, precision).iterator(chunk_size=chunk_size)
+
+    yield '{"type": "FeatureCollection", "features": ['
+
+    buffer = []
+    separator = ""
+    for geometry_json, properties in rows:
+        # Include all properties, plus a 'value' key for the selected field
+        if value_field and value_field in properties:
+            properties = {**properties, "value": properties[value_field]}
+
+        buffer.append(
+            f'{separator}{{"type": "Feature", "geometry": {geometry_json}, '
+            f'"properties": {json.dumps(properties)}}}'
+        )
+        separator = ", "
+
+        if len(buffer) >= chunk_size:
+            yield "".join(buffer)
+            buffer = []
+
+    if buffer:
+        yield "".join(buffer)
+    yield "]}"
+
+
+def round_coordinates(geojson: dict, precision: int) -> dict:
+    """
+    Return a copy of a stored GeoJSON Feature or FeatureCollection with
+    coordinates rounded to `precision` decimals.
+
+    All geometries are rounded in one numpy pass over their combined
+    coordinate array (shapely.transform) instead of walking nested lists.
+    """
+    if geojson.get("type") == "Feature":
+        collection = {"type": "FeatureCollection", "features": [geojson]}
+        return round_coordinates(collection, precision)["features"][0]
+
+    features = geojson.get("features")
+    if geojson.get("type") != "FeatureCollection" or not features:
+        return geojson
+
+    indexes = [i for i, feature in enumerate(features) if feature.get("geometry")]
+    geoms = np.array([shape(features[i]["geometry"]) for i in indexes], dtype=object)
+
+    def round_coords(coords):
+        return np.round(coords, precision)
+
+    # transform() drops Z unless asked, and adds NaN Z if asked on 2D input
+    has_z = shapely.has_z(geoms)
+    geoms[~has_z] = shapely.transform(geoms[~has_z], round_coords)
+    geoms[has_z] = shapely.transform(geoms[has_z], round_coords, include_z=True)
+
+    rounded = list(features)
+    for i, geom in zip(indexes, geoms):
+        rounded[i] = {**features[i], "geometry": mapping(geom)}
+    return {**geojson, "features": rounded}
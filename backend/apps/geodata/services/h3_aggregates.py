@@ -0,0 +1,142 @@
+"""
+H3 hexagon aggregates for point datasets.
+
+During ingest each conversion chunk bins its points into H3 cells at the finest
+resolution (point_cells), the parent merges the partial sums (merge_cells), and
+save_cells rolls them up to every coarser resolution in H3_RESOLUTIONS and
+stores one GeoH3Cell per cell. Maps can then draw a few thousand hexagons
+instead of every point.
+"""
+
+import json
+
+import shapely
+from django.contrib.gis.geos import Polygon
+
+from apps.geodata.models import GeoH3Cell
+
+try:
+    import h3
+except ImportError:  # optional; point datasets are ingested without aggregates
+    h3 = None
+
+# Finest last; roughly 250 km², 5 km² and 0.1 km² cells
+H3_RESOLUTIONS = (5, 7, 9)
+
+POINT_GEOMETRY_TYPES = {"Point", "3D Point", "MultiPoint", "3D MultiPoint"}
+
+NUMERIC_FIELD_TYPES = {"integer", "float"}
+
+BULK_BATCH_SIZE = 5000
+
+
+def aggregate_fields(schema: dict, field_types: dict[str, str]) -> list[str] | None:
+    """
+    Numeric fields to aggregate for a collection schema, or None when the
+    dataset doesn't get H3 aggregates (not a point layer, or h3 isn't installed).
+    """
+    if h3 is None or schema.get("geometry") not in POINT_GEOMETRY_TYPES:
+        return None
+    return [name for name, field_type in field_types.items() if field_type in NUMERIC_FIELD_TYPES]
+
+
+def _number(value) -> float | None:
+    if isinstance(value, bool) or value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def point_cells(geometries, properties: list[dict], fields: list[str]) -> dict[str, list]:
+    """
+    Bin points into cells at the finest resolution.
+
+    Returns {cell: [count, [sum per field], [non-null count per field]]}.
+    Multipoints count once, at their centroid.
+    """
+    resolution = H3_RESOLUTIONS[-1]
+    centroids = shapely.centroid(geometries)
+    xs, ys = shapely.get_x(centroids), shapely.get_y(centroids)
+
+    cells = {}
+    for x, y, props in zip(xs, ys, properties):
+        if x != x or y != y:  # empty geometry
+            continue
+        cell = h3.latlng_to_cell(y, x, resolution)
+        entry = cells.get(cell)
+        if entry is None:
+            entry = cells[cell] = [0, [0.0] * len(fields), [0] * len(fields)]
+        entry[0] += 1
+        for i, field in enumerate(fields):
+            value = _number(props.get(field))
+            if value is not None:
+                entry[1][i] += value
+                entry[2][i] += 1
+    return cells
+
+
+def merge_cells(into: dict[str, list], cells: dict[str, list]) -> None:
+    """Add partial cell aggregates into an accumulator, in place."""
+    for cell, (count, sums, counts) in cells.items():
+        entry = into.get(cell)
+        if entry is None:
+            into[cell] = [count, list(sums), list(counts)]
+            continue
+        entry[0] += count
+        for i in range(len(sums)):
+            entry[1][i] += sums[i]
+            entry[2][i] += counts[i]
+
+
+def _boundary(cell: str) -> Polygon:
+    # h3 returns an open ring of (lat, lng) pairs
+    ring = [(lng, lat) for lat, lng in h3.cell_to_boundary(cell)]
+    return Polygon(ring + ring[:1], srid=4326)
+
+
+def save_cells(dataset, cells: dict[str, list], fields: list[str]) -> int:
+    """Roll finest-resolution aggregates up to every resolution and store them."""
+    created = 0
+    for resolution in H3_RESOLUTIONS:
+        level = {}
+        for cell, entry in cells.items():
+            if resolution != H3_RESOLUTIONS[-1]:
+                cell = h3.cell_to_parent(cell, resolution)
+            merge_cells(level, {cell: entry})
+
+        rows = [
+            GeoH3Cell(
+                dataset=dataset,
+                resolution=resolution,
+                cell=cell,
+                count=count,
+                sums={field: sums[i] for i, field in enumerate(fields) if counts[i]},
+                value_counts={field: counts[i] for i, field in enumerate(fields) if counts[i]},
+                geometry=_boundary(cell),
+            )
+            for cell, (count, sums, counts) in level.items()
+        ]
+        GeoH3Cell.objects.bulk_create(rows, batch_size=BULK_BATCH_SIZE)
+        created += len(rows)
+    return created
+
+
+def cell_feature_collection(queryset, value_field: str | None = None) -> dict:
+    """GeoJSON FeatureCollection of GeoH3Cell rows, with sum/mean of value_field."""
+    features = []
+    for cell in queryset.order_by("cell"):
+        properties = {"h3": cell.cell, "count": cell.count}
+        if value_field:
+            total = cell.sums.get(value_field)
+            n = cell.value_counts.get(value_field, 0)
+            properties["sum"] = total
+            properties["mean"] = total / n if n else None
+            properties["value"] = properties["mean"]
+        features.append({
+            "type": "Feature",
+            "geometry": json.loads(cell.geometry.geojson),
+            "properties": properties,
+        })
+    return {"type": "FeatureCollection", "features": features}
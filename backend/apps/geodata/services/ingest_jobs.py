@@ -0,0 +1,252 @@
+"""
+Database-backed queue for background ingestion of uploaded geospatial files.
+
+Uploads are staged to GEODATA_STAGING_DIR and recorded as GeoIngestJob rows;
+run_geo_ingest_worker claims them with SELECT ... FOR UPDATE SKIP LOCKED, so
+several workers can share the queue without any outside broker.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.geodata.models import GeoIngestJob
+from apps.geodata.serializers import GeoUploadResponseSerializer
+
+from .geo_processor import GeoProcessor
+from .ingest_metrics import IngestMetrics
+
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between progress writes
+PROGRESS_INTERVAL = 1.0
+
+# Seconds between heartbeats of a running job
+HEARTBEAT_INTERVAL = 60
+
+# Running jobs whose heartbeat stopped this long ago belong to a dead worker
+STALE_AFTER = timedelta(minutes=15)
+
+
+def stage_upload(uploaded_file) -> str:
+    """Move or copy an uploaded file into the staging directory and return its path."""
+    staging_dir = Path(settings.GEODATA_STAGING_DIR)
+    staging_dir.mkdir(parents=True, exist_ok=True)
+
+    fd, path = tempfile.mkstemp(
+        dir=staging_dir, suffix=os.path.splitext(uploaded_file.name)[1]
+    )
+
+    # Large uploads are already on disk; take the file over instead of copying it
+    # (a rename when FILE_UPLOAD_TEMP_DIR is on the same filesystem)
+    temporary_file_path = getattr(uploaded_file, "temporary_file_path", None)
+    if temporary_file_path:
+        os.close(fd)
+        shutil.move(temporary_file_path(), path)
+        return path
+
+    with os.fdopen(fd, "wb") as staged:
+        for chunk in uploaded_file.chunks():
+            staged.write(chunk)
+    return path
+
+
+def enqueue_staged(
+    path: str,
+    filename: str,
+    name: str = "",
+    description: str = "",
+    update_dataset=None,
+    match_key: str = "",
+) -> GeoIngestJob:
+    """
+    Queue a file that is already in the staging directory for ingestion,
+    either as a new dataset or as an in-place update of update_dataset.
+    """
+    return GeoIngestJob.objects.create(
+        staged_path=path,
+        original_filename=filename,
+        name=name or "",
+        description=description,
+        update_dataset=update_dataset,
+        match_key=match_key or "",
+    )
+
+
+def enqueue_upload(
+    uploaded_file, name: str = "", description: str = "", update_dataset=None, match_key: str = ""
+) -> GeoIngestJob:
+    """Stage an uploaded file and queue it for ingestion."""
+    started = time.perf_counter()
+    path = stage_upload(uploaded_file)
+    spooled = time.perf_counter() - started
+
+    job = enqueue_staged(path, uploaded_file.name, name, description, update_dataset, match_key)
+    job.metrics = {"phases": {"spool": round(spooled, 3)}}
+    job.save(update_fields=["metrics"])
+    return job
+
+
+def claim_next_job() -> GeoIngestJob | None:
+    """Mark the oldest queued job as running and return it, or None if the queue is empty."""
+    with transaction.atomic():
+        job = (
+            GeoIngestJob.objects.select_for_update(skip_locked=True)
+            .filter(status="queued")
+            .order_by("created_at")
+            .first()
+        )
+        if job is None:
+            return None
+
+        job.status = "running"
+        job.started_at = timezone.now()
+        job.save(update_fields=["status", "started_at", "updated_at"])
+        return job
+
+
+def requeue_stale_jobs() -> int:
+    """Put jobs abandoned by a crashed worker back on the queue."""
+    return GeoIngestJob.objects.filter(
+        status="running", updated_at__lt=timezone.now() - STALE_AFTER
+    ).update(status="queued", started_at=None, features_ingested=0)
+
+
+class JobProgress:
+    """
+    Progress callback for GeoProcessor that records counts on a GeoIngestJob.
+
+    The ingest itself runs in one transaction, so updates go over a separate
+    autocommit connection — otherwise pollers wouldn't see them until the end.
+    """
+
+    def __init__(self, job: GeoIngestJob):
+        self.job_id = job.pk
+        self.table = GeoIngestJob._meta.db_table
+        self.last_write = 0.0
+        self.conn = connection.get_new_connection(connection.get_connection_params())
+        self.conn.autocommit = True
+
+    def __call__(self, features_ingested: int, total_features: int | None) -> None:
+        now = time.monotonic()
+        if now - self.last_write < PROGRESS_INTERVAL:
+            return
+        self.last_write = now
+        with self.conn.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {self.table} "
+                "SET features_ingested = %s, total_features = %s, updated_at = now() "
+                "WHERE id = %s",
+                (features_ingested, total_features, self.job_id),
+            )
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class JobHeartbeat:
+    """
+    Touches a running job's updated_at from a background thread.
+
+    Progress only moves after each COPY chunk; opening a large file, the
+    update diff, H3 aggregation and the commit can each take longer than
+    STALE_AFTER without any, and must not look like a dead worker's job.
+    """
+
+    def __init__(self, job: GeoIngestJob):
+        self.job_id = job.pk
+        self.table = GeoIngestJob._meta.db_table
+        self.params = connection.get_connection_params()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(
+            target=self._run, name=f"ingest-heartbeat-{job.pk}", daemon=True
+        )
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def _run(self) -> None:
+        conn = connection.get_new_connection(self.params)
+        conn.autocommit = True
+        try:
+            while not self.stopped.wait(HEARTBEAT_INTERVAL):
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        f"UPDATE {self.table} SET updated_at = now() "
+                        "WHERE id = %s AND status = 'running'",
+                        (self.job_id,),
+                    )
+        except Exception:
+            logger.exception("Heartbeat for ingest job %s stopped", self.job_id)
+        finally:
+            conn.close()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.thread.join()
+
+
+def _job_result(job: GeoIngestJob, result: dict) -> dict:
+    """
+    The processor result in the shape GeoUploadResponseSerializer documents.
+    The dataset is already committed, so a mismatch is logged, not failed.
+    """
+    serializer = GeoUploadResponseSerializer(data=result)
+    if serializer.is_valid():
+        return serializer.data
+    logger.error("Ingest job %s produced an unexpected result: %s", job.pk, serializer.errors)
+    return result
+
+
+def run_job(job: GeoIngestJob) -> GeoIngestJob:
+    """Ingest a claimed job's staged file and record the outcome on the job."""
+    progress = JobProgress(job)
+    heartbeat = JobHeartbeat(job)
+    heartbeat.start()
+    metrics = IngestMetrics(phases=(job.metrics or {}).get("phases"))
+    try:
+        processor = GeoProcessor(
+            file=None,
+            filename=job.original_filename,
+            name=job.name or None,
+            description=job.description,
+            progress_callback=progress,
+            path=job.staged_path,
+            dataset=job.update_dataset,
+            match_key=job.match_key,
+            metrics=metrics,
+        )
+        result = processor.process()
+    except Exception as e:
+        logger.exception("Ingest job %s failed", job.pk)
+        job.status = "failed"
+        job.error = str(e)
+        job.features_ingested = 0
+        job.metrics = metrics.as_dict(0)
+    else:
+        job.status = "succeeded"
+        job.result = _job_result(job, result)
+        job.metrics = result["metrics"]
+        job.dataset_id = result["dataset_id"]
+        job.features_ingested = result["feature_count"]
+    finally:
+        heartbeat.stop()
+        progress.close()
+        if os.path.exists(job.staged_path):
+            os.unlink(job.staged_path)
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=[
+        "status", "result", "error", "metrics", "dataset", "features_ingested", "finished_at",
+        "updated_at",
+    ])
+    return job
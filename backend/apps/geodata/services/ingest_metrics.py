@@ -0,0 +1,97 @@
+"""
+Ingest instrumentation: wall-clock time per phase, invalid geometry counts by
+reason and peak memory, collected while GeoProcessor runs and stored with the
+dataset and its ingest job.
+"""
+
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# Order phases are reported in; anything else is appended after these
+PHASES = ["spool", "open", "schema", "read", "convert", "insert", "diff", "h3", "commit"]
+
+
+def reset_peak_rss() -> bool:
+    """
+    Reset this process's peak RSS (VmHWM) to its current RSS, so a long-lived
+    worker can measure the peak of one ingest. Linux only; False elsewhere.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _vm_hwm_mb() -> float | None:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)  # reported in kB
+    except OSError:
+        pass
+    return None
+
+
+def peak_rss_mb(since_reset: bool = False) -> dict[str, float | None] | None:
+    """
+    Peak resident set size in MiB, or None where resource isn't available.
+
+    "ingest" is this process's peak since reset_peak_rss() (None if it
+    couldn't be reset). The *_lifetime values are the peaks over the whole
+    life of this process and of all its finished children (the conversion
+    pools), so in a long-running worker they may come from an earlier job.
+    """
+    if resource is None:
+        return None
+    # ru_maxrss is in KiB on Linux
+    return {
+        "ingest": _vm_hwm_mb() if since_reset else None,
+        "process_lifetime": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "workers_lifetime": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+    }
+
+
+class IngestMetrics:
+    """Accumulates phase timings and invalid geometry reasons for one ingest."""
+
+    def __init__(self, phases: dict[str, float] | None = None):
+        self.phases = Counter(phases or {})
+        self.invalid_reasons = Counter()
+        self.started = time.perf_counter()
+        self.peak_reset = reset_peak_rss()
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] += seconds
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block and add it to the named phase."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def count_invalid(self, reasons: dict[str, int]) -> None:
+        self.invalid_reasons.update(reasons)
+
+    def as_dict(self, feature_count: int) -> dict:
+        """JSON-serializable report; seconds are rounded to milliseconds."""
+        elapsed = time.perf_counter() - self.started
+        ordered = [p for p in PHASES if p in self.phases] + sorted(set(self.phases) - set(PHASES))
+        return {
+            "total_seconds": round(elapsed, 3),
+            "phases": {name: round(self.phases[name], 3) for name in ordered},
+            "features_per_second": round(feature_count / elapsed, 1) if elapsed > 0 else None,
+            "invalid_geometries": dict(self.invalid_reasons.most_common()),
+            "peak_rss_mb": peak_rss_mb(since_reset=self.peak_reset),
+        }
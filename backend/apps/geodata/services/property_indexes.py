@@ -0,0 +1,137 @@
+"""
+Typed access to GeoFeature.properties, plus opt-in per-dataset expression indexes.
+
+Each indexed property gets a partial index on the same expression that
+property_expression() produces for queries, e.g.
+
+    CREATE INDEX ... ON geo_features ((CASE WHEN (properties ->> 'pop')::text ~* '...'
+        THEN ((properties ->> 'pop'))::double precision END)) WHERE dataset_id = 12
+
+so where= filters on that dataset become index scans instead of JSONB scans.
+The CASE guards the cast: a value the type can't parse (say "n/a" in a numeric
+column) reads as NULL instead of failing the query, the stats or the index.
+"""
+
+import hashlib
+
+from django.db import connection, models
+from django.db.models import Case, When
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import Cast
+from django.db.models.lookups import IRegex
+
+from apps.geodata.models import GeoFeature
+
+# field_types value -> SQL cast applied to properties ->> field. Integers are
+# cast to double precision too, so "3" and "3.0" compare the same way.
+# Dates stay text: ISO strings sort correctly and text -> date isn't immutable.
+PROPERTY_CASTS = {
+    "integer": "double precision",
+    "float": "double precision",
+    "boolean": "boolean",
+}
+
+OUTPUT_FIELDS = {
+    "double precision": models.FloatField,
+    "boolean": models.BooleanField,
+}
+
+# Text each cast accepts (matched case-insensitively); other values read as NULL.
+# Plain character classes only, so the pattern is the same literal in Python and SQL.
+CAST_PATTERNS = {
+    "double precision": "^ *[-+]?([0-9]+[.]?[0-9]*|[.][0-9]+)(e[-+]?[0-9]+)? *$",
+    "boolean": "^ *(t|true|f|false|y|yes|n|no|on|off|1|0) *$",
+}
+
+
+def property_expression(field: str, field_type: str | None):
+    """Django expression for a property as its typed value, matching its index."""
+    expression = KeyTextTransform(field, "properties")
+    cast = PROPERTY_CASTS.get(field_type)
+    if cast is None:
+        return expression
+    return Case(When(IRegex(expression, CAST_PATTERNS[cast]), then=Cast(expression, OUTPUT_FIELDS[cast]())))
+
+
+def typed_property_sql(text_sql: str, field_type: str | None) -> str:
+    """
+    Raw-SQL counterpart of property_expression: text_sql (e.g. "(f.properties ->> %s)",
+    placeholders and all) as its typed value, with the same guard. text_sql is
+    repeated, so its parameters have to be passed twice when a cast applies.
+    """
+    cast = PROPERTY_CASTS.get(field_type)
+    if cast is None:
+        return text_sql
+    return f"(CASE WHEN {text_sql}::text ~* '{CAST_PATTERNS[cast]}' THEN ({text_sql})::{cast} END)"
+
+
+def index_name(dataset_id: int, field: str) -> str:
+    # Field names are arbitrary text; hash them to get a valid, bounded identifier
+    digest = hashlib.md5(field.encode("utf-8")).hexdigest()[:10]
+    return f"geo_feature_prop_{dataset_id}_{digest}"
+
+
+def _index_sql(dataset, field: str) -> str:
+    quote = connection.ops.quote_name
+    table = GeoFeature._meta.db_table
+    literal = "'" + field.replace("'", "''") + "'"
+    expression = typed_property_sql(f"(properties ->> {literal})", dataset.field_types.get(field))
+    return (
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {quote(index_name(dataset.pk, field))} "
+        f"ON {quote(table)} ({expression}) WHERE dataset_id = {int(dataset.pk)}"
+    )
+
+
+def create_index(dataset, field: str) -> None:
+    """
+    Build the expression index for one property and record it on the dataset.
+    Runs CONCURRENTLY, so it must not be called inside a transaction.
+    """
+    if field not in dataset.available_fields:
+        raise ValueError(f"Unknown field for this dataset: {field}")
+
+    with connection.cursor() as cursor:
+        cursor.execute(_index_sql(dataset, field))
+        cursor.execute(f"ANALYZE {connection.ops.quote_name(GeoFeature._meta.db_table)}")
+
+    if field not in dataset.indexed_fields:
+        dataset.indexed_fields = [*dataset.indexed_fields, field]
+        dataset.save(update_fields=["indexed_fields", "updated_at"])
+
+
+def drop_index(dataset, field: str) -> None:
+    """Drop one property's expression index and unrecord it."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DROP INDEX CONCURRENTLY IF EXISTS {connection.ops.quote_name(index_name(dataset.pk, field))}"
+        )
+
+    if field in dataset.indexed_fields:
+        dataset.indexed_fields = [f for f in dataset.indexed_fields if f != field]
+        dataset.save(update_fields=["indexed_fields", "updated_at"])
+
+
+def rebuild_indexes(dataset, previous_field_types: dict[str, str]) -> None:
+    """
+    Recreate the indexes of fields whose type changed (say in an in-place
+    update), since their expression changes with it; drop those of fields the
+    dataset no longer has. Runs CONCURRENTLY, so not inside a transaction.
+    """
+    for field in list(dataset.indexed_fields):
+        if field not in dataset.available_fields:
+            drop_index(dataset, field)
+        elif dataset.field_types.get(field) != previous_field_types.get(field):
+            drop_index(dataset, field)
+            create_index(dataset, field)
+
+
+def drop_dataset_indexes(dataset_id: int, fields: list[str]) -> None:
+    """
+    Drop the expression indexes of a deleted dataset. Partial indexes outlive
+    their rows, so this has to happen explicitly.
+    """
+    with connection.cursor() as cursor:
+        for field in fields:
+            cursor.execute(
+                f"DROP INDEX IF EXISTS {connection.ops.quote_name(index_name(dataset_id, field))}"
+            )
@@ -0,0 +1,100 @@
+"""
+Pre-rendered, pre-compressed response bodies for GeoDataset GeoJSON.
+
+Entries are keyed on (slug, updated_at, precision), so saving a dataset makes
+its old entries unreachable. Each entry holds the identity, gzip and (when the
+brotli package is installed) brotli bodies plus a strong content ETag; each
+coding is served with its own validator derived from it (see etag_for).
+"""
+
+import gzip
+import hashlib
+import json
+
+from django.core.cache import cache
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+# Entries also go stale via the key, so this only bounds how long orphans linger
+CACHE_TIMEOUT = 60 * 60 * 24
+
+# Entries are built on the request thread on a miss, so these favour speed over
+# the last few percent of size (gzip 9 / brotli 11 take seconds on multi-MB bodies)
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def cache_key(slug: str, updated_at, precision: int | None) -> str:
+    return f"geojson:{slug}:{updated_at.timestamp()}:{precision if precision is not None else 'raw'}"
+
+
+def render_entry(geojson) -> dict:
+    """Serialize GeoJSON once and compress it with every supported encoding."""
+    body = json.dumps(geojson, separators=(",", ":")).encode("utf-8")
+    entry = {
+        "etag": f'"{hashlib.sha256(body).hexdigest()}"',
+        "identity": body,
+        "gzip": gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0),
+    }
+    if brotli is not None:
+        entry["br"] = brotli.compress(body, quality=BROTLI_QUALITY)
+    return entry
+
+
+def get_or_render(key: str, load_geojson) -> dict:
+    """Return the cached entry for key, calling load_geojson() only on a miss."""
+    entry = cache.get(key)
+    if entry is None:
+        entry = render_entry(load_geojson())
+        cache.set(key, entry, CACHE_TIMEOUT)
+    return entry
+
+
+def accepted_encodings(header: str) -> set[str]:
+    """Content codings listed in an Accept-Encoding header, minus those with q=0."""
+    encodings = set()
+    for item in header.split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if coding and quality > 0:
+            encodings.add(coding.lower())
+    return encodings
+
+
+def choose_encoding(entry: dict, accept_encoding: str) -> str:
+    """Pick the smallest body the client accepts: brotli, then gzip, then identity."""
+    accepted = accepted_encodings(accept_encoding)
+    for coding in ("br", "gzip"):
+        if coding in entry and (coding in accepted or "*" in accepted):
+            return coding
+    return "identity"
+
+
+def etag_for(entry: dict, encoding: str) -> str:
+    """
+    Strong ETag of one coding of the entry. Compressed bodies are different
+    representations (RFC 9110 8.8.3), so they get the coding appended:
+    "<sha256>" for identity, "<sha256>-gzip", "<sha256>-br".
+    """
+    if encoding == "identity":
+        return entry["etag"]
+    return f'{entry["etag"][:-1]}-{encoding}"'
+
+
+def etag_matches(entry: dict, if_none_match: str, encoding: str = "identity") -> bool:
+    """True if an If-None-Match header matches the ETag of the coding being served."""
+    if not if_none_match:
+        return False
+    tags = {tag.strip() for tag in if_none_match.split(",")}
+    # Weak comparison is what If-None-Match calls for
+    tags |= {tag[2:] for tag in tags if tag.startswith("W/")}
+    return "*" in tags or etag_for(entry, encoding) in tags
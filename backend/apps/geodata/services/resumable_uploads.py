@@ -0,0 +1,216 @@
+"""
+Resumable chunked uploads, modelled on the tus core protocol.
+
+A client creates a GeoUploadSession with the file's name and size, then sends
+the file in PATCH requests, each starting at the session's current offset and
+carrying a SHA-256 checksum of the chunk. Chunks are appended to a partial
+file in GEODATA_STAGING_DIR; after a dropped connection the client asks for
+the offset and resumes from there. When the last byte arrives the staged file
+is queued as a GeoIngestJob.
+"""
+
+import base64
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.geodata.models import GeoUploadSession
+
+from . import ingest_jobs
+from .geo_processor import GeoProcessor
+
+# Bytes read from the request per write
+READ_BLOCK_SIZE = 1024 * 1024
+
+# Open sessions without a chunk for this long are abandoned
+SESSION_EXPIRY = timedelta(hours=24)
+
+
+class OffsetMismatch(ValueError):
+    """The chunk doesn't start at the session's current offset."""
+
+
+class ChecksumMismatch(ValueError):
+    """The chunk's bytes don't match the checksum the client sent."""
+
+
+def create_session(
+    filename: str,
+    total_size: int,
+    name: str = "",
+    description: str = "",
+    update_dataset=None,
+    match_key: str = "",
+) -> GeoUploadSession:
+    """Validate an upload's name and size and open a session with an empty staged file."""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in GeoProcessor.SUPPORTED_FORMATS:
+        raise ValueError(
+            f"Unsupported file format: {extension}. "
+            f"Supported formats: {list(GeoProcessor.SUPPORTED_FORMATS.keys())}"
+        )
+    if total_size <= 0:
+        raise ValueError("size must be a positive number of bytes")
+    if total_size > settings.GEODATA_MAX_UPLOAD_SIZE:
+        raise ValueError(f"File too large; the limit is {settings.GEODATA_MAX_UPLOAD_SIZE} bytes")
+
+    staging_dir = Path(settings.GEODATA_STAGING_DIR)
+    staging_dir.mkdir(parents=True, exist_ok=True)
+    fd, path = tempfile.mkstemp(dir=staging_dir, suffix=f"{extension}.part")
+    os.close(fd)
+
+    return GeoUploadSession.objects.create(
+        original_filename=filename,
+        name=name or "",
+        description=description,
+        staged_path=path,
+        total_size=total_size,
+        update_dataset=update_dataset,
+        match_key=match_key or "",
+    )
+
+
+def parse_checksum(header: str) -> bytes:
+    """Parse an Upload-Checksum header ('sha256 <base64 digest>') into the raw digest."""
+    algorithm, _, digest = (header or "").strip().partition(" ")
+    if algorithm.lower() != "sha256" or not digest:
+        raise ValueError("Upload-Checksum must be 'sha256 <base64 digest>'")
+    try:
+        return base64.b64decode(digest, validate=True)
+    except ValueError:
+        raise ValueError("Upload-Checksum digest is not valid base64")
+
+
+def _check_chunk(session: GeoUploadSession, offset: int, length: int) -> None:
+    if session.status != "open":
+        raise ValueError(f"Upload is {session.status}")
+    if offset != session.offset:
+        raise OffsetMismatch(f"Expected offset {session.offset}")
+    if offset + length > session.total_size:
+        raise ValueError("Chunk extends past the declared file size")
+
+
+def _receive_chunk(session: GeoUploadSession, stream, length: int, checksum: bytes) -> str:
+    """Read a chunk into a temporary file next to the staged file and verify it."""
+    fd, path = tempfile.mkstemp(dir=os.path.dirname(session.staged_path), suffix=".chunk")
+    try:
+        digest = hashlib.sha256()
+        received = 0
+        with os.fdopen(fd, "wb") as chunk:
+            while received < length:
+                block = stream.read(min(READ_BLOCK_SIZE, length - received))
+                if not block:
+                    break
+                chunk.write(block)
+                digest.update(block)
+                received += len(block)
+
+        if received != length:
+            raise ValueError(f"Chunk ended after {received} of {length} bytes")
+        if digest.digest() != checksum:
+            raise ChecksumMismatch("Chunk checksum does not match")
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path
+
+
+def append_chunk(session_id: int, offset: int, stream, length: int, checksum: bytes) -> GeoUploadSession:
+    """
+    Append one chunk to a session's staged file and advance its offset.
+
+    The chunk is read from the client into a temporary file outside any
+    transaction, so a slow client holds neither a connection nor the session
+    lock. Only appending the verified chunk and advancing the offset run under
+    the lock; if another request advanced the offset in the meantime, this one
+    gets OffsetMismatch and the staged file is left alone. A chunk that fails
+    its checksum never touches the staged file.
+    """
+    if length <= 0:
+        raise ValueError("Chunk is empty")
+    if length > settings.GEODATA_MAX_CHUNK_SIZE:
+        raise ValueError(f"Chunk too large; the limit is {settings.GEODATA_MAX_CHUNK_SIZE} bytes")
+
+    # Fail fast, before reading the body; re-checked under the lock below
+    session = GeoUploadSession.objects.get(pk=session_id)
+    _check_chunk(session, offset, length)
+    chunk_path = _receive_chunk(session, stream, length, checksum)
+
+    try:
+        with transaction.atomic():
+            session = GeoUploadSession.objects.select_for_update().get(pk=session_id)
+            _check_chunk(session, offset, length)
+
+            with open(session.staged_path, "r+b") as staged, open(chunk_path, "rb") as chunk:
+                # Drop anything left past the offset by an earlier, interrupted append
+                staged.truncate(offset)
+                staged.seek(offset)
+                shutil.copyfileobj(chunk, staged, READ_BLOCK_SIZE)
+
+            session.offset = offset + length
+            session.save(update_fields=["offset", "updated_at"])
+
+            if session.offset == session.total_size:
+                complete(session)
+    finally:
+        os.unlink(chunk_path)
+    return session
+
+
+def complete(session: GeoUploadSession) -> None:
+    """
+    Move a fully received file out of its .part name and queue it for ingestion.
+
+    The rename happens before the job row is written, so a worker never claims
+    a job whose file isn't there yet; if queueing fails, the file is renamed
+    back so the session (rolled back with the transaction) still matches it.
+    """
+    part_path = session.staged_path
+    path = part_path.removesuffix(".part")
+    os.replace(part_path, path)
+
+    try:
+        session.job = ingest_jobs.enqueue_staged(
+            path,
+            session.original_filename,
+            session.name,
+            session.description,
+            session.update_dataset,
+            session.match_key,
+        )
+        session.staged_path = path
+        session.status = "complete"
+        session.save(update_fields=["job", "staged_path", "status", "updated_at"])
+    except Exception:
+        os.replace(path, part_path)
+        session.staged_path = part_path
+        raise
+
+
+def abort(session: GeoUploadSession) -> None:
+    """Abandon an open session and delete its partial file."""
+    if session.status != "open":
+        raise ValueError(f"Upload is {session.status}")
+    if os.path.exists(session.staged_path):
+        os.unlink(session.staged_path)
+    session.status = "aborted"
+    session.save(update_fields=["status", "updated_at"])
+
+
+def expire_stale_sessions() -> int:
+    """Abort open sessions that stopped receiving chunks, freeing their staging space."""
+    stale = GeoUploadSession.objects.filter(
+        status="open", updated_at__lt=timezone.now() - SESSION_EXPIRY
+    )
+    count = 0
+    for session in stale:
+        abort(session)
+        count += 1
+    return count
@@ -0,0 +1,94 @@
+"""
+On-disk cache for rendered vector tiles.
+
+Tiles are stored as GEODATA_CACHE_DIR/tiles/<dataset>/v<version>/<field>/<z>/<x>/<y>.mvt,
+so bumping a dataset's version makes old tiles unreachable, and deleting the
+dataset directory drops everything cached for it.
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from urllib.parse import quote
+
+from django.conf import settings
+
+from .vector_tiles import render_tile, validate_tile
+
+# Directory name used when no value_field projection is requested
+ALL_FIELDS = "_all"
+
+# Deeper tiles are rendered on every request instead of stored. Their count
+# grows 4x per zoom level, and each one covers little enough data to render fast.
+MAX_CACHED_ZOOM = 16
+
+
+def _dataset_dir(dataset_id: int) -> Path:
+    return Path(settings.GEODATA_CACHE_DIR) / "tiles" / str(dataset_id)
+
+
+def tile_path(dataset, z: int, x: int, y: int, value_field: str | None = None) -> Path:
+    """Cache location for one tile of a dataset at its current version."""
+    field_dir = quote(value_field, safe="") if value_field else ALL_FIELDS
+    return (
+        _dataset_dir(dataset.pk)
+        / f"v{dataset.version}"
+        / field_dir
+        / str(z)
+        / str(x)
+        / f"{y}.mvt"
+    )
+
+
+def cached_tile(dataset, z: int, x: int, y: int, value_field: str | None = None) -> bytes | None:
+    """
+    Return a tile from the cache, or None if it has to be rendered.
+    Raises ValueError for tiles off the grid and fields the dataset lacks.
+    """
+    validate_tile(z, x, y)
+    if value_field and value_field not in dataset.available_fields:
+        raise ValueError(f"Unknown field for this dataset: {value_field}")
+    try:
+        return tile_path(dataset, z, x, y, value_field).read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def render_to_cache(dataset, z: int, x: int, y: int, value_field: str | None = None) -> bytes:
+    """
+    Render a tile and store it in the cache.
+    Empty tiles and tiles deeper than MAX_CACHED_ZOOM are not stored.
+    """
+    tile = render_tile(dataset, z, x, y, value_field)
+    if not tile or z > MAX_CACHED_ZOOM:
+        return tile
+
+    # Write to a temp file and rename so concurrent readers never see a partial tile
+    path = tile_path(dataset, z, x, y, value_field)
+    temp_path = None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as temp_file:
+            temp_file.write(tile)
+        os.replace(temp_path, path)
+    except OSError:
+        # Caching is best effort; the rendered tile is still served
+        if temp_path and os.path.exists(temp_path):
+            os.unlink(temp_path)
+
+    return tile
+
+
+def get_tile(dataset, z: int, x: int, y: int, value_field: str | None = None) -> bytes:
+    """Return a tile from the cache, rendering and storing it on a miss."""
+    tile = cached_tile(dataset, z, x, y, value_field)
+    if tile is None:
+        tile = render_to_cache(dataset, z, x, y, value_field)
+    return tile
+
+
+def invalidate_dataset(dataset_id: int) -> None:
+    """Drop every cached tile for a dataset, across all versions."""
+    shutil.rmtree(_dataset_dir(dataset_id), ignore_errors=True)
@@ -0,0 +1,137 @@
+"""
+Mapbox Vector Tile rendering for uploaded PostGIS datasets.
+Tiles are produced by PostGIS (ST_AsMVT / ST_AsMVTGeom) on the Web Mercator grid.
+"""
+
+import math
+from collections.abc import Iterator
+
+from django.db import connection
+
+from .property_indexes import typed_property_sql
+
+# EPSG:3857 world width in metres
+WORLD_SIZE = 40075016.68557849
+
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+MAX_ZOOM = 22
+LAYER_NAME = "features"
+
+# Latitude limit of the Web Mercator grid
+MAX_LATITUDE = 85.0511287798066
+
+# Geometry is simplified to roughly one tile-grid unit before clipping
+SIMPLIFY_UNITS = 1.0
+
+NUMERIC_FIELD_TYPES = {"integer", "float"}
+
+
+def validate_tile(z: int, x: int, y: int) -> None:
+    """Raise ValueError unless z/x/y addresses a tile on the Web Mercator grid."""
+    if not 0 <= z <= MAX_ZOOM:
+        raise ValueError(f"Zoom must be between 0 and {MAX_ZOOM}")
+    if not (0 <= x < 2**z and 0 <= y < 2**z):
+        raise ValueError(f"Tile {x}/{y} is outside the grid at zoom {z}")
+
+
+def simplify_tolerance(z: int) -> float:
+    """Simplification tolerance for zoom z, in EPSG:3857 metres."""
+    return WORLD_SIZE / (TILE_EXTENT * 2**z) * SIMPLIFY_UNITS
+
+
+def buffer_size(z: int) -> float:
+    """Width of the TILE_BUFFER margin around a tile at zoom z, in EPSG:3857 metres."""
+    return WORLD_SIZE / 2**z * TILE_BUFFER / TILE_EXTENT
+
+
+def tile_range(bounds: list[float] | None, z: int) -> Iterator[tuple[int, int]]:
+    """Yield the x/y of every tile at zoom z that covers a [minx, miny, maxx, maxy] box."""
+    n = 2**z
+    if not bounds:
+        bounds = [-180.0, -MAX_LATITUDE, 180.0, MAX_LATITUDE]
+    minx, miny, maxx, maxy = bounds
+
+    def tile_x(lon: float) -> int:
+        return min(n - 1, max(0, int((lon + 180.0) / 360.0 * n)))
+
+    def tile_y(lat: float) -> int:
+        lat = math.radians(min(MAX_LATITUDE, max(-MAX_LATITUDE, lat)))
+        return min(n - 1, max(0, int((1.0 - math.asinh(math.tan(lat)) / math.pi) / 2.0 * n)))
+
+    for x in range(tile_x(minx), tile_x(maxx) + 1):
+        # Tile rows count down from the north
+        for y in range(tile_y(maxy), tile_y(miny) + 1):
+            yield x, y
+
+
+def render_tile(dataset, z: int, x: int, y: int, value_field: str | None = None) -> bytes:
+    """
+    Render one vector tile for an uploaded dataset.
+
+    With a value_field, each feature carries only its id and a 'value'
+    attribute (numeric when field_types says so); otherwise all properties
+    are encoded. Returns an empty bytestring for tiles with no features.
+    """
+    validate_tile(z, x, y)
+
+    if value_field:
+        if dataset.field_types.get(value_field) in NUMERIC_FIELD_TYPES:
+            value_sql = typed_property_sql("(f.properties ->> %s)", dataset.field_types[value_field])
+            attributes_params = [value_field, value_field]
+        else:
+            value_sql = "f.properties ->> %s"
+            attributes_params = [value_field]
+        attributes_sql = f"{value_sql} AS value"
+    else:
+        attributes_sql = "f.properties"
+        attributes_params = []
+
+    # Web Mercator is undefined at the poles: clip to the grid's latitude
+    # limit first so polar geometries can't transform to infinities
+    sql = f"""
+        WITH bounds AS (
+            SELECT
+                ST_TileEnvelope(%s, %s, %s) AS geom,
+                ST_Transform(ST_Expand(ST_TileEnvelope(%s, %s, %s), %s), 4326) AS buffered
+        ),
+        tile AS (
+            SELECT
+                f.id,
+                {attributes_sql},
+                ST_AsMVTGeom(
+                    ST_Simplify(
+                        ST_Transform(
+                            ST_ClipByBox2D(
+                                f.geometry,
+                                ST_MakeEnvelope(-180, {-MAX_LATITUDE}, 180, {MAX_LATITUDE}, 4326)
+                            ),
+                            3857
+                        ),
+                        %s,
+                        true
+                    ),
+                    bounds.geom,
+                    {TILE_EXTENT},
+                    {TILE_BUFFER},
+                    true
+                ) AS geom
+            FROM geo_features AS f, bounds
+            WHERE f.dataset_id = %s
+              AND f.geometry && bounds.buffered
+        )
+        SELECT ST_AsMVT(tile.*, '{LAYER_NAME}', {TILE_EXTENT}, 'geom', 'id')
+        FROM tile
+        WHERE tile.geom IS NOT NULL
+    """
+    params = [
+        z, x, y, z, x, y, buffer_size(z), *attributes_params, simplify_tolerance(z), dataset.pk
+    ]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+
+    if not row or row[0] is None:
+        return b""
+    return bytes(row[0])
@@ -0,0 +1,100 @@
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase, override_settings
+
+from .services import exporters
+from .services.exporters import ExportFailed, _coerce, parse_byte_range
+
+
+class ParseByteRangeTests(SimpleTestCase):
+    def test_closed_range(self):
+        self.assertEqual(parse_byte_range("bytes=0-99", 1000), (0, 99))
+
+    def test_open_ended_range_runs_to_the_end(self):
+        self.assertEqual(parse_byte_range("bytes=500-", 1000), (500, 999))
+
+    def test_end_is_clamped_to_the_file(self):
+        self.assertEqual(parse_byte_range("bytes=900-5000", 1000), (900, 999))
+
+    def test_suffix_range(self):
+        self.assertEqual(parse_byte_range("bytes=-100", 1000), (900, 999))
+        self.assertEqual(parse_byte_range("bytes=-5000", 1000), (0, 999))
+
+    def test_whole_file_when_not_a_single_range(self):
+        for header in ("", "items=0-1", "bytes=0-1,5-6", "bytes=a-b", "bytes=-", "bytes=10-5"):
+            self.assertIsNone(parse_byte_range(header, 1000), header)
+
+    def test_unsatisfiable(self):
+        with self.assertRaises(ValueError):
+            parse_byte_range("bytes=1000-", 1000)
+        with self.assertRaises(ValueError):
+            parse_byte_range("bytes=-0", 1000)
+
+
+class CoerceTests(SimpleTestCase):
+    def test_parses_boolean_strings(self):
+        self.assertIs(_coerce("false", "boolean"), False)
+        self.assertIs(_coerce("True", "boolean"), True)
+        self.assertIs(_coerce("0", "boolean"), False)
+        self.assertIsNone(_coerce("maybe", "boolean"))
+        self.assertIs(_coerce(0, "boolean"), False)
+
+    def test_numbers_that_do_not_fit_become_null(self):
+        self.assertEqual(_coerce("12", "integer"), 12)
+        self.assertIsNone(_coerce("n/a", "float"))
+        self.assertEqual(_coerce(3, "string"), "3")
+
+
+class BuildClaimTests(SimpleTestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        settings = override_settings(GEODATA_CACHE_DIR=tmpdir.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.dataset = SimpleNamespace(pk=7, version=2)
+        self.path = exporters.export_path(self.dataset, "fgb")
+
+    def write_marker(self, pid):
+        marker = exporters._build_marker(self.path)
+        marker.parent.mkdir(parents=True, exist_ok=True)
+        marker.write_text(json.dumps({"host": exporters.socket.gethostname(), "pid": pid}))
+        return marker
+
+    def test_only_one_build_claims_an_export(self):
+        self.assertTrue(exporters._claim_build(self.path))
+        self.assertFalse(exporters._claim_build(self.path))
+
+    def test_marker_of_a_dead_process_is_reclaimed(self):
+        process = subprocess.Popen([sys.executable, "-c", "pass"])
+        process.wait()
+        self.write_marker(process.pid)
+        self.assertTrue(exporters._claim_build(self.path))
+
+    def test_marker_of_another_host_waits_for_the_timeout(self):
+        marker = exporters._build_marker(self.path)
+        marker.parent.mkdir(parents=True, exist_ok=True)
+        marker.write_text(json.dumps({"host": "elsewhere", "pid": 1}))
+        self.assertFalse(exporters._claim_build(self.path))
+
+    def test_failed_build_backs_off(self):
+        # The stand-in dataset has no fields or features, so the writer fails
+        with self.assertLogs(exporters.logger, "ERROR"):
+            exporters._build_in_background(self.dataset, "fgb")
+
+        self.assertFalse(exporters._build_marker(self.path).exists())
+        with self.assertRaises(ExportFailed) as cm:
+            exporters.get_export(self.dataset, "fgb")
+        self.assertLessEqual(cm.exception.retry_after, exporters.EXPORT_FAILURE_BACKOFF + 1)
+
+        exporters._record_failure(self.path)
+        failure = json.loads(Path(exporters._failure_record(self.path)).read_text())
+        self.assertEqual(failure["failures"], 2)
+        with self.assertRaises(ExportFailed) as cm:
+            exporters.get_export(self.dataset, "fgb")
+        self.assertGreater(cm.exception.retry_after, exporters.EXPORT_FAILURE_BACKOFF)
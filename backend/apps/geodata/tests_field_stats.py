@@ -0,0 +1,53 @@
+from django.contrib.gis.geos import Point
+from django.test import SimpleTestCase, TestCase
+
+from .models import GeoFeature, GeoUploadedDataset
+from .services.field_stats import compute_stats, jenks_breaks
+
+
+class JenksBreaksTests(SimpleTestCase):
+    def test_finds_natural_groups(self):
+        values = [1, 2, 3, 10, 11, 12, 20, 21, 22]
+        self.assertEqual(jenks_breaks(values, 3), [1, 3, 12, 22])
+
+    def test_edges_span_min_to_max(self):
+        breaks = jenks_breaks([1, 1, 2, 2, 9, 9], 2)
+        self.assertEqual(breaks, [1, 2, 9])
+
+    def test_degenerate_inputs(self):
+        self.assertEqual(jenks_breaks([], 3), [])
+        self.assertEqual(jenks_breaks([5, 5, 5], 1), [5, 5])
+
+
+class FieldStatsTests(TestCase):
+    def setUp(self):
+        self.dataset = GeoUploadedDataset.objects.create(
+            name="Towns",
+            original_filename="towns.geojson",
+            file_format="geojson",
+            available_fields=["name", "population"],
+            field_types={"name": "string", "population": "integer"},
+        )
+        GeoFeature.objects.bulk_create(
+            GeoFeature(
+                dataset=self.dataset,
+                geometry=Point(5.0, 52.0, srid=4326),
+                properties={"name": f"town {i}", "population": i},
+            )
+            for i in range(1, 11)
+        )
+
+    def test_summary_breaks_and_histogram(self):
+        stats = compute_stats(self.dataset, "population", classes=2, bins=3)
+
+        self.assertEqual((stats["count"], stats["min"], stats["max"], stats["mean"]), (10, 1, 10, 5.5))
+        self.assertEqual(stats["breaks"]["quantile"], [1, 5.5, 10])
+        self.assertEqual(stats["breaks"]["equal_interval"], [1, 5.5, 10])
+        self.assertEqual(len(stats["breaks"]["jenks"]), 3)
+        self.assertEqual([b["count"] for b in stats["histogram"]], [3, 3, 4])
+
+    def test_rejects_non_numeric_and_unknown_fields(self):
+        with self.assertRaises(ValueError):
+            compute_stats(self.dataset, "name")
+        with self.assertRaises(ValueError):
+            compute_stats(self.dataset, "area")
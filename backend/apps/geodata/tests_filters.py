@@ -0,0 +1,111 @@
+import json
+import re
+
+from django.contrib.gis.geos import Point
+from django.db.models.lookups import Exact, GreaterThanOrEqual, In, LessThanOrEqual
+from django.test import SimpleTestCase, TestCase
+
+from .filters import MAX_WHERE_VALUES, parse_where
+from .models import GeoFeature, GeoUploadedDataset
+from .services.property_indexes import CAST_PATTERNS, typed_property_sql
+
+
+class ParseWhereTests(SimpleTestCase):
+    FIELDS = ["name", "population", "capital"]
+    TYPES = {"name": "string", "population": "integer", "capital": "boolean"}
+
+    def parse(self, value):
+        return parse_where(value, self.TYPES, self.FIELDS)
+
+    def test_equality(self):
+        (lookup,) = self.parse("name:Utrecht")
+        self.assertIsInstance(lookup, Exact)
+        self.assertEqual(lookup.rhs, "Utrecht")
+
+    def test_numeric_range(self):
+        low, high = self.parse("population:1000..5000")
+        self.assertIsInstance(low, GreaterThanOrEqual)
+        self.assertIsInstance(high, LessThanOrEqual)
+        self.assertEqual((low.rhs, high.rhs), (1000.0, 5000.0))
+
+    def test_open_range(self):
+        (lookup,) = self.parse("population:..5000")
+        self.assertIsInstance(lookup, LessThanOrEqual)
+
+    def test_in_list(self):
+        (lookup,) = self.parse("capital:in(true,0)")
+        self.assertIsInstance(lookup, In)
+        self.assertEqual(list(lookup.rhs), [True, False])
+
+    def test_rejects_bad_conditions(self):
+        too_many = ",".join(str(i) for i in range(MAX_WHERE_VALUES + 1))
+        for value in (
+            "name",
+            "name:",
+            "area:10",
+            "name:in()",
+            f"population:in({too_many})",
+            "population:..",
+            "population:many",
+            "capital:yes",
+        ):
+            with self.assertRaises(ValueError, msg=value):
+                self.parse(value)
+
+
+class CastGuardTests(SimpleTestCase):
+    def matches(self, cast, value):
+        return re.search(CAST_PATTERNS[cast], value, re.IGNORECASE) is not None
+
+    def test_numeric_pattern(self):
+        for value in ("12", "-3.5", " +.5 ", "1e6", "2.E-3"):
+            self.assertTrue(self.matches("double precision", value), value)
+        for value in ("", "n/a", "1,5", "1.2.3", "NaN", "e5"):
+            self.assertFalse(self.matches("double precision", value), value)
+
+    def test_boolean_pattern(self):
+        for value in ("true", "F", "Yes", "0", "off"):
+            self.assertTrue(self.matches("boolean", value), value)
+        for value in ("", "maybe", "10"):
+            self.assertFalse(self.matches("boolean", value), value)
+
+    def test_sql_guards_typed_fields_only(self):
+        self.assertEqual(typed_property_sql("(properties ->> %s)", "string"), "(properties ->> %s)")
+        self.assertEqual(
+            typed_property_sql("(properties ->> %s)", "integer"),
+            f"(CASE WHEN (properties ->> %s)::text ~* '{CAST_PATTERNS['double precision']}' "
+            "THEN ((properties ->> %s))::double precision END)",
+        )
+
+
+class TypedPropertyQueryTests(TestCase):
+    def setUp(self):
+        self.dataset = GeoUploadedDataset.objects.create(
+            name="Towns",
+            original_filename="towns.geojson",
+            file_format="geojson",
+            available_fields=["name", "population"],
+            field_types={"name": "string", "population": "integer"},
+        )
+        for name, population in (("Ede", 5), ("Epe", "n/a"), ("Oss", 50)):
+            GeoFeature.objects.create(
+                dataset=self.dataset,
+                geometry=Point(5.0, 52.0, srid=4326),
+                properties={"name": name, "population": population},
+            )
+
+    def test_where_skips_values_that_are_not_numbers(self):
+        response = self.client.get(
+            f"/api/geodata/datasets/{self.dataset.pk}/geojson/", {"where": "population:1..10"}
+        )
+        self.assertEqual(response.status_code, 200)
+        names = [f["properties"]["name"] for f in json.loads(response.content)["features"]]
+        self.assertEqual(names, ["Ede"])
+
+    def test_stats_skip_values_that_are_not_numbers(self):
+        response = self.client.get(
+            f"/api/geodata/datasets/{self.dataset.pk}/stats/", {"field": "population"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count"], 2)
+        self.assertEqual(response.json()["max"], 50)
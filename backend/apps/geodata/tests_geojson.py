@@ -0,0 +1,97 @@
+import json
+
+from django.contrib.gis.geos import Point
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import TestCase
+from django.urls import reverse
+
+from .models import GeoFeature, GeoUploadedDataset
+from .services.geojson_output import build_feature_collection, stream_feature_collection
+
+
+def features_by_name(document):
+    return sorted(document["features"], key=lambda feature: feature["properties"]["name"])
+
+
+class GeoJSONOutputTests(TestCase):
+    def setUp(self):
+        self.dataset = GeoUploadedDataset.objects.create(
+            name="Towns",
+            original_filename="towns.geojson",
+            file_format="geojson",
+            available_fields=["name", "population"],
+            field_types={"name": "string", "population": "integer"},
+        )
+        GeoFeature.objects.bulk_create(
+            GeoFeature(
+                dataset=self.dataset,
+                geometry=Point(5 + i / 3, 52, srid=4326),
+                properties={"name": f"town {i}", **({"population": i * 100} if i else {})},
+            )
+            for i in range(5)
+        )
+        self.features = self.dataset.features.order_by("id")
+
+    def test_stream_is_a_valid_feature_collection(self):
+        pieces = list(stream_feature_collection(self.features, "population", chunk_size=2))
+        document = json.loads("".join(pieces))
+
+        self.assertEqual(document["type"], "FeatureCollection")
+        # Opening, three chunks of at most two features, closing
+        self.assertEqual(len(pieces), 5)
+        first, second = document["features"][:2]
+        self.assertEqual(first["geometry"], {"type": "Point", "coordinates": [5, 52]})
+        # 'value' is added only where the feature has the field
+        self.assertEqual(first["properties"], {"name": "town 0"})
+        self.assertEqual(second["properties"], {"name": "town 1", "population": 100, "value": 100})
+
+    def test_stream_rounds_coordinates(self):
+        document = json.loads("".join(stream_feature_collection(self.features, precision=2)))
+
+        self.assertEqual(document["features"][1]["geometry"]["coordinates"], [5.33, 52])
+
+    def test_empty_stream(self):
+        pieces = stream_feature_collection(self.dataset.features.none())
+
+        self.assertEqual(json.loads("".join(pieces)), {"type": "FeatureCollection", "features": []})
+
+    def test_endpoint_streams_on_request(self):
+        url = reverse("uploaded_dataset_geojson", args=[self.dataset.pk])
+        response = self.client.get(url, {"stream": "true", "where": "population:200..300"})
+
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertEqual(response["Content-Type"], "application/geo+json")
+        document = json.loads(b"".join(response.streaming_content))
+        names = sorted(feature["properties"]["name"] for feature in document["features"])
+        self.assertEqual(names, ["town 2", "town 3"])
+
+    def test_sql_collection_matches_the_stream(self):
+        built = json.loads(build_feature_collection(self.features, "population", precision=3))
+        streamed = json.loads(
+            "".join(stream_feature_collection(self.features, "population", precision=3))
+        )
+
+        self.assertEqual(len(built["features"]), 5)
+        self.assertEqual(features_by_name(built), features_by_name(streamed))
+
+    def test_empty_sql_collection(self):
+        built = build_feature_collection(self.dataset.features.none())
+
+        self.assertEqual(json.loads(built), {"type": "FeatureCollection", "features": []})
+
+    def test_sql_collection_uses_the_simplified_geometry_column(self):
+        # Points have no simplified geometry, so the column falls back to the full one
+        column = next(iter(GeoFeature.SIMPLIFICATION_LEVELS))
+        built = json.loads(build_feature_collection(self.features, geometry_column=column))
+
+        self.assertEqual(built["features"][0]["geometry"], {"type": "Point", "coordinates": [5, 52]})
+
+    def test_endpoint_returns_the_sql_collection_by_default(self):
+        url = reverse("uploaded_dataset_geojson", args=[self.dataset.pk])
+        response = self.client.get(url, {"value_field": "name"})
+
+        self.assertIsInstance(response, HttpResponse)
+        self.assertNotIsInstance(response, StreamingHttpResponse)
+        document = json.loads(response.content)
+        self.assertEqual(len(document["features"]), 5)
+        self.assertTrue(all(f["properties"]["value"].startswith("town") for f in document["features"]))
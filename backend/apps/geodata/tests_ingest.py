@@ -0,0 +1,153 @@
+import json
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest import mock
+
+import fiona
+import numpy as np
+import shapely
+from django.test import SimpleTestCase, TestCase, override_settings
+from pyproj import CRS
+
+from .models import GeoUploadedDataset
+from .services.geo_processor import GeoProcessor, _convert_chunk, _reproject
+
+# Amersfoort, the origin of the Dutch national grid (EPSG:28992)
+RD_NEW = CRS.from_epsg(28992).to_wkt()
+AMERSFOORT_RD = (155000, 463000)
+AMERSFOORT_LONLAT = (5.3872035, 52.1551723)
+
+
+def write_geojson(directory, features, name="points.geojson"):
+    path = os.path.join(directory, name)
+    with open(path, "w") as f:
+        json.dump({"type": "FeatureCollection", "features": features}, f)
+    return path
+
+
+def point_features(count):
+    return [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [4 + i / 100, 52 + i / 200]},
+            "properties": {"n": i},
+        }
+        for i in range(count)
+    ]
+
+
+class ConvertChunkTests(SimpleTestCase):
+    def test_repairs_invalid_and_skips_unreadable_geometries(self):
+        bowtie = {"type": "Polygon", "coordinates": [[[0, 0], [1, 1], [1, 0], [0, 1], [0, 0]]]}
+        unreadable = {"type": "Polygon", "coordinates": [[[0, 0], [1, 1]]]}
+        converted = _convert_chunk([(bowtie, {"id": 1}), (unreadable, {"id": 2})])
+
+        self.assertEqual(len(converted.rows), 1)
+        self.assertEqual((converted.repaired, converted.skipped), (1, 1))
+        self.assertIn("Self-intersection", converted.invalid_reasons)
+        self.assertEqual(json.loads(converted.rows[0][-1]), {"id": 1})
+
+    def test_points_have_no_simplified_geometries(self):
+        converted = _convert_chunk([({"type": "Point", "coordinates": [5, 52]}, {})])
+
+        _, *levels, _ = converted.rows[0]
+        self.assertEqual(levels, [None] * len(levels))
+
+
+class ReprojectionTests(SimpleTestCase):
+    def test_reprojects_to_lon_lat_and_keeps_z(self):
+        geoms = np.array([shapely.Point(*AMERSFOORT_RD), shapely.Point(*AMERSFOORT_RD, 7)])
+        flat, raised = _reproject(geoms, RD_NEW)
+
+        np.testing.assert_allclose(shapely.get_coordinates(flat)[0], AMERSFOORT_LONLAT, atol=1e-6)
+        self.assertFalse(shapely.has_z(flat))
+        self.assertEqual(shapely.get_coordinates(raised, include_z=True)[0][2], 7)
+
+    def test_detects_the_source_crs(self):
+        processor = GeoProcessor(None, "points.geojson")
+        wgs84 = CRS.from_epsg(4326).to_wkt()
+
+        self.assertEqual(processor._source_crs(SimpleNamespace(crs_wkt="")), (None, 4326))
+        self.assertEqual(processor._source_crs(SimpleNamespace(crs_wkt=wgs84)), (None, 4326))
+        wkt, srid = processor._source_crs(SimpleNamespace(crs_wkt=RD_NEW))
+        self.assertEqual(srid, 28992)
+        self.assertTrue(CRS.from_wkt(wkt).equals(CRS.from_epsg(28992)))
+
+
+# Small chunks and no size threshold so even a tiny file goes through the pool
+@override_settings(GEODATA_INGEST_WORKERS=2)
+@mock.patch.object(GeoProcessor, "INGEST_CHUNK_SIZE", 10)
+@mock.patch.object(GeoProcessor, "PARALLEL_MIN_FEATURES", 0)
+class ConvertedChunksTests(SimpleTestCase):
+    def test_pool_matches_in_process_conversion_in_file_order(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = write_geojson(tmpdir, point_features(35))
+            processor = GeoProcessor(None, "points.geojson", path=path)
+            with fiona.open(path) as collection:
+                pooled = list(processor._converted_chunks(collection, len(collection)))
+            with fiona.open(path) as collection:
+                in_process = list(processor._converted_chunks(collection, None))
+
+        self.assertEqual(processor._worker_count(35), 2)
+        self.assertEqual([len(chunk.rows) for chunk in pooled], [10, 10, 10, 5])
+        self.assertEqual([chunk.rows for chunk in pooled], [chunk.rows for chunk in in_process])
+
+
+class IngestTests(TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.tmpdir = tmpdir.name
+        settings = override_settings(GEODATA_CACHE_DIR=os.path.join(self.tmpdir, "cache"))
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def ingest(self, features):
+        path = write_geojson(self.tmpdir, features)
+        with self.captureOnCommitCallbacks(execute=True):
+            result = GeoProcessor(None, "points.geojson", path=path).process()
+        return GeoUploadedDataset.objects.get(pk=result["dataset_id"]), result
+
+    def test_copies_every_feature(self):
+        dataset, result = self.ingest(point_features(25))
+
+        self.assertEqual(result["feature_count"], 25)
+        self.assertEqual(dataset.features.count(), 25)
+        self.assertEqual(dataset.field_types, {"n": "integer"})
+        self.assertEqual(
+            sorted(dataset.features.values_list("properties__n", flat=True)), list(range(25))
+        )
+
+    @override_settings(GEODATA_INGEST_WORKERS=2)
+    @mock.patch.object(GeoProcessor, "INGEST_CHUNK_SIZE", 10)
+    @mock.patch.object(GeoProcessor, "PARALLEL_MIN_FEATURES", 0)
+    def test_parallel_ingest_stores_the_same_features(self):
+        dataset, result = self.ingest(point_features(25))
+
+        self.assertEqual(result["feature_count"], 25)
+        stored = dataset.features.order_by("properties__n")
+        self.assertEqual(
+            [(f.properties["n"], f.geometry.coords) for f in stored],
+            [(i, (4 + i / 100, 52 + i / 200)) for i in range(25)],
+        )
+
+    def test_reprojects_data_in_another_crs(self):
+        path = os.path.join(self.tmpdir, "places.gpkg")
+        schema = {"geometry": "Point", "properties": {"name": "str"}}
+        with fiona.open(path, "w", driver="GPKG", crs="EPSG:28992", schema=schema) as collection:
+            collection.write(
+                {
+                    "geometry": {"type": "Point", "coordinates": AMERSFOORT_RD},
+                    "properties": {"name": "Amersfoort"},
+                }
+            )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = GeoProcessor(None, "places.gpkg", path=path).process()
+
+        self.assertEqual(result["source_srid"], 28992)
+        np.testing.assert_allclose(result["bounds"], AMERSFOORT_LONLAT * 2, atol=1e-6)
+        feature = GeoUploadedDataset.objects.get(pk=result["dataset_id"]).features.get()
+        self.assertEqual(feature.geometry.srid, 4326)
+        np.testing.assert_allclose(feature.geometry.coords, AMERSFOORT_LONLAT, atol=1e-6)
@@ -0,0 +1,102 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.users.models import User
+
+from .models import GeoIngestJob, GeoUploadedDataset
+from .services.ingest_jobs import STALE_AFTER, claim_next_job, requeue_stale_jobs, run_job
+
+POINTS = {
+    "type": "FeatureCollection",
+    "features": [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [5 + i, 52]},
+            "properties": {"n": i},
+        }
+        for i in range(3)
+    ],
+}
+
+
+# Progress and heartbeats are written over their own connections, so the job
+# rows must really be committed
+class IngestJobTests(TransactionTestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.staging_dir = os.path.join(tmpdir.name, "staging")
+        settings = override_settings(
+            GEODATA_STAGING_DIR=self.staging_dir,
+            GEODATA_CACHE_DIR=os.path.join(tmpdir.name, "cache"),
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User.objects.create_user(username="mapper", email="mapper@example.com", password="x")
+        )
+
+    def upload(self, content=json.dumps(POINTS).encode()):
+        upload = SimpleUploadedFile("points.geojson", content, content_type="application/geo+json")
+        return self.client.post(reverse("geo_file_upload"), {"file": upload, "name": "Points"})
+
+    def test_upload_stages_the_file_and_queues_a_job(self):
+        response = self.upload()
+
+        self.assertEqual(response.status_code, 202)
+        job = GeoIngestJob.objects.get(pk=response.data["job_id"])
+        self.assertEqual(job.status, "queued")
+        self.assertTrue(response.data["status_url"].endswith(f"/jobs/{job.pk}/"))
+        self.assertEqual(os.path.dirname(job.staged_path), self.staging_dir)
+        self.assertTrue(os.path.exists(job.staged_path))
+
+    def test_worker_claims_and_ingests_the_job(self):
+        self.upload()
+        job = claim_next_job()
+        self.assertEqual(job.status, "running")
+        self.assertIsNone(claim_next_job())
+
+        job = run_job(job)
+
+        self.assertEqual(job.status, "succeeded")
+        self.assertEqual(job.features_ingested, 3)
+        self.assertFalse(os.path.exists(job.staged_path))
+        dataset = GeoUploadedDataset.objects.get(pk=job.dataset_id)
+        self.assertEqual((dataset.name, dataset.feature_count), ("Points", 3))
+
+        status = self.client.get(reverse("geo_ingest_job_detail", args=[job.pk])).data
+        self.assertEqual(status["status"], "succeeded")
+        self.assertEqual(status["result"]["feature_count"], 3)
+
+    def test_failed_ingest_is_recorded_on_the_job(self):
+        self.upload(b"not geojson")
+
+        job = run_job(claim_next_job())
+
+        self.assertEqual(job.status, "failed")
+        self.assertTrue(job.error)
+        self.assertIsNone(job.dataset_id)
+        self.assertFalse(os.path.exists(job.staged_path))
+        self.assertFalse(GeoUploadedDataset.objects.exists())
+
+    def test_jobs_of_dead_workers_are_requeued(self):
+        self.upload()
+        job = claim_next_job()
+        GeoIngestJob.objects.filter(pk=job.pk).update(
+            updated_at=timezone.now() - STALE_AFTER - timedelta(minutes=1)
+        )
+
+        self.assertEqual(requeue_stale_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.started_at), ("queued", None))
+        self.assertEqual(claim_next_job().pk, job.pk)
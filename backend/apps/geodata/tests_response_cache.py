@@ -0,0 +1,77 @@
+import gzip
+import json
+
+from django.test import SimpleTestCase
+
+from .services.response_cache import (
+    accepted_encodings,
+    choose_encoding,
+    etag_for,
+    etag_matches,
+    render_entry,
+)
+
+
+class RenderEntryTests(SimpleTestCase):
+    GEOJSON = {"type": "FeatureCollection", "features": [{"type": "Feature", "properties": {"n": 1}}]}
+
+    def test_bodies_decode_to_the_same_document(self):
+        entry = render_entry(self.GEOJSON)
+        self.assertEqual(json.loads(entry["identity"]), self.GEOJSON)
+        self.assertEqual(gzip.decompress(entry["gzip"]), entry["identity"])
+
+    def test_etag_is_stable(self):
+        self.assertEqual(render_entry(self.GEOJSON)["etag"], render_entry(self.GEOJSON)["etag"])
+        self.assertEqual(render_entry(self.GEOJSON)["gzip"], render_entry(self.GEOJSON)["gzip"])
+
+
+class AcceptedEncodingsTests(SimpleTestCase):
+    def test_lists_codings(self):
+        self.assertEqual(accepted_encodings("gzip, deflate, br"), {"gzip", "deflate", "br"})
+
+    def test_lowercases_and_ignores_quality_above_zero(self):
+        self.assertEqual(accepted_encodings("GZIP;q=0.5, Br;q=1"), {"gzip", "br"})
+
+    def test_drops_refused_and_malformed_quality(self):
+        self.assertEqual(accepted_encodings("br;q=0, gzip;q=abc, identity"), {"identity"})
+
+    def test_empty_header(self):
+        self.assertEqual(accepted_encodings(""), set())
+
+
+class ChooseEncodingTests(SimpleTestCase):
+    ENTRY = {"etag": '"abc"', "identity": b"{}", "gzip": b"..."}
+
+    def test_prefers_compressed_bodies_the_client_accepts(self):
+        self.assertEqual(choose_encoding(self.ENTRY, "gzip, deflate"), "gzip")
+        self.assertEqual(choose_encoding(self.ENTRY, "*"), "gzip")
+
+    def test_falls_back_to_identity(self):
+        self.assertEqual(choose_encoding(self.ENTRY, "br"), "identity")
+        self.assertEqual(choose_encoding(self.ENTRY, ""), "identity")
+
+
+class EtagMatchesTests(SimpleTestCase):
+    ENTRY = {"etag": '"abc"'}
+
+    def test_each_coding_has_its_own_etag(self):
+        self.assertEqual(etag_for(self.ENTRY, "identity"), '"abc"')
+        self.assertEqual(etag_for(self.ENTRY, "gzip"), '"abc-gzip"')
+        self.assertEqual(etag_for(self.ENTRY, "br"), '"abc-br"')
+
+    def test_matches_identity_tag(self):
+        self.assertTrue(etag_matches(self.ENTRY, '"abc"'))
+
+    def test_matches_only_the_served_coding(self):
+        self.assertTrue(etag_matches(self.ENTRY, '"abc-gzip"', "gzip"))
+        self.assertFalse(etag_matches(self.ENTRY, '"abc"', "gzip"))
+        self.assertFalse(etag_matches(self.ENTRY, '"abc-gzip"', "br"))
+
+    def test_weak_comparison_and_lists(self):
+        self.assertTrue(etag_matches(self.ENTRY, 'W/"abc-br"', "br"))
+        self.assertTrue(etag_matches(self.ENTRY, '"other", "abc"'))
+
+    def test_wildcard_and_missing_header(self):
+        self.assertTrue(etag_matches(self.ENTRY, "*", "gzip"))
+        self.assertFalse(etag_matches(self.ENTRY, ""))
+        self.assertFalse(etag_matches(self.ENTRY, '"other"'))
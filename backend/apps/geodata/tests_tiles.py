@@ -0,0 +1,151 @@
+import tempfile
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.gis.geos import Point, Polygon
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.throttling import ScopedRateThrottle
+
+from .models import GeoFeature, GeoUploadedDataset
+from .services import tile_cache
+from .services.vector_tiles import buffer_size, render_tile, tile_range, validate_tile
+
+
+class TileGridTests(SimpleTestCase):
+    def test_validates_tile_addresses(self):
+        validate_tile(0, 0, 0)
+        validate_tile(3, 7, 7)
+        for z, x, y in [(-1, 0, 0), (23, 0, 0), (1, 2, 0), (1, 0, -1)]:
+            with self.assertRaises(ValueError):
+                validate_tile(z, x, y)
+
+    def test_tile_range_covers_the_bounds(self):
+        self.assertEqual(list(tile_range([-10, 10, 10, 20], 1)), [(0, 0), (1, 0)])
+        self.assertEqual(len(list(tile_range(None, 2))), 16)
+
+    def test_buffer_is_a_fixed_share_of_the_tile(self):
+        self.assertAlmostEqual(buffer_size(0), 40075016.68557849 / 64)
+        self.assertAlmostEqual(buffer_size(1), buffer_size(0) / 2)
+
+
+class RenderTileTests(TestCase):
+    def setUp(self):
+        self.dataset = GeoUploadedDataset.objects.create(
+            name="Places",
+            original_filename="places.geojson",
+            file_format="geojson",
+            available_fields=["name"],
+            field_types={"name": "string"},
+        )
+
+    def add(self, geometry):
+        GeoFeature.objects.create(dataset=self.dataset, geometry=geometry, properties={"name": "x"})
+
+    def test_renders_features_in_the_tile(self):
+        self.add(Point(-20, 10, srid=4326))
+
+        self.assertNotEqual(render_tile(self.dataset, 1, 0, 0), b"")
+        self.assertEqual(render_tile(self.dataset, 1, 1, 1), b"")
+
+    def test_includes_features_in_the_buffer_outside_the_tile(self):
+        # Tile 1/0/0 ends at lon 0; its buffer reaches about 2.8 degrees east
+        self.add(Point(0.5, 10, srid=4326))
+
+        self.assertNotEqual(render_tile(self.dataset, 1, 0, 0), b"")
+
+    def test_polar_geometries_are_clipped_to_the_grid(self):
+        self.add(Polygon(((-10, 80), (10, 80), (10, 90), (-10, 90), (-10, 80)), srid=4326))
+
+        self.assertNotEqual(render_tile(self.dataset, 0, 0, 0), b"")
+        self.assertNotEqual(render_tile(self.dataset, 2, 1, 0), b"")
+
+
+@mock.patch.object(tile_cache, "render_tile", return_value=b"tile")
+class TileCacheTests(SimpleTestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        settings = override_settings(GEODATA_CACHE_DIR=tmpdir.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.dataset = SimpleNamespace(pk=1, version=1, available_fields=["name"])
+
+    def test_renders_a_miss_once_then_serves_the_cached_tile(self, render):
+        self.assertIsNone(tile_cache.cached_tile(self.dataset, 3, 1, 2))
+        self.assertEqual(tile_cache.get_tile(self.dataset, 3, 1, 2), b"tile")
+        self.assertEqual(tile_cache.get_tile(self.dataset, 3, 1, 2), b"tile")
+
+        render.assert_called_once_with(self.dataset, 3, 1, 2, None)
+        self.assertEqual(tile_cache.cached_tile(self.dataset, 3, 1, 2), b"tile")
+
+    def test_value_fields_are_cached_separately(self, render):
+        tile_cache.get_tile(self.dataset, 3, 1, 2)
+        self.assertIsNone(tile_cache.cached_tile(self.dataset, 3, 1, 2, "name"))
+        with self.assertRaisesMessage(ValueError, "Unknown field"):
+            tile_cache.cached_tile(self.dataset, 3, 1, 2, "missing")
+
+    def test_empty_and_deep_tiles_are_not_stored(self, render):
+        render.return_value = b""
+        tile_cache.get_tile(self.dataset, 3, 1, 2)
+        self.assertIsNone(tile_cache.cached_tile(self.dataset, 3, 1, 2))
+
+        render.return_value = b"tile"
+        z = tile_cache.MAX_CACHED_ZOOM + 1
+        tile_cache.get_tile(self.dataset, z, 0, 0)
+        self.assertIsNone(tile_cache.cached_tile(self.dataset, z, 0, 0))
+
+    def test_new_version_and_invalidation_miss(self, render):
+        tile_cache.get_tile(self.dataset, 3, 1, 2)
+
+        self.dataset.version = 2
+        self.assertIsNone(tile_cache.cached_tile(self.dataset, 3, 1, 2))
+
+        self.dataset.version = 1
+        tile_cache.invalidate_dataset(self.dataset.pk)
+        self.assertIsNone(tile_cache.cached_tile(self.dataset, 3, 1, 2))
+
+
+@mock.patch.object(tile_cache, "render_tile", return_value=b"tile")
+@mock.patch.object(ScopedRateThrottle, "THROTTLE_RATES", {"tile_render": "2/minute"})
+class TileViewTests(TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        settings = override_settings(GEODATA_CACHE_DIR=tmpdir.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        cache.clear()
+        self.dataset = GeoUploadedDataset.objects.create(
+            name="Places",
+            original_filename="places.geojson",
+            file_format="geojson",
+            available_fields=["name"],
+            field_types={"name": "string"},
+        )
+
+    def get(self, z, x, y):
+        return self.client.get(
+            reverse("uploaded_dataset_tile", args=[self.dataset.pk, z, x, y])
+        )
+
+    def test_only_renders_count_against_the_rate(self, render):
+        for _ in range(5):
+            response = self.get(3, 1, 2)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.content, b"tile")
+        self.assertEqual(self.get(3, 2, 2).status_code, 200)
+
+        self.assertEqual(self.get(3, 3, 2).status_code, 429)
+        self.assertEqual(render.call_count, 2)
+
+    def test_tiles_deeper_than_the_cache_are_throttled(self, render):
+        z = tile_cache.MAX_CACHED_ZOOM + 1
+        self.assertEqual(self.get(z, 0, 0).status_code, 200)
+        self.assertEqual(self.get(z, 0, 0).status_code, 200)
+        self.assertEqual(self.get(z, 0, 0).status_code, 429)
+
+    def test_bad_tiles_are_rejected(self, render):
+        self.assertEqual(self.get(1, 5, 0).status_code, 400)
+        render.assert_not_called()
@@ -0,0 +1,104 @@
+import json
+import os
+import tempfile
+
+from django.test import TransactionTestCase, override_settings
+
+from .models import GeoUploadedDataset
+from .services.geo_processor import GeoProcessor
+
+
+def point(code, x, y, name):
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [x, y]},
+        "properties": {"code": code, "name": name},
+    }
+
+
+# The diff runs against an ON COMMIT DROP staging table, so these tests need
+# real commits rather than TestCase's wrapping transaction
+class ApplyDiffTests(TransactionTestCase):
+    ORIGINAL = [
+        point("a", 5.1, 52.1, "Utrecht"),
+        point("b", 4.9, 52.4, "Amsterdam"),
+        point("c", 4.5, 51.9, "Rotterdam"),
+    ]
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        # Committed ingests invalidate the dataset's cached tiles and exports
+        settings = override_settings(GEODATA_CACHE_DIR=os.path.join(self.tmpdir.name, "cache"))
+        settings.enable()
+        self.addCleanup(settings.disable)
+        result = self.ingest(self.ORIGINAL)
+        self.dataset = GeoUploadedDataset.objects.get(pk=result["dataset_id"])
+
+    def ingest(self, features, dataset=None, match_key="code"):
+        fd, path = tempfile.mkstemp(dir=self.tmpdir.name, suffix=".geojson")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"type": "FeatureCollection", "features": features}, f)
+        processor = GeoProcessor(
+            None, "points.geojson", path=path, dataset=dataset, match_key=match_key if dataset else None
+        )
+        return processor.process()
+
+    def test_counts_inserted_updated_deleted_and_unchanged(self):
+        keep = self.dataset.features.get(properties__code="a").pk
+        result = self.ingest(
+            [
+                self.ORIGINAL[0],
+                point("b", 4.9, 52.4, "Amsterdam-Centrum"),
+                point("d", 6.6, 53.2, "Groningen"),
+            ],
+            dataset=self.dataset,
+        )
+
+        self.assertEqual(result["changes"], {"inserted": 1, "updated": 1, "deleted": 1, "unchanged": 1})
+        self.assertEqual(result["version"], self.dataset.version + 1)
+        codes = sorted(self.dataset.features.values_list("properties__code", flat=True))
+        self.assertEqual(codes, ["a", "b", "d"])
+        # Unchanged features keep their rows
+        self.assertTrue(self.dataset.features.filter(pk=keep).exists())
+
+    def test_identical_file_keeps_the_version(self):
+        result = self.ingest(self.ORIGINAL, dataset=self.dataset)
+
+        self.assertEqual(result["changes"], {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 3})
+        self.assertEqual(result["version"], self.dataset.version)
+
+    def test_matches_identical_features_without_a_key(self):
+        moved = [*self.ORIGINAL[:2], point("c", 4.4, 51.9, "Rotterdam")]
+        result = self.ingest(moved, dataset=self.dataset, match_key=None)
+
+        self.assertEqual(result["changes"], {"inserted": 1, "updated": 0, "deleted": 1, "unchanged": 2})
+
+    def test_diffs_repeated_features_as_a_multiset_without_a_key(self):
+        stacked = point("a", 5.1, 52.1, "Utrecht")
+        result = self.ingest([*self.ORIGINAL, stacked, stacked], dataset=self.dataset, match_key=None)
+
+        self.assertEqual(result["changes"], {"inserted": 2, "updated": 0, "deleted": 0, "unchanged": 3})
+        self.assertEqual(self.dataset.features.filter(properties__code="a").count(), 3)
+
+        result = self.ingest([*self.ORIGINAL, stacked], dataset=self.dataset, match_key=None)
+
+        self.assertEqual(result["changes"], {"inserted": 0, "updated": 0, "deleted": 1, "unchanged": 4})
+        self.assertEqual(self.dataset.features.filter(properties__code="a").count(), 2)
+
+    def test_same_geometry_with_other_properties_is_a_change_without_a_key(self):
+        renamed = [point("a", 5.1, 52.1, "Utrecht-Centrum"), *self.ORIGINAL[1:]]
+        result = self.ingest(renamed, dataset=self.dataset, match_key=None)
+
+        self.assertEqual(result["changes"], {"inserted": 1, "updated": 0, "deleted": 1, "unchanged": 2})
+        self.assertEqual(self.dataset.features.get(properties__code="a").properties["name"], "Utrecht-Centrum")
+
+    def test_rejects_duplicate_keys(self):
+        with self.assertRaisesMessage(ValueError, "not unique"):
+            self.ingest([*self.ORIGINAL, point("a", 5.2, 52.0, "Utrecht-Oost")], dataset=self.dataset)
+        self.assertEqual(self.dataset.features.count(), 3)
+
+    def test_rejects_null_keys(self):
+        with self.assertRaisesMessage(ValueError, "missing or null on 1 feature(s)"):
+            self.ingest([*self.ORIGINAL, point(None, 5.2, 52.0, "Utrecht-Oost")], dataset=self.dataset)
+        self.assertEqual(self.dataset.features.count(), 3)
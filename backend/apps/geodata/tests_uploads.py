@@ -0,0 +1,108 @@
+import base64
+import hashlib
+import io
+import os
+import tempfile
+
+from django.test import TestCase, override_settings
+
+from .models import GeoIngestJob, GeoUploadSession
+from .services.resumable_uploads import (
+    ChecksumMismatch,
+    OffsetMismatch,
+    append_chunk,
+    create_session,
+    parse_checksum,
+)
+
+
+class AppendChunkTests(TestCase):
+    DATA = b'{"type": "FeatureCollection", "features": []}'
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        settings = override_settings(GEODATA_STAGING_DIR=tmpdir.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.session = create_session("points.geojson", len(self.DATA))
+
+    def append(self, offset, data, checksum=None):
+        checksum = checksum or hashlib.sha256(data).digest()
+        return append_chunk(self.session.pk, offset, io.BytesIO(data), len(data), checksum)
+
+    def staged(self, path=None):
+        with open(path or self.session.staged_path, "rb") as f:
+            return f.read()
+
+    def test_appends_and_advances_the_offset(self):
+        session = self.append(0, self.DATA[:10])
+        self.assertEqual(session.offset, 10)
+        self.assertEqual(self.staged(), self.DATA[:10])
+
+    def test_rejects_a_chunk_at_the_wrong_offset(self):
+        self.append(0, self.DATA[:10])
+        with self.assertRaises(OffsetMismatch):
+            self.append(0, self.DATA[:10])
+        with self.assertRaises(OffsetMismatch):
+            self.append(20, self.DATA[20:30])
+
+    def test_bad_checksum_cuts_the_chunk_off_again(self):
+        self.append(0, self.DATA[:10])
+        with self.assertRaises(ChecksumMismatch):
+            self.append(10, self.DATA[10:20], checksum=hashlib.sha256(b"other").digest())
+
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.offset, 10)
+        self.assertEqual(self.staged(), self.DATA[:10])
+
+    def test_overwrites_bytes_left_by_an_interrupted_write(self):
+        self.append(0, self.DATA[:10])
+        with open(self.session.staged_path, "ab") as f:
+            f.write(b"garbage")
+        self.append(10, self.DATA[10:20])
+        self.assertEqual(self.staged(), self.DATA[:20])
+
+    def test_short_body_is_rejected(self):
+        with self.assertRaises(ValueError):
+            append_chunk(self.session.pk, 0, io.BytesIO(self.DATA[:5]), 10, b"")
+        self.assertEqual(self.staged(), b"")
+
+    def test_last_chunk_queues_the_file(self):
+        self.append(0, self.DATA[:10])
+        session = self.append(10, self.DATA[10:])
+
+        self.assertEqual(session.status, "complete")
+        self.assertFalse(session.staged_path.endswith(".part"))
+        self.assertEqual(self.staged(session.staged_path), self.DATA)
+        self.assertFalse(os.path.exists(self.session.staged_path))
+        job = GeoIngestJob.objects.get(pk=session.job_id)
+        self.assertEqual(job.staged_path, session.staged_path)
+        self.assertEqual(job.original_filename, "points.geojson")
+
+    def test_parse_checksum(self):
+        digest = hashlib.sha256(self.DATA).digest()
+        self.assertEqual(parse_checksum("sha256 " + base64.b64encode(digest).decode()), digest)
+        with self.assertRaises(ValueError):
+            parse_checksum("md5 abc")
+
+    def test_offset_advanced_by_another_request_while_reading(self):
+        session_id = self.session.pk
+
+        class RacingStream(io.BytesIO):
+            def read(self, size=-1):
+                # Another request appends the same bytes while this one is still reading
+                GeoUploadSession.objects.filter(pk=session_id).update(offset=10)
+                return super().read(size)
+
+        data = self.DATA[:10]
+        with self.assertRaises(OffsetMismatch):
+            append_chunk(session_id, 0, RacingStream(data), len(data), hashlib.sha256(data).digest())
+        self.assertEqual(self.staged(), b"")
+
+    def test_leaves_no_chunk_files_behind(self):
+        self.append(0, self.DATA[:10])
+        with self.assertRaises(ChecksumMismatch):
+            self.append(10, self.DATA[10:20], checksum=b"bad")
+        staging_dir = os.path.dirname(self.session.staged_path)
+        self.assertEqual(os.listdir(staging_dir), [os.path.basename(self.session.staged_path)])
@@ -8,18 +8,42 @@ from .views import (
     GeoDatasetDetailView,
     GeoDatasetListCreateView,
     GeoFileUploadView,
+    GeoIngestJobDetailView,
+    GeoIngestJobListView,
     GeoJSONView,
     GeoUploadedDatasetDetailView,
+    GeoUploadedDatasetExportView,
     GeoUploadedDatasetGeoJSONView,
+    GeoUploadedDatasetH3View,
     GeoUploadedDatasetListView,
+    GeoUploadedDatasetStatsView,
+    GeoUploadedDatasetTileView,
+    GeoUploadSessionCreateView,
+    GeoUploadSessionDetailView,
 )
 
 urlpatterns = [
     # Uploaded PostGIS dataset endpoints (must come before slug patterns)
     path("upload/", GeoFileUploadView.as_view(), name="geo_file_upload"),
+    path("uploads/", GeoUploadSessionCreateView.as_view(), name="geo_upload_session_create"),
+    path("uploads/<int:pk>/", GeoUploadSessionDetailView.as_view(), name="geo_upload_session_detail"),
+    path("jobs/", GeoIngestJobListView.as_view(), name="geo_ingest_job_list"),
+    path("jobs/<int:pk>/", GeoIngestJobDetailView.as_view(), name="geo_ingest_job_detail"),
     path("datasets/", GeoUploadedDatasetListView.as_view(), name="uploaded_dataset_list"),
     path("datasets/<int:pk>/", GeoUploadedDatasetDetailView.as_view(), name="uploaded_dataset_detail"),
     path("datasets/<int:pk>/geojson/", GeoUploadedDatasetGeoJSONView.as_view(), name="uploaded_dataset_geojson"),
+    path("datasets/<int:pk>/h3/<int:resolution>/", GeoUploadedDatasetH3View.as_view(), name="uploaded_dataset_h3"),
+    path("datasets/<int:pk>/stats/", GeoUploadedDatasetStatsView.as_view(), name="uploaded_dataset_stats"),
+    path(
+        "datasets/<int:pk>/tiles/<int:z>/<int:x>/<int:y>.mvt",
+        GeoUploadedDatasetTileView.as_view(),
+        name="uploaded_dataset_tile",
+    ),
+    path(
+        "datasets/<int:pk>/export/<str:export_format>/",
+        GeoUploadedDatasetExportView.as_view(),
+        name="uploaded_dataset_export",
+    ),
     # Slug-addressed GeoJSON for markdown map figures. Ints are captured by the
     # pk route above, so numeric-only slugs would be shadowed — don't use them.
     path("datasets/<slug:slug>/geojson/", GeoJSONView.as_view(), name="geodataset_geojson_by_slug"),
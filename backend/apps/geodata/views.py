@@ -5,9 +5,18 @@ Views for GeoData API.
 import json
 
 from django.contrib.gis.geos import GEOSGeometry
+from django.http import (
+    FileResponse,
+    HttpResponse,
+    HttpResponseNotModified,
+    StreamingHttpResponse,
+)
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from rest_framework import generics, status
 from rest_framework.permissions import AllowAny, IsAuthenticated, SAFE_METHODS, BasePermission
 from rest_framework.response import Response
+from rest_framework.throttling import ScopedRateThrottle
 from rest_framework.views import APIView
 from shapely.geometry import mapping
 
@@ -22,17 +31,39 @@ class IsAuthenticatedOrReadOnly(BasePermission):
             return True
         return request.user and request.user.is_authenticated
 
-from .models import GeoDataset, GeoFeature, GeoUploadedDataset
+from .filters import (
+    filter_features,
+    filter_properties,
+    geometry_column,
+    parse_bbox,
+    parse_int,
+    parse_precision,
+)
+from .models import GeoDataset, GeoFeature, GeoIngestJob, GeoUploadedDataset, GeoUploadSession
 from .serializers import (
     GeoDatasetListSerializer,
     GeoDatasetSerializer,
     GeoFileUploadSerializer,
+    GeoIngestJobSerializer,
     GeoJSONSerializer,
     GeoUploadedDatasetDetailSerializer,
     GeoUploadedDatasetListSerializer,
-    GeoUploadResponseSerializer,
+    GeoUploadSessionCreateSerializer,
+    GeoUploadSessionSerializer,
+)
+from .services import (
+    build_feature_collection,
+    exporters,
+    field_stats,
+    h3_aggregates,
+    ingest_jobs,
+    property_indexes,
+    response_cache,
+    resumable_uploads,
+    round_coordinates,
+    stream_feature_collection,
+    tile_cache,
 )
-from .services import GeoProcessor
 
 
 class GeoDatasetListCreateView(generics.ListCreateAPIView):
@@ -60,6 +91,9 @@ class GeoJSONView(generics.RetrieveAPIView):
     """
     Returns only the GeoJSON data for a dataset.
     This is the endpoint that visualizations and research articles reference.
+    precision (or zoom) rounds coordinates; without either the stored data is returned as-is.
+    Responses are served pre-compressed from a cache keyed on (slug, updated_at)
+    and honour If-None-Match with a strong content ETag.
     """
 
     queryset = GeoDataset.objects.all()
@@ -68,9 +102,42 @@ class GeoJSONView(generics.RetrieveAPIView):
     lookup_field = "slug"
 
     def retrieve(self, request, *args, **kwargs):
-        instance = self.get_object()
-        # Return GeoJSON directly without wrapper
-        return Response(instance.geojson)
+        # Defer the JSONField: it's only read when the response cache misses
+        instance = get_object_or_404(
+            self.get_queryset().only("pk", "slug", "updated_at"), slug=kwargs["slug"]
+        )
+
+        try:
+            precision = parse_precision(request.query_params, default=None)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        def load_geojson():
+            if precision is None:
+                return instance.geojson
+            return round_coordinates(instance.geojson, precision)
+
+        entry = response_cache.get_or_render(
+            response_cache.cache_key(instance.slug, instance.updated_at, precision),
+            load_geojson,
+        )
+
+        encoding = response_cache.choose_encoding(
+            entry, request.headers.get("Accept-Encoding", "")
+        )
+        if response_cache.etag_matches(entry, request.headers.get("If-None-Match", ""), encoding):
+            response = HttpResponseNotModified()
+        else:
+            # Return GeoJSON directly without wrapper
+            response = HttpResponse(entry[encoding], content_type="application/json")
+            if encoding != "identity":
+                response["Content-Encoding"] = encoding
+
+        response["ETag"] = response_cache.etag_for(entry, encoding)
+        response["Vary"] = "Accept-Encoding"
+        # Always revalidate; the ETag makes that a cheap 304
+        response["Cache-Control"] = "public, no-cache"
+        return response
 
 
 # Views for uploaded PostGIS datasets
@@ -91,11 +158,21 @@ class GeoUploadedDatasetDetailView(generics.RetrieveDestroyAPIView):
     serializer_class = GeoUploadedDatasetDetailSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
+    def perform_destroy(self, instance):
+        dataset_id, indexed_fields = instance.pk, instance.indexed_fields
+        instance.delete()
+        property_indexes.drop_dataset_indexes(dataset_id, indexed_fields)
+        tile_cache.invalidate_dataset(dataset_id)
+        exporters.invalidate_dataset(dataset_id)
+
 
 class GeoFileUploadView(APIView):
     """
     Upload a geospatial file (GeoJSON, GeoPackage, or Shapefile).
-    The file will be parsed and ingested into PostGIS.
+    The file is staged and queued; a worker ingests it into PostGIS.
+    With update_dataset (and optionally match_key) the worker updates that
+    dataset in place, changing only the features that differ.
+    Returns 202 with a job id to poll at jobs/<id>/.
     """
 
     permission_classes = [IsAuthenticated]
@@ -107,36 +184,164 @@ class GeoFileUploadView(APIView):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
         uploaded_file = serializer.validated_data["file"]
-        name = serializer.validated_data.get("name") or None
-        description = serializer.validated_data.get("description", "")
 
         try:
-            processor = GeoProcessor(
-                file=uploaded_file,
-                filename=uploaded_file.name,
-                name=name,
-                description=description,
+            job = ingest_jobs.enqueue_upload(
+                uploaded_file,
+                name=serializer.validated_data.get("name", ""),
+                description=serializer.validated_data.get("description", ""),
+                update_dataset=serializer.validated_data.get("update_dataset"),
+                match_key=serializer.validated_data.get("match_key", ""),
+            )
+        except OSError as e:
+            return Response(
+                {"error": f"Failed to stage file: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
-            result = processor.process()
 
-            response_serializer = GeoUploadResponseSerializer(data=result)
-            response_serializer.is_valid(raise_exception=True)
+        return Response(
+            {
+                "job_id": job.id,
+                "status": job.status,
+                "status_url": request.build_absolute_uri(
+                    reverse("geo_ingest_job_detail", args=[job.id])
+                ),
+            },
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+class GeoUploadSessionCreateView(APIView):
+    """
+    Start a resumable upload for a large file: POST {filename, size, name?, description?}.
+    Returns 201 with the session; send the bytes with PATCH to upload_url.
+    """
+
+    permission_classes = [IsAuthenticated]
 
-            return Response(response_serializer.data, status=status.HTTP_201_CREATED)
+    def post(self, request):
+        serializer = GeoUploadSessionCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+        try:
+            session = resumable_uploads.create_session(
+                serializer.validated_data["filename"],
+                serializer.validated_data["size"],
+                name=serializer.validated_data.get("name", ""),
+                description=serializer.validated_data.get("description", ""),
+                update_dataset=serializer.validated_data.get("update_dataset"),
+                match_key=serializer.validated_data.get("match_key", ""),
+            )
         except ValueError as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
-        except Exception as e:
+        except OSError as e:
             return Response(
-                {"error": f"Failed to process file: {str(e)}"},
+                {"error": f"Failed to stage file: {str(e)}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+        data = GeoUploadSessionSerializer(session).data
+        data["upload_url"] = request.build_absolute_uri(
+            reverse("geo_upload_session_detail", args=[session.id])
+        )
+        response = Response(data, status=status.HTTP_201_CREATED)
+        response["Upload-Offset"] = str(session.offset)
+        return response
+
+
+class GeoUploadSessionDetailView(APIView):
+    """
+    One resumable upload.
+
+    GET/HEAD: current state; the Upload-Offset header says where to resume.
+    PATCH: append a chunk. The raw body must start at Upload-Offset and carry
+    Upload-Checksum: sha256 <base64 digest>. 409 means the offset is wrong
+    (resume from the returned offset), 460 that the chunk was corrupted.
+    The response to the final chunk includes the ingest job to poll.
+    DELETE: abort the upload.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def _response(self, request, session, status_code=status.HTTP_200_OK):
+        data = GeoUploadSessionSerializer(session).data
+        if session.job_id:
+            data["status_url"] = request.build_absolute_uri(
+                reverse("geo_ingest_job_detail", args=[session.job_id])
+            )
+        response = Response(data, status=status_code)
+        response["Upload-Offset"] = str(session.offset)
+        response["Upload-Length"] = str(session.total_size)
+        response["Cache-Control"] = "no-store"
+        return response
+
+    def get(self, request, pk):
+        session = get_object_or_404(GeoUploadSession, pk=pk)
+        return self._response(request, session)
+
+    def patch(self, request, pk):
+        get_object_or_404(GeoUploadSession, pk=pk)
+
+        try:
+            offset = int(request.headers.get("Upload-Offset", ""))
+            length = int(request.headers.get("Content-Length", ""))
+        except ValueError:
+            return Response(
+                {"error": "Upload-Offset and Content-Length headers are required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            checksum = resumable_uploads.parse_checksum(request.headers.get("Upload-Checksum"))
+            session = resumable_uploads.append_chunk(pk, offset, request.stream, length, checksum)
+        except resumable_uploads.OffsetMismatch as e:
+            session = GeoUploadSession.objects.get(pk=pk)
+            response = self._response(request, session, status.HTTP_409_CONFLICT)
+            response.data["error"] = str(e)
+            return response
+        except resumable_uploads.ChecksumMismatch as e:
+            return Response({"error": str(e)}, status=460)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return self._response(request, session)
+
+    def delete(self, request, pk):
+        session = get_object_or_404(GeoUploadSession, pk=pk)
+        try:
+            resumable_uploads.abort(session)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_409_CONFLICT)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class GeoIngestJobListView(generics.ListAPIView):
+    """List background ingest jobs, newest first."""
+
+    queryset = GeoIngestJob.objects.all()
+    serializer_class = GeoIngestJobSerializer
+    permission_classes = [IsAuthenticated]
+
+
+class GeoIngestJobDetailView(generics.RetrieveAPIView):
+    """Poll the status and progress of an ingest job."""
+
+    queryset = GeoIngestJob.objects.all()
+    serializer_class = GeoIngestJobSerializer
+    permission_classes = [IsAuthenticated]
+
 
 class GeoUploadedDatasetGeoJSONView(APIView):
     """
     Returns GeoJSON for an uploaded dataset with a selected value field.
     The value_field query parameter specifies which property to include as 'value'.
+    bbox=minx,miny,maxx,maxy and intersects=<wkt> restrict the features returned.
+    where=field:value, field:lo..hi or field:in(a,b) (repeatable) filters on properties.
+    zoom or tolerance (degrees) selects a precomputed simplified geometry level.
+    precision sets coordinate decimals (default derived from zoom, else 6).
+    The FeatureCollection is assembled by PostGIS; pass stream=true to stream it
+    feature by feature instead.
     """
 
     permission_classes = [AllowAny]
@@ -152,26 +357,215 @@ class GeoUploadedDatasetGeoJSONView(APIView):
 
         value_field = request.query_params.get("value_field")
 
-        # Build GeoJSON FeatureCollection
-        features = []
-        for feature in dataset.features.all():
-            # Convert PostGIS geometry to GeoJSON
-            geom_json = json.loads(feature.geometry.geojson)
-
-            # Build properties - include all, plus a 'value' key for the selected field
-            props = feature.properties.copy()
-            if value_field and value_field in feature.properties:
-                props["value"] = feature.properties[value_field]
-
-            features.append({
-                "type": "Feature",
-                "geometry": geom_json,
-                "properties": props,
-            })
-
-        geojson = {
-            "type": "FeatureCollection",
-            "features": features,
-        }
-
-        return Response(geojson)
+        try:
+            features = filter_features(dataset.features.all(), request.query_params)
+            features = filter_properties(features, request.query_params, dataset)
+            geometry = geometry_column(request.query_params)
+            precision = parse_precision(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if request.query_params.get("stream", "").lower() in ("1", "true", "yes"):
+            return StreamingHttpResponse(
+                stream_feature_collection(features, value_field, geometry, precision),
+                content_type="application/geo+json",
+            )
+
+        # PostGIS assembles the FeatureCollection; pass its output through as-is
+        return HttpResponse(
+            build_feature_collection(features, value_field, geometry, precision),
+            content_type="application/geo+json",
+        )
+
+
+class GeoUploadedDatasetTileView(APIView):
+    """
+    Returns a Mapbox Vector Tile for an uploaded dataset at z/x/y, served from the tile cache.
+    The value_field query parameter limits tile attributes to that field (as 'value').
+    """
+
+    permission_classes = [AllowAny]
+    # A single map view requests dozens of tiles; don't count them against the anon rate
+    throttle_classes = []
+    # Renders are limited instead (see check_render_throttle): every cache
+    # miss, and every tile deeper than MAX_CACHED_ZOOM, runs a PostGIS query
+    throttle_scope = "tile_render"
+
+    def check_render_throttle(self, request):
+        throttle = ScopedRateThrottle()
+        if not throttle.allow_request(request, self):
+            self.throttled(request, throttle.wait())
+
+    def get(self, request, pk, z, x, y):
+        try:
+            dataset = GeoUploadedDataset.objects.get(pk=pk)
+        except GeoUploadedDataset.DoesNotExist:
+            return Response(
+                {"error": "Dataset not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        value_field = request.query_params.get("value_field")
+
+        try:
+            tile = tile_cache.cached_tile(dataset, z, x, y, value_field)
+            if tile is None:
+                self.check_render_throttle(request)
+                tile = tile_cache.render_to_cache(dataset, z, x, y, value_field)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return HttpResponse(tile, content_type="application/vnd.mapbox-vector-tile")
+
+
+class GeoUploadedDatasetExportView(APIView):
+    """
+    Downloads an uploaded dataset as FlatGeobuf (fgb), GeoParquet (parquet) or
+    Arrow IPC (arrow). Single byte ranges are honoured, so FlatGeobuf clients
+    can read the spatial index and fetch only the features they need.
+    """
+
+    permission_classes = [AllowAny]
+    # FlatGeobuf range readers issue many small requests per query
+    throttle_classes = []
+
+    def get(self, request, pk, export_format):
+        try:
+            dataset = GeoUploadedDataset.objects.get(pk=pk)
+        except GeoUploadedDataset.DoesNotExist:
+            return Response(
+                {"error": "Dataset not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        try:
+            path = exporters.get_export(dataset, export_format)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except exporters.ExportPending:
+            return Response(
+                {"status": "building", "retry_after": exporters.EXPORT_RETRY_AFTER},
+                status=status.HTTP_202_ACCEPTED,
+                headers={"Retry-After": str(exporters.EXPORT_RETRY_AFTER)},
+            )
+        except exporters.ExportFailed as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                headers={"Retry-After": str(e.retry_after)},
+            )
+
+        content_type = exporters.EXPORT_FORMATS[export_format][0]
+        size = path.stat().st_size
+        etag = f'"{dataset.pk}-{dataset.version}-{export_format}"'
+
+        try:
+            byte_range = exporters.parse_byte_range(request.headers.get("Range", ""), size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+        if byte_range is None:
+            response = FileResponse(
+                open(path, "rb"), content_type=content_type, as_attachment=True, filename=path.name
+            )
+        else:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                exporters.read_range(path, start, end), status=206, content_type=content_type
+            )
+            response["Content-Range"] = f"bytes {start}-{end}/{size}"
+            response["Content-Length"] = str(end - start + 1)
+
+        response["Accept-Ranges"] = "bytes"
+        response["ETag"] = etag
+        return response
+
+
+class GeoUploadedDatasetStatsView(APIView):
+    """
+    Returns summary statistics for a numeric field of an uploaded dataset:
+    count, min, max, mean, stddev, quantile / equal-interval / Jenks class
+    breaks and a histogram, so choropleth legends don't need the features.
+    Query parameters: field (required), classes (default 5), bins (default 20).
+    """
+
+    permission_classes = [AllowAny]
+
+    def get(self, request, pk):
+        try:
+            dataset = GeoUploadedDataset.objects.get(pk=pk)
+        except GeoUploadedDataset.DoesNotExist:
+            return Response(
+                {"error": "Dataset not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        field = request.query_params.get("field")
+        if not field:
+            return Response({"error": "field is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            classes = parse_int(
+                request.query_params, "classes", field_stats.DEFAULT_CLASSES, 2, field_stats.MAX_CLASSES
+            )
+            bins = parse_int(
+                request.query_params, "bins", field_stats.DEFAULT_BINS, 1, field_stats.MAX_BINS
+            )
+            stats = field_stats.get_stats(dataset, field, classes, bins)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(stats)
+
+
+class GeoUploadedDatasetH3View(APIView):
+    """
+    Returns the H3 hexagon aggregates of a point dataset at one resolution as
+    GeoJSON: count per cell, plus sum and mean (as 'value') of value_field.
+    bbox=minx,miny,maxx,maxy restricts the cells returned.
+    """
+
+    permission_classes = [AllowAny]
+
+    def get(self, request, pk, resolution):
+        try:
+            dataset = GeoUploadedDataset.objects.get(pk=pk)
+        except GeoUploadedDataset.DoesNotExist:
+            return Response(
+                {"error": "Dataset not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        if resolution not in h3_aggregates.H3_RESOLUTIONS:
+            return Response(
+                {"error": f"Unsupported resolution. Available: {list(h3_aggregates.H3_RESOLUTIONS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        cells = dataset.h3_cells.filter(resolution=resolution)
+        if not cells.exists():
+            return Response(
+                {"error": "No H3 aggregates for this dataset (only point datasets have them)"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        value_field = request.query_params.get("value_field")
+        if value_field and value_field not in dataset.available_fields:
+            return Response(
+                {"error": f"Unknown field for this dataset: {value_field}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        bbox = request.query_params.get("bbox")
+        if bbox:
+            try:
+                cells = cells.filter(geometry__bboverlaps=parse_bbox(bbox))
+            except ValueError as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return HttpResponse(
+            json.dumps(h3_aggregates.cell_feature_collection(cells, value_field), separators=(",", ":")),
+            content_type="application/geo+json",
+        )
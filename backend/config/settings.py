@@ -136,6 +136,19 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Derived geodata artifacts (vector tile cache). Safe to delete; rebuilt on demand.
+GEODATA_CACHE_DIR = Path(os.getenv("GEODATA_CACHE_DIR", BASE_DIR / "geodata_cache"))
+
+# Uploads waiting for the ingest worker (python manage.py run_geo_ingest_worker)
+GEODATA_STAGING_DIR = Path(os.getenv("GEODATA_STAGING_DIR", BASE_DIR / "geodata_staging"))
+
+# Resumable uploads (geodata/uploads/): largest file accepted, largest single chunk
+GEODATA_MAX_UPLOAD_SIZE = int(os.getenv("GEODATA_MAX_UPLOAD_SIZE", 10 * 1024**3))
+GEODATA_MAX_CHUNK_SIZE = int(os.getenv("GEODATA_MAX_CHUNK_SIZE", 64 * 1024**2))
+
+# Processes used to convert geometries when ingesting large uploads
+GEODATA_INGEST_WORKERS = int(os.getenv("GEODATA_INGEST_WORKERS", os.cpu_count() or 1))
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -164,6 +177,8 @@ REST_FRAMEWORK = {
     "DEFAULT_THROTTLE_RATES": {
         "anon": "60/minute",
         "newsletter": "5/hour",
+        # Vector tiles rendered on a cache miss; cached tiles aren't counted
+        "tile_render": "600/minute",
     },
 }
 
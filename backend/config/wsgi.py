@@ -2,10 +2,21 @@
 WSGI config for personal website backend.
 """
 
+import logging
 import os
+import sqlite3
 
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
 application = get_wsgi_application()
+
+# Load the chat knowledge base into memory before the first request. Like a
+# failed seed_chat_kb, a broken KB only disables chat; the site still boots.
+from apps.chat.knowledge import load_index  # noqa: E402
+
+try:
+    load_index()
+except sqlite3.Error:
+    logging.getLogger(__name__).exception("Could not load the chat knowledge base")
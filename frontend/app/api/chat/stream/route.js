@@ -0,0 +1,63 @@
+import { NextResponse } from "next/server";
+
+const DJANGO_API_URL = process.env.DJANGO_API_URL;
+
+// Never cache or pre-render: every request is a live event stream
+export const dynamic = "force-dynamic";
+
+// Same proxy contract as app/api/django: Django trusts the client IP only when
+// the shared secret is present.
+function proxyHeaders(request) {
+  const clientIp = request.headers.get("x-forwarded-for")?.split(",")[0]?.trim() || "";
+  return {
+    "x-internal-proxy-secret": process.env.INTERNAL_PROXY_SECRET || "",
+    "x-forwarded-for": clientIp,
+  };
+}
+
+// POST - Relay a streamed chat reply (server-sent events) without buffering it
+export async function POST(request) {
+  if (!DJANGO_API_URL) {
+    return NextResponse.json(
+      { error: "Backend not configured" },
+      { status: 503 }
+    );
+  }
+
+  const body = await request.json().catch(() => ({}));
+
+  try {
+    const response = await fetch(`${DJANGO_API_URL}/api/chat/stream/`, {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+        ...proxyHeaders(request),
+      },
+      body: JSON.stringify(body),
+      cache: "no-store",
+      signal: request.signal,
+    });
+
+    // Gate failures (rate limit, bad input) come back as plain JSON
+    const contentType = response.headers.get("content-type") || "";
+    if (!contentType.startsWith("text/event-stream")) {
+      const data = await response.json().catch(() => ({}));
+      return NextResponse.json(data, { status: response.status });
+    }
+
+    return new Response(response.body, {
+      status: response.status,
+      headers: {
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache, no-transform",
+        "X-Accel-Buffering": "no",
+      },
+    });
+  } catch (error) {
+    console.error("Chat stream error:", error);
+    return NextResponse.json(
+      { error: "Failed to reach the chat backend" },
+      { status: 502 }
+    );
+  }
+}
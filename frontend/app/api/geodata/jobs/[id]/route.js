@@ -0,0 +1,40 @@
+import { NextResponse } from "next/server";
+
+const DJANGO_API_URL = process.env.DJANGO_API_URL;
+
+export async function GET(request, { params }) {
+  const token = request.headers.get("authorization");
+  const id = params.id;
+
+  if (!token) {
+    return NextResponse.json(
+      { error: "Authentication required" },
+      { status: 401 }
+    );
+  }
+
+  if (!DJANGO_API_URL) {
+    return NextResponse.json(
+      { error: "Backend not configured" },
+      { status: 503 }
+    );
+  }
+
+  try {
+    const response = await fetch(`${DJANGO_API_URL}/api/geodata/jobs/${id}/`, {
+      headers: {
+        Authorization: token,
+      },
+      cache: "no-store",
+    });
+
+    const data = await response.json().catch(() => ({}));
+    return NextResponse.json(data, { status: response.status });
+  } catch (error) {
+    console.error("Fetch job error:", error);
+    return NextResponse.json(
+      { error: "Failed to fetch job status" },
+      { status: 500 }
+    );
+  }
+}
@@ -18,6 +18,23 @@ const KNOWN_CATEGORIES = new Set([
   "blog",
 ]);
 
+// Parse complete server-sent events out of a text buffer; returns the events
+// and whatever trailing partial event is left for the next read.
+function parseEvents(buffer) {
+  const blocks = buffer.split("\n\n");
+  const rest = blocks.pop();
+  const events = blocks.map((block) => {
+    let event = "message";
+    let data = "";
+    for (const line of block.split("\n")) {
+      if (line.startsWith("event:")) event = line.slice(6).trim();
+      else if (line.startsWith("data:")) data += line.slice(5).trim();
+    }
+    return { event, data: data ? JSON.parse(data) : {} };
+  });
+  return { events, rest };
+}
+
 export function ChatWidget() {
   const locale = useLocale();
   const t = useTranslations("Chat");
@@ -27,6 +44,7 @@ export function ChatWidget() {
   const [messages, setMessages] = useState([initialMessage]);
   const [input, setInput] = useState("");
   const [loading, setLoading] = useState(false);
+  const [streaming, setStreaming] = useState(false);
   const bottomRef = useRef(null);
   const inputRef = useRef(null);
 
@@ -46,29 +64,62 @@ export function ChatWidget() {
     setInput("");
     setMessages((prev) => [...prev, { role: "user", content: msg }]);
     setLoading(true);
+
+    // Update the assistant message being streamed (always the last one)
+    const updateReply = (update) =>
+      setMessages((prev) => [...prev.slice(0, -1), { ...prev[prev.length - 1], ...update(prev[prev.length - 1]) }]);
+
+    let started = false;
     try {
-      const res = await fetch("/api/django?endpoint=chat", {
+      const res = await fetch("/api/chat/stream", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify({ message: msg }),
       });
-      if (!res.ok) throw new Error(`Chat request failed: ${res.status}`);
-      const data = await res.json();
-      setMessages((prev) => [
-        ...prev,
-        {
-          role: "assistant",
-          content: data.reply || t("noResponse"),
-          category: data.category || null,
-        },
-      ]);
+      if (!res.ok || !res.body) throw new Error(`Chat request failed: ${res.status}`);
+
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      let finished = false;
+      while (!finished) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const parsed = parseEvents(buffer);
+        buffer = parsed.rest;
+
+        for (const { event, data } of parsed.events) {
+          if (event === "token") {
+            if (!started) {
+              started = true;
+              setStreaming(true);
+              setMessages((prev) => [...prev, { role: "assistant", content: "", category: null }]);
+            }
+            updateReply((reply) => ({ content: reply.content + data.text }));
+          } else if (event === "done") {
+            updateReply(() => ({ category: data.category || null }));
+            finished = true;
+          } else if (event === "error") {
+            throw new Error(data.error || "Chat stream failed");
+          }
+        }
+      }
+      if (!started) {
+        setMessages((prev) => [...prev, { role: "assistant", content: t("noResponse") }]);
+      }
     } catch {
-      setMessages((prev) => [
-        ...prev,
-        { role: "assistant", content: t("connectionError") },
-      ]);
+      if (started) {
+        updateReply((reply) => ({ content: reply.content || t("connectionError") }));
+      } else {
+        setMessages((prev) => [
+          ...prev,
+          { role: "assistant", content: t("connectionError") },
+        ]);
+      }
     } finally {
       setLoading(false);
+      setStreaming(false);
     }
   }
 
@@ -135,7 +186,7 @@ export function ChatWidget() {
               </div>
             ))}
 
-            {loading && (
+            {loading && !streaming && (
               <div className="chat-msg chat-msg-assistant">
                 <span className="chat-avatar" aria-hidden="true">IR</span>
                 <div className="chat-msg-body">
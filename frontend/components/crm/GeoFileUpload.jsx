@@ -5,6 +5,11 @@ import { Upload, File, Check, AlertCircle, X, Loader2 } from "lucide-react";
 import { Button } from "@/components/ui/button";
 import { Progress } from "@/components/ui/progress";
 
+const POLL_INTERVAL_MS = 1000;
+// Give up if no worker picks the job up, or if ingestion stops reporting progress
+const QUEUED_TIMEOUT_MS = 2 * 60 * 1000;
+const STALLED_TIMEOUT_MS = 20 * 60 * 1000;
+
 export function GeoFileUpload({ onUploadComplete, token }) {
   const [isDragging, setIsDragging] = useState(false);
   const [file, setFile] = useState(null);
@@ -12,6 +17,7 @@ export function GeoFileUpload({ onUploadComplete, token }) {
   const [progress, setProgress] = useState(0);
   const [error, setError] = useState(null);
   const [uploadResult, setUploadResult] = useState(null);
+  const [statusText, setStatusText] = useState("");
 
   const allowedExtensions = [".geojson", ".json", ".gpkg", ".shp", ".zip"];
 
@@ -80,11 +86,6 @@ export function GeoFileUpload({ onUploadComplete, token }) {
     formData.append("file", file);
 
     try {
-      // Simulate progress for better UX
-      const progressInterval = setInterval(() => {
-        setProgress((prev) => Math.min(prev + 10, 90));
-      }, 200);
-
       const response = await fetch("/api/geodata/upload/", {
         method: "POST",
         headers: {
@@ -93,15 +94,20 @@ export function GeoFileUpload({ onUploadComplete, token }) {
         body: formData,
       });
 
-      clearInterval(progressInterval);
-      setProgress(100);
-
       if (!response.ok) {
         const errorData = await response.json();
         throw new Error(errorData.error || "Upload failed");
       }
 
-      const result = await response.json();
+      let result = await response.json();
+
+      // 202: the backend queued an ingest job; poll it until it finishes
+      if (response.status === 202 && result.job_id) {
+        setStatusText("Queued for processing...");
+        result = await pollJob(result.job_id);
+      }
+
+      setProgress(100);
       setUploadResult(result);
 
       if (onUploadComplete) {
@@ -111,6 +117,57 @@ export function GeoFileUpload({ onUploadComplete, token }) {
       setError(err.message || "Upload failed");
     } finally {
       setUploading(false);
+      setStatusText("");
+    }
+  };
+
+  const pollJob = async (jobId) => {
+    const started = Date.now();
+    let lastProgressAt = started;
+    let lastIngested = -1;
+
+    while (true) {
+      await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL_MS));
+
+      const response = await fetch(`/api/geodata/jobs/${jobId}/`, {
+        headers: {
+          Authorization: `Bearer ${token}`,
+        },
+      });
+      const job = await response.json();
+
+      if (!response.ok) {
+        throw new Error(job.error || "Failed to fetch job status");
+      }
+      if (job.status === "succeeded") {
+        return job.result;
+      }
+      if (job.status === "failed") {
+        throw new Error(job.error || "Processing failed");
+      }
+
+      const now = Date.now();
+      if (job.status === "queued" && now - started > QUEUED_TIMEOUT_MS) {
+        throw new Error(
+          "The upload is still queued; no ingest worker seems to be running. Check the job later."
+        );
+      }
+      if (job.features_ingested !== lastIngested) {
+        lastIngested = job.features_ingested;
+        lastProgressAt = now;
+      } else if (job.status === "running" && now - lastProgressAt > STALLED_TIMEOUT_MS) {
+        throw new Error("Processing stopped reporting progress. Check the job later.");
+      }
+
+      if (job.progress != null) {
+        setProgress(Math.round(job.progress * 100));
+      }
+      if (job.status === "running") {
+        const eta = job.eta_seconds != null ? ` • ~${Math.ceil(job.eta_seconds)}s left` : "";
+        setStatusText(
+          `Ingested ${job.features_ingested.toLocaleString()} features${eta}`
+        );
+      }
     }
   };
 
@@ -236,7 +293,7 @@ export function GeoFileUpload({ onUploadComplete, token }) {
         <div className="space-y-2">
           <Progress value={progress} className="h-2" />
           <p className="text-sm text-slate-400 text-center">
-            Processing file... {progress}%
+            {statusText || `Processing file... ${progress}%`}
           </p>
         </div>
       )}